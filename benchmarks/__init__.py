@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Benchmarks import the dashboard modules the same way the Streamlit pages do
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_DIR = os.path.join(ROOT_DIR, "dashboard")
+
+if DASHBOARD_DIR not in sys.path:
+    sys.path.insert(0, DASHBOARD_DIR)
@@ -0,0 +1,155 @@
+import argparse
+import datetime
+import json
+import os
+import random
+import tempfile
+import time
+
+import bcrypt
+import numpy as np
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+import db
+import password_hashing
+from auth_jwt import authenticate, request_password_reset
+
+# Login and password-reset latency against a large users table, through the
+# real auth_jwt functions on the migrated (indexed) schema. On SQLite the same
+# lookups are also timed with NOT INDEXED, i.e. what the token/email lookups
+# cost as full scans on an unindexed table.
+#
+#   python -m benchmarks.auth_benchmark --users 1000000
+#   DB_HOST=... python -m benchmarks.auth_benchmark --backend mysql
+
+LOOKUPS = {
+    "login_by_username": ("SELECT username, email, password, role FROM users {hint} WHERE username=%s", "username"),
+    "reset_by_email": ("SELECT id FROM users {hint} WHERE email=%s", "email"),
+    "reset_by_token": ("SELECT id, reset_expiry FROM users {hint} WHERE reset_token=%s", "token"),
+}
+
+
+def _seed(users, password_hash, chunk=50_000, with_token_every=10):
+    expiry = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+
+    with db.get_connection() as conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM users WHERE username LIKE %s", ("bench_%",))
+
+    for start in range(0, users, chunk):
+        rows = [
+            (f"bench_{i}", f"bench_{i}@example.com", password_hash, "user",
+             f"{i:032x}" if i % with_token_every == 0 else None,
+             expiry if i % with_token_every == 0 else None)
+            for i in range(start, min(start + chunk, users))
+        ]
+        with db.get_connection() as conn:
+            conn.cursor().executemany(
+                "INSERT INTO users (username, email, password, role, reset_token, reset_expiry) "
+                "VALUES (%s,%s,%s,%s,%s,%s)",
+                rows,
+            )
+
+
+def _latency(samples):
+    samples = np.asarray(samples) * 1000
+    return {
+        "n": int(len(samples)),
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def _key(kind, i):
+    if kind == "username":
+        return f"bench_{i}"
+    if kind == "email":
+        return f"bench_{i}@example.com"
+    return f"{i - i % 10:032x}"
+
+
+def _time_lookup(sql, kind, ids, hint=""):
+    samples = []
+    with db.get_connection() as conn:
+        cur = conn.cursor()
+        for i in ids:
+            started = time.perf_counter()
+            cur.execute(sql.format(hint=hint), (_key(kind, i),))
+            cur.fetchone()
+            samples.append(time.perf_counter() - started)
+    return _latency(samples)
+
+
+def _time_call(fn, args_list):
+    samples = []
+    for args in args_list:
+        started = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - started)
+    return _latency(samples)
+
+
+def run(users, samples, scan_samples, backend, rounds=4):
+    rng = random.Random(42)
+    ids = [rng.randrange(users) for _ in range(samples)]
+
+    # Stored hashes match the configured cost, so logins do not trigger a rehash
+    password_hashing.BCRYPT_ROUNDS = rounds
+    password_hash = bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=rounds)).decode()
+
+    started = time.perf_counter()
+    _seed(users, password_hash)
+    results = {"backend": backend, "users": users, "seed_seconds": round(time.perf_counter() - started, 2)}
+
+    results["indexed"] = {name: _time_lookup(sql, kind, ids) for name, (sql, kind) in LOOKUPS.items()}
+
+    if backend == "sqlite" and scan_samples:
+        results["full_scan"] = {
+            name: _time_lookup(sql, kind, ids[:scan_samples], hint="NOT INDEXED")
+            for name, (sql, kind) in LOOKUPS.items()
+        }
+
+    # End to end; a low bcrypt cost (--rounds) keeps the database path visible
+    results["authenticate"] = _time_call(authenticate, [(f"bench_{i}", "secret") for i in ids])
+    results["request_password_reset"] = _time_call(
+        request_password_reset, [(f"bench_{i}@example.com",) for i in ids]
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Auth lookup latency on a large users table.")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--samples", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost of the seeded hashes")
+    parser.add_argument("--scan-samples", type=int, default=20, help="unindexed lookups to time (SQLite)")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    config = db._config()
+    config["backend"] = args.backend
+
+    tmp = None
+    if args.backend == "sqlite":
+        tmp = tempfile.TemporaryDirectory()
+        config["sqlite_path"] = os.path.join(tmp.name, "auth_bench.db")
+
+    db.configure(config)
+    results = run(args.users, args.samples, args.scan_samples, args.backend, args.rounds)
+    db.get_pool().close_all()
+
+    text = json.dumps(results, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
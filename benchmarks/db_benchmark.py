@@ -0,0 +1,138 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+import db
+
+# Connection-per-call (the old db.get_connection) vs the pool, on the two
+# statements the login/logging paths run: a user lookup and a log insert.
+# Defaults to a throwaway SQLite file; --backend mysql uses the DB_* env vars.
+#
+#   python -m benchmarks.db_benchmark --threads 16 --ops 5000
+#   DB_HOST=... python -m benchmarks.db_benchmark --backend mysql
+
+
+def _seed(config, users):
+    conn = db.create_pool(config).checkout()
+    with conn:
+        cur = conn.cursor()
+        cur.execute("DELETE FROM users WHERE username LIKE %s", ("bench_%",))
+        cur.executemany(
+            "INSERT INTO users (username, email, password, role) VALUES (%s,%s,%s,%s)",
+            [(f"bench_{i}", f"bench_{i}@example.com", "x", "user") for i in range(users)],
+        )
+
+
+def _statements(conn, i, users):
+    cur = conn.cursor(dictionary=True)
+    cur.execute("SELECT id, password, role FROM users WHERE username=%s", (f"bench_{i % users}",))
+    cur.fetchone()
+    cur.execute("INSERT INTO activity_logs (username, action) VALUES (%s, %s)", (f"bench_{i % users}", "login"))
+
+
+def _unpooled(config):
+    connect = db.create_pool(config)._connect
+
+    def op(i, users):
+        raw = connect()
+        try:
+            _statements(raw, i, users)
+            raw.commit()
+        finally:
+            raw.close()
+    return op
+
+
+def _pooled(config):
+    pool = db.create_pool(config)
+
+    def op(i, users):
+        with pool.checkout() as conn:
+            _statements(conn, i, users)
+    op.pool = pool
+    return op
+
+
+def _run(op, threads, ops, users):
+    latencies = np.zeros(ops)
+    counter = iter(range(ops))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            op(i, users)
+            latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    seconds = time.perf_counter() - started
+
+    return {
+        "seconds": round(seconds, 3),
+        "ops_per_second": round(ops / seconds, 1),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled vs per-call database connections.")
+    parser.add_argument("--backend", choices=["sqlite", "mysql"], default="sqlite")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    config = db._config()
+    config.update(backend=args.backend, pool_size=args.pool_size)
+
+    tmp = None
+    if args.backend == "sqlite":
+        tmp = tempfile.TemporaryDirectory()
+        config["sqlite_path"] = os.path.join(tmp.name, "bench.db")
+
+    _seed(config, args.users)
+
+    pooled = _pooled(config)
+    results = {
+        "backend": args.backend,
+        "threads": args.threads,
+        "ops": args.ops,
+        "pool_size": args.pool_size,
+        "per_call_connection": _run(_unpooled(config), args.threads, args.ops, args.users),
+        "pooled": _run(pooled, args.threads, args.ops, args.users),
+    }
+    results["pool_stats"] = dict(pooled.pool.stats)
+    pooled.pool.close_all()
+
+    text = json.dumps(results, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import argparse
+import json
+import os
+import time
+import warnings
+
+import numpy as np
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+from batch_forecaster import ARForecaster, HoltWintersForecaster
+from cube import build_cube
+from dataset import DATA_PATH, get_dataset
+from segment_forecast import ARIMA_ORDER, iter_segment_series
+
+# Compares the vectorized engines with the ARIMA(5,1,0) baseline from
+# notebooks/04_forecasting.ipynb on a held-out tail of every series.
+#
+#   python -m benchmarks.forecast_benchmark --level Store_ID --holdout 15
+#   python -m benchmarks.forecast_benchmark --synthetic 5000
+
+
+def _synthetic_series(n, length, seed=42):
+    rng = np.random.default_rng(seed)
+    t = np.arange(length)
+    base = rng.uniform(5_000, 50_000, (n, 1))
+    weekly = rng.uniform(0.05, 0.2, (n, 1)) * base * np.sin(2 * np.pi * t / 7)
+    drift = rng.normal(0, 0.0003, (n, 1)) * base * t
+    noise = rng.normal(0, 0.05, (n, length)) * base
+    walk = rng.normal(0, 0.005, (n, length)).cumsum(axis=1) * base
+    return np.maximum(base + weekly + drift + walk + noise, 0.0)
+
+
+def _dataset_series(path, level):
+    df, _ = get_dataset(path)
+    series = [s.to_numpy(dtype=float) for _, _, s, _ in iter_segment_series(build_cube(df), [level])]
+    return np.vstack(series)
+
+
+def _errors(actual, predicted):
+    mae = np.abs(actual - predicted).mean()
+    denom = np.abs(actual) + np.abs(predicted)
+    ratio = np.divide(2 * np.abs(actual - predicted), denom, out=np.zeros_like(denom), where=denom > 0)
+    smape = ratio.mean() * 100
+    return {"mae": round(float(mae), 3), "smape_pct": round(float(smape), 3)}
+
+
+def _time_batch(model, train, horizon):
+    started = time.perf_counter()
+    forecast = model.fit(train).forecast(horizon)
+    return forecast, time.perf_counter() - started
+
+
+def _time_arima(train, horizon):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    forecasts = []
+    started = time.perf_counter()
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for row in train:
+            forecasts.append(np.asarray(ARIMA(row, order=ARIMA_ORDER).fit().forecast(horizon)))
+    return np.vstack(forecasts), time.perf_counter() - started
+
+
+def run(Y, horizon, arima_sample):
+    train, test = Y[:, :-horizon], Y[:, -horizon:]
+    n = len(Y)
+    sample = np.arange(min(arima_sample, n))
+
+    results = {"series": n, "train_length": train.shape[1], "horizon": horizon, "engines": {}}
+
+    for name, model in [
+        ("ar_batch", ARForecaster(p=ARIMA_ORDER[0], d=ARIMA_ORDER[1])),
+        ("holt_winters_batch", HoltWintersForecaster()),
+    ]:
+        forecast, seconds = _time_batch(model, train, horizon)
+        results["engines"][name] = {
+            "seconds": round(seconds, 4),
+            "series_per_second": round(n / seconds, 1),
+            "all_series": _errors(test, forecast),
+            "arima_sample": _errors(test[sample], forecast[sample]),
+        }
+
+    if len(sample):
+        forecast, seconds = _time_arima(train[sample], horizon)
+        results["engines"]["arima_5_1_0"] = {
+            "seconds": round(seconds, 4),
+            "series_per_second": round(len(sample) / seconds, 1),
+            "arima_sample": _errors(test[sample], forecast),
+        }
+
+    results["arima_sample_size"] = int(len(sample))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch forecaster vs ARIMA(5,1,0) benchmark.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--level", default="Store_ID", help="segment type from segment_forecast.SEGMENT_TYPES")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N synthetic series instead of --data")
+    parser.add_argument("--length", type=int, default=730, help="days per synthetic series")
+    parser.add_argument("--horizon", "--holdout", type=int, default=15)
+    parser.add_argument("--arima-sample", type=int, default=50, help="series fitted with statsmodels")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        Y = _synthetic_series(args.synthetic, args.length)
+    elif os.path.exists(args.data):
+        Y = _dataset_series(args.data, args.level)
+    else:
+        parser.error(f"{args.data} not found; pass --synthetic N")
+
+    results = run(Y, args.horizon, args.arima_sample)
+    text = json.dumps(results, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
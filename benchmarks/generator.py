@@ -0,0 +1,236 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+from dataset import DATA_DIR
+from streaming_prep import add_date_features
+
+# Seeded synthetic sales in the exact final_data.csv layout (raw columns from
+# Retail_Sales_Data.csv plus the notebook 03 date features). Rows are produced
+# in fixed blocks of BLOCK_ROWS, each from its own seed, so a given --seed and
+# --rows always give the same file and memory stays flat at any size.
+#
+#   python -m benchmarks.generator --rows 1m
+#   python -m benchmarks.generator --rows 50m --format parquet
+#   python -m benchmarks.generator --rows 100k --raw --out data/Retail_Sales_Data.csv
+
+SYNTHETIC_DIR = os.path.join(DATA_DIR, "synthetic")
+
+SIZES = {"100k": 100_000, "1m": 1_000_000, "10m": 10_000_000, "50m": 50_000_000}
+BLOCK_ROWS = 100_000
+
+RAW_COLUMNS = [
+    "Date", "Store_ID", "Store_Location", "Product_ID", "Product_Category",
+    "Product_Subcategory", "Brand", "Unit_Price", "Units_Sold", "Total_Sales",
+    "Discount_Percentage", "Revenue", "Customer_Type", "Payment_Mode",
+    "Promotion_Applied", "Stock_On_Hand", "Store_Rating", "Region", "Holiday_Flag",
+]
+FEATURE_COLUMNS = ["Year", "Month", "DayOfWeek", "Is_Weekend"]
+COLUMNS = RAW_COLUMNS + FEATURE_COLUMNS
+
+# ---------- VOCABULARY ----------
+LOCATIONS = {
+    "Delhi": "North", "Lucknow": "North", "Jaipur": "North",
+    "Chennai": "South", "Bangalore": "South", "Hyderabad": "South",
+    "Kolkata": "East", "Bhubaneswar": "East",
+    "Mumbai": "West", "Ahmedabad": "West", "Pune": "West",
+}
+CATALOG = {
+    "Electronics": (["Mobiles", "Laptops", "Audio"], ["Samsung", "Apple", "Sony", "Dell"]),
+    "Fashion": (["Men Clothing", "Women Clothing", "Footwear"], ["Puma", "Levis", "Zara", "Nike"]),
+    "Groceries": (["Household", "Beverages", "Snacks"], ["Nestle", "Tata", "Amul", "ITC"]),
+    "Home Appliances": (["Kitchen", "Cleaning", "Cooling"], ["Whirlpool", "LG", "Philips", "Bosch"]),
+    "Sports": (["Athletics", "Outdoor", "Fitness"], ["Reebok", "Yonex", "Adidas", "Decathlon"]),
+}
+CUSTOMER_TYPES = ["New", "Returning"]
+PAYMENT_MODES = ["Cash", "Credit Card", "Debit Card", "UPI"]
+DISCOUNTS = np.array([0, 5, 10, 15, 20])
+
+DEFAULT_STORES = 10
+DEFAULT_PRODUCTS = 1000
+DEFAULT_START = "2023-01-01"
+DEFAULT_DAYS = 730
+
+
+def parse_rows(value):
+    value = str(value).lower().replace("_", "")
+    if value in SIZES:
+        return SIZES[value]
+    return int(float(value[:-1]) * {"k": 1e3, "m": 1e6}[value[-1]]) if value[-1] in "km" else int(value)
+
+
+def _categorical(codes, labels):
+    return pd.Categorical.from_codes(codes, categories=labels)
+
+
+# ---------- DIMENSIONS ----------
+# Stores, products and the holiday calendar are fixed by the seed and shared by
+# every block; only the transactions differ per block.
+class Universe:
+
+    def __init__(self, seed=42, stores=DEFAULT_STORES, products=DEFAULT_PRODUCTS,
+                 start=DEFAULT_START, days=DEFAULT_DAYS):
+        rng = np.random.default_rng([seed, 0])
+        self.seed = seed
+        self.days = days
+        self.start = np.datetime64(pd.Timestamp(start).date(), "D")
+
+        cities = list(LOCATIONS)
+        self.store_ids = [f"STR_{101 + i}" for i in range(stores)]
+        self.store_city = np.arange(stores) % len(cities)
+        self.store_region = np.array([sorted(set(LOCATIONS.values())).index(LOCATIONS[c])
+                                      for c in np.array(cities)[self.store_city]])
+        self.store_rating = rng.uniform(3.6, 4.9, stores)
+        self.store_weight = rng.gamma(8.0, 1.0, stores)
+        self.store_weight /= self.store_weight.sum()
+        self.cities = cities
+        self.regions = sorted(set(LOCATIONS.values()))
+
+        categories = list(CATALOG)
+        self.product_ids = [f"PRD_{i:03d}" for i in range(1, products + 1)]
+        self.product_category = rng.integers(0, len(categories), products)
+        self.product_sub = rng.integers(0, 3, products)
+        self.product_brand = rng.integers(0, 4, products)
+        self.product_price = np.round(rng.uniform(100, 50_000, products), 2)
+        self.categories = categories
+        self.subcategories = sorted({s for subs, _ in CATALOG.values() for s in subs})
+        self.brands = sorted({b for _, brands in CATALOG.values() for b in brands})
+
+        # Catalog position -> global label code
+        self._sub_codes = np.array([[self.subcategories.index(s) for s in CATALOG[c][0]] for c in categories])
+        self._brand_codes = np.array([[self.brands.index(b) for b in CATALOG[c][1]] for c in categories])
+
+        self.holidays = rng.random(days) < 0.05
+
+    # ---------- BLOCKS ----------
+    def block(self, index, rows):
+        rng = np.random.default_rng([self.seed, index + 1])
+
+        day = rng.integers(0, self.days, rows)
+        store = rng.choice(len(self.store_ids), rows, p=self.store_weight)
+        product = rng.integers(0, len(self.product_ids), rows)
+        category = self.product_category[product]
+
+        # Weekends and holidays sell more units
+        dates = self.start + day
+        weekday = (day + self.start.astype(object).weekday()) % 7
+        lift = 1.0 + 0.3 * (weekday >= 5) + 0.5 * self.holidays[day]
+        units = np.clip(np.round(rng.gamma(2.0, 6.0 * lift)), 1, 50).astype(np.int64)
+
+        price = np.round(self.product_price[product] * rng.uniform(0.9, 1.1, rows), 2)
+        total = np.round(price * units, 2)
+        discount = DISCOUNTS[rng.integers(0, len(DISCOUNTS), rows)]
+        revenue = np.round(total * (1 - discount / 100), 2)
+
+        rating = np.round(np.clip(self.store_rating[store] + rng.normal(0, 0.3, rows), 1.0, 5.0), 1)
+
+        return pd.DataFrame({
+            "Date": pd.to_datetime(dates),
+            "Store_ID": _categorical(store, self.store_ids),
+            "Store_Location": _categorical(self.store_city[store], self.cities),
+            "Product_ID": _categorical(product, self.product_ids),
+            "Product_Category": _categorical(category, self.categories),
+            "Product_Subcategory": _categorical(self._sub_codes[category, self.product_sub[product]],
+                                                self.subcategories),
+            "Brand": _categorical(self._brand_codes[category, self.product_brand[product]], self.brands),
+            "Unit_Price": price,
+            "Units_Sold": units,
+            "Total_Sales": total,
+            "Discount_Percentage": discount,
+            "Revenue": revenue,
+            "Customer_Type": _categorical(rng.integers(0, 2, rows), CUSTOMER_TYPES),
+            "Payment_Mode": _categorical(rng.integers(0, len(PAYMENT_MODES), rows), PAYMENT_MODES),
+            "Promotion_Applied": np.where(rng.random(rows) < 0.4, "Yes", "No"),
+            "Stock_On_Hand": rng.integers(50, 500, rows),
+            "Store_Rating": rating,
+            "Region": _categorical(self.store_region[store], self.regions),
+            "Holiday_Flag": self.holidays[day].astype(np.int64),
+        })
+
+
+# Yields DataFrames of at most BLOCK_ROWS rows, `rows` in total
+def generate(rows, seed=42, raw=False, **universe):
+    world = Universe(seed, **universe)
+
+    for index, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        chunk = world.block(index, min(BLOCK_ROWS, rows - start))
+        yield chunk if raw else add_date_features(chunk)[COLUMNS]
+
+
+def default_path(rows, seed=42, fmt="csv", raw=False):
+    label = next((name for name, n in SIZES.items() if n == rows), str(rows))
+    stem = "Retail_Sales_Data" if raw else "final_data"
+    return os.path.join(SYNTHETIC_DIR, f"{stem}_{label}_seed{seed}.{fmt}")
+
+
+# Writes via a temp file and renames, so a partial file is never picked up
+def write_dataset(path, rows, seed=42, fmt=None, raw=False, log=None, **universe):
+    fmt = fmt or ("parquet" if path.endswith(".parquet") else "csv")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+
+    writer = None
+    written = 0
+    started = time.time()
+
+    try:
+        for chunk in generate(rows, seed, raw, **universe):
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                # Plain strings so every row group has the same schema
+                table = pa.Table.from_pandas(chunk.astype({c: str for c in chunk.select_dtypes("category")}),
+                                             preserve_index=False)
+                writer = writer or pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(tmp, mode="a" if written else "w", header=not written,
+                             index=False, date_format="%Y-%m-%d")
+
+            written += len(chunk)
+            if log:
+                log(f"{written:,}/{rows:,} rows ({time.time() - started:.1f}s)")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    os.replace(tmp, path)
+    return path
+
+
+# Returns the cached file for (rows, seed, format), generating it if missing
+def ensure_dataset(rows, seed=42, fmt="csv", raw=False, log=None):
+    path = default_path(rows, seed, fmt, raw)
+    if not os.path.exists(path):
+        write_dataset(path, rows, seed, fmt, raw, log=log)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic final_data.csv.")
+    parser.add_argument("--rows", default="100k", help="row count or one of " + ", ".join(SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--raw", action="store_true", help="raw Retail_Sales_Data.csv columns only")
+    parser.add_argument("--stores", type=int, default=DEFAULT_STORES)
+    parser.add_argument("--products", type=int, default=DEFAULT_PRODUCTS)
+    parser.add_argument("--start", default=DEFAULT_START)
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS)
+    parser.add_argument("--out", help=f"output file (default: {SYNTHETIC_DIR}/...)")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    path = args.out or default_path(rows, args.seed, args.format, args.raw)
+
+    write_dataset(path, rows, args.seed, args.format, args.raw, log=print,
+                  stores=args.stores, products=args.products, start=args.start, days=args.days)
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+import db
+import password_hashing
+from auth_jwt import authenticate
+from password_hashing import SlidingWindow, throttle
+
+# Concurrent logins through auth_jwt.authenticate: bcrypt inline on the calling
+# thread (the old behaviour) vs the hashing process pool, then a
+# credential-stuffing burst from one IP against the throttle. Uses a throwaway
+# SQLite file; hashes are seeded at --rounds so no login triggers a rehash.
+#
+#   python -m benchmarks.login_benchmark --threads 16 --logins 400 --rounds 10
+#   python -m benchmarks.login_benchmark --workers 8
+
+
+def _seed(users, rounds):
+    hashed = password_hashing._hash("secret", rounds)
+    with db.get_connection() as conn:
+        conn.cursor().executemany(
+            "INSERT INTO users (username, email, password, role) VALUES (%s,%s,%s,%s)",
+            [(f"bench_{i}", f"bench_{i}@example.com", hashed, "user") for i in range(users)],
+        )
+
+
+def _run(threads, logins, users, ip=None, password="secret"):
+    latencies = np.zeros(logins)
+    accepted = np.zeros(logins, dtype=bool)
+    counter = iter(range(logins))
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            started = time.perf_counter()
+            accepted[i] = authenticate(f"bench_{i % users}", password, ip) is not None
+            latencies[i] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    seconds = time.perf_counter() - started
+
+    return {
+        "seconds": round(seconds, 3),
+        "logins_per_second": round(logins / seconds, 1),
+        "accepted": int(accepted.sum()),
+        "p50_ms": round(float(np.percentile(latencies, 50)) * 1000, 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)) * 1000, 3),
+    }
+
+
+# Counts password checks that actually reach bcrypt from here on
+def _count_checks():
+    calls = []
+    verify = password_hashing.verify_password
+
+    def counted(password, hashed):
+        calls.append(1)
+        return verify(password, hashed)
+
+    password_hashing.verify_password = counted
+    return lambda: len(calls)
+
+
+def _mode(workers):
+    password_hashing._reset_pool()
+    password_hashing.HASH_WORKERS = workers
+    password_hashing._slots = threading.BoundedSemaphore(max(workers, 1) * 4)
+    # Per-IP limits would reject the benchmark's own traffic
+    throttle.ips = SlidingWindow(10**9, 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput: inline vs pooled bcrypt, and throttling.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    parser.add_argument("--burst", type=int, default=1000, help="wrong-password attempts from one IP")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    config = db._config()
+    config.update(backend="sqlite", sqlite_path=os.path.join(tmp.name, "login_bench.db"))
+    db.configure(config)
+
+    password_hashing.BCRYPT_ROUNDS = args.rounds
+    _seed(args.users, args.rounds)
+
+    results = {"threads": args.threads, "logins": args.logins, "rounds": args.rounds, "workers": args.workers}
+
+    _mode(0)
+    results["inline"] = _run(args.threads, args.logins, args.users)
+
+    _mode(args.workers)
+    results["process_pool"] = _run(args.threads, args.logins, args.users)
+
+    # Default per-IP limit: once the IP is over its window every attempt is
+    # rejected before the database or bcrypt is touched
+    ip = "203.0.113.7"
+    throttle.ips = SlidingWindow(int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "30")), 60)
+    checks = _count_checks()
+    results["stuffing_burst"] = _run(args.threads, args.burst, args.users, ip=ip, password="guess")
+    results["stuffing_burst"]["bcrypt_checks"] = checks()
+
+    password_hashing._reset_pool()
+    db.get_pool().close_all()
+    tmp.cleanup()
+
+    text = json.dumps(results, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import ROOT_DIR
+from benchmarks.generator import SIZES, Universe, ensure_dataset, parse_rows
+import dataset
+from admin_report import generate_admin_report
+from ai_insights import generate_advanced_insights
+from cube import build_cube, kpis, slice_cube
+from filter_engine import FILTER_DIMENSIONS, FilterIndex
+from report_generator import generate_pdf_report
+from segment_forecast import ARIMA_ORDER, run_segment_forecasts
+
+# End-to-end timings on generated datasets: load, filter, KPIs, insights,
+# charts, forecasting, both PDF reports, data export and appending new rows. Each size is generated
+# once (seeded) and reused; results go to benchmarks/results/<commit>.json so
+# runs on different commits can be compared with --compare.
+#
+#   python -m benchmarks.run --rows 100k 1m
+#   python -m benchmarks.run --rows 10m --only load filter kpis
+#   python -m benchmarks.run --rows 100k --compare benchmarks/results/abc1234.json
+
+RESULTS_DIR = os.path.join(ROOT_DIR, "benchmarks", "results")
+
+GROUPS = ["load", "filter", "kpis", "insights", "charts", "forecast", "reports", "export", "ingest"]
+
+REGION = "North"
+CATEGORY = "Electronics"
+
+
+# ---------- TIMING ----------
+def _timed(fn, repeat=1):
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - started)
+    return {
+        "seconds": round(min(runs), 4),
+        "median_s": round(float(np.median(runs)), 4),
+        "runs": repeat,
+    }
+
+
+def _peak_rss_mb():
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(["git", *args], cwd=ROOT_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _meta(seed):
+    return {
+        "commit": _git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(_git("status", "--porcelain", "--untracked-files=no")),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+# ---------- BENCHMARK GROUPS ----------
+def bench_load(path, repeat):
+    columnar = dataset._columnar_path(os.path.abspath(path), dataset.content_hash(path))
+
+    def cold():
+        dataset.clear_cache()
+        if os.path.exists(columnar):
+            os.remove(columnar)
+        dataset.get_dataset(path)
+
+    def columnar_cache():
+        dataset.clear_cache()
+        dataset.get_dataset(path)
+
+    return {
+        "load_csv_cold": _timed(cold, 1),
+        "load_columnar_cache": _timed(columnar_cache, repeat),
+        "load_in_memory": _timed(lambda: dataset.get_dataset(path), repeat),
+    }
+
+
+def bench_filter(df, repeat):
+    dimensions = FILTER_DIMENSIONS + ["Store_ID"]
+    index = FilterIndex(df, dimensions)
+    stores = sorted(df["Store_ID"].unique())[::2]
+    filters = {"Region": REGION, "Product_Category": CATEGORY}
+
+    return {
+        "filter_index_build": _timed(lambda: FilterIndex(df, dimensions), repeat),
+        "filter_index_region_category": _timed(lambda: index.apply(df, filters), repeat),
+        "filter_index_stores": _timed(lambda: index.apply(df, {"Store_ID": stores}), repeat),
+        "filter_mask_region_category": _timed(
+            lambda: df[(df["Region"] == REGION) & (df["Product_Category"] == CATEGORY)], repeat),
+    }
+
+
+def bench_kpis(df, cube, repeat):
+    filtered = df[(df["Region"] == REGION) & (df["Product_Category"] == CATEGORY)]
+
+    def from_rows():
+        return {
+            "total_revenue": filtered["Revenue"].sum(),
+            "units_sold": filtered["Units_Sold"].sum(),
+            "avg_order": filtered["Revenue"].mean(),
+            "avg_discount": filtered["Discount_Percentage"].mean(),
+            "avg_rating": filtered["Store_Rating"].mean(),
+        }
+
+    return {
+        "cube_build": _timed(lambda: build_cube(df), 1),
+        "kpis_cube_all": _timed(lambda: kpis(cube), repeat),
+        "kpis_cube_slice": _timed(lambda: kpis(slice_cube(cube, REGION, CATEGORY)), repeat),
+        "kpis_rows_slice": _timed(from_rows, repeat),
+    }
+
+
+def bench_insights(df, cube, repeat):
+    return {
+        "insights_rows": _timed(lambda: generate_advanced_insights(df), repeat),
+        "insights_cube": _timed(lambda: generate_advanced_insights(df, cube=cube), repeat),
+    }
+
+
+# Daily revenue per store as one line chart: every point vs the chart_data budget
+def bench_charts(cube, repeat):
+    import plotly.express as px
+    from chart_data import line_figure
+
+    daily = cube.groupby(["Date", "Store_ID"], observed=True)["Revenue_sum"].sum().rename("Revenue").reset_index()
+    results = {}
+
+    for name, build in [
+        ("chart_daily_by_store_raw", lambda: px.line(daily, x="Date", y="Revenue", color="Store_ID")),
+        ("chart_daily_by_store_downsampled", lambda: line_figure(daily, "Date", "Revenue", by="Store_ID")),
+    ]:
+        results[name] = _timed(lambda: build().to_json(), repeat)
+        results[name]["json_bytes"] = len(build().to_json())
+    return results
+
+
+def bench_forecast(df, cube, tmp):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    daily = cube.groupby("Date")["Revenue_sum"].sum().asfreq("D", fill_value=0.0)
+
+    def arima_total():
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            ARIMA(daily.to_numpy(), order=ARIMA_ORDER).fit().forecast(15)
+
+    results = {"forecast_arima_total": _timed(arima_total, 1)}
+    for engine in ["ar", "holt_winters"]:
+        output = os.path.join(tmp, f"segments_{engine}.parquet")
+        results[f"forecast_segments_{engine}"] = _timed(
+            lambda: run_segment_forecasts(df, output=output, engine=engine, force=True), 1)
+    return results
+
+
+# Dashboard-like figures; rendering them needs kaleido with a Chrome install
+def _charts(cube):
+    from chart_data import bar_figure, line_figure
+    from cube import monthly_totals, rollup
+
+    return [
+        ("Revenue by Region", bar_figure(rollup(cube, "Region"), "Region", "Revenue")),
+        ("Revenue by Category", bar_figure(rollup(cube, "Product_Category"), "Product_Category", "Revenue")),
+        ("Monthly Revenue Trend", line_figure(monthly_totals(cube), "Date", "Revenue")),
+    ]
+
+
+def bench_reports(df, cube, tmp, charts, appendix):
+    figures = _charts(cube) if charts else []
+    date_range = (df["Date"].min().date(), df["Date"].max().date())
+    filters = {"Region": "All", "Category": "All"}
+
+    return {
+        "pdf_user_report": _timed(lambda: generate_pdf_report(
+            df, filters, "benchmark", charts=figures, date_range=date_range, cube=cube,
+            output_path=os.path.join(tmp, "user.pdf"), appendix=appendix), 1),
+        "pdf_admin_report": _timed(lambda: generate_admin_report(
+            df, filters, "benchmark", figures, date_range, cube=cube,
+            output_path=os.path.join(tmp, "admin.pdf"), appendix=appendix), 1),
+    }
+
+
+def bench_export(df, tmp):
+    from export import EXPORT_FORMATS, export_filename, write_export
+
+    results = {}
+    for fmt in EXPORT_FORMATS:
+        path = os.path.join(tmp, export_filename("export", fmt))
+        name = "export_" + EXPORT_FORMATS[fmt][0].replace(".", "_")
+        results[name] = _timed(lambda: write_export(df, fmt, path), 1)
+        results[name]["bytes"] = os.path.getsize(path)
+    return results
+
+
+# One day of new rows appended to a copy of the dataset, then the dashboard
+# side picking it up (reload, cube, filter index, stats store) vs rebuilding
+# those from all rows
+def bench_ingest(path, tmp, batch_rows=10_000):
+    import ingest
+    from cube import get_cube
+    from filter_engine import FilterIndex, get_filter_index
+    from incremental_stats import SalesStatsStore, get_stats_store
+
+    target = os.path.join(tmp, "ingest_" + os.path.basename(path))
+    shutil.copyfile(path, target)
+
+    def refresh():
+        df, _ = dataset.get_dataset(target)
+        get_cube(target)
+        get_filter_index(target)
+        get_stats_store(target)
+        return df
+
+    def next_day(index):
+        batch = Universe(seed=index).block(0, batch_rows)
+        batch["Date"] = refresh()["Date"].max() + pd.Timedelta(days=1)
+        return batch
+
+    def rebuild():
+        df = refresh()
+        build_cube(df)
+        FilterIndex(df)
+        SalesStatsStore().update(df)
+
+    try:
+        # The first append after a rewrite hashes the file once to start the journal
+        ingest.append_rows(next_day(1), target, segments=False)
+        batch = next_day(2)
+
+        results = {
+            "ingest_append": _timed(lambda: ingest.append_rows(batch, target, segments=False), 1),
+            "ingest_refresh_incremental": _timed(refresh, 1),
+            "ingest_refresh_full_rebuild": _timed(rebuild, 1),
+        }
+    finally:
+        # Journal, partitions, lock and columnar copies of the copy
+        shutil.rmtree(dataset.partition_dir(target), ignore_errors=True)
+        stem = os.path.splitext(os.path.basename(target))[0] + "."
+        for name in os.listdir(dataset.CACHE_DIR):
+            if name.startswith(stem):
+                os.remove(os.path.join(dataset.CACHE_DIR, name))
+        dataset.clear_cache()
+    return results
+
+
+# ---------- SUITE ----------
+def run_size(rows, seed, groups, repeat, charts=False, appendix=False, log=print):
+    started = time.perf_counter()
+    path = ensure_dataset(rows, seed, log=log)
+    result = {"rows": rows, "path": os.path.relpath(path, ROOT_DIR),
+              "prepare_s": round(time.perf_counter() - started, 2), "benchmarks": {}}
+    timings = result["benchmarks"]
+
+    if "load" in groups:
+        log(f"[{rows:,}] load")
+        timings.update(bench_load(path, repeat))
+
+    df, _ = dataset.get_dataset(path)
+    cube = build_cube(df)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for group, fn in [
+            ("filter", lambda: bench_filter(df, repeat)),
+            ("kpis", lambda: bench_kpis(df, cube, repeat)),
+            ("insights", lambda: bench_insights(df, cube, repeat)),
+            ("charts", lambda: bench_charts(cube, repeat)),
+            ("forecast", lambda: bench_forecast(df, cube, tmp)),
+            ("reports", lambda: bench_reports(df, cube, tmp, charts, appendix)),
+            ("export", lambda: bench_export(df, tmp)),
+            ("ingest", lambda: bench_ingest(path, tmp)),
+        ]:
+            if group in groups:
+                log(f"[{rows:,}] {group}")
+                timings.update(fn())
+
+    result["peak_rss_mb"] = _peak_rss_mb()
+    dataset.clear_cache()
+    return result
+
+
+# ---------- COMPARISON ----------
+def _flatten(results):
+    return {
+        (size, name): timing["seconds"]
+        for size, entry in results["datasets"].items()
+        for name, timing in entry["benchmarks"].items()
+    }
+
+
+def compare(baseline, current):
+    old, new = _flatten(baseline), _flatten(current)
+    lines = [f"{'size':>6}  {'benchmark':<32}{'baseline':>10}{'current':>10}{'ratio':>8}"]
+
+    for key in sorted(new.keys() & old.keys()):
+        ratio = new[key] / old[key] if old[key] else float("inf")
+        flag = "  <- slower" if ratio > 1.2 else ""
+        lines.append(f"{key[0]:>6}  {key[1]:<32}{old[key]:>10.4f}{new[key]:>10.4f}{ratio:>8.2f}{flag}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks on synthetic datasets.")
+    parser.add_argument("--rows", nargs="+", default=["100k"], help="sizes: " + ", ".join(SIZES) + " or N")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per cheap benchmark (best is reported)")
+    parser.add_argument("--charts", action="store_true", help="render charts into the PDFs (needs kaleido + Chrome)")
+    parser.add_argument("--appendix", action="store_true", help="include the full data appendix in the PDFs")
+    parser.add_argument("--output", help="results JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", metavar="BASELINE", help="print ratios against an earlier results file")
+    args = parser.parse_args()
+
+    results = {"meta": _meta(args.seed), "datasets": {}}
+    for size in args.rows:
+        rows = parse_rows(size)
+        results["datasets"][size] = run_size(rows, args.seed, args.only, args.repeat,
+                                             args.charts, args.appendix)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{results['meta']['commit'] or 'results'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(json.load(f), results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+
+from benchmarks import DASHBOARD_DIR  # noqa: F401  (puts dashboard/ on sys.path)
+from segmentation import StoreSegmentation, load_store_segments, store_totals
+
+# Full KMeans refit (notebooks/05_clustering.ipynb) vs the incremental
+# MiniBatchKMeans state in segmentation.py, on synthetic stores in three tiers.
+#
+#   python -m benchmarks.segmentation_benchmark --stores 10000 100000
+
+
+def _synthetic_rows(n_stores, days, start, seed):
+    rng = np.random.default_rng(seed)
+    tier = rng.integers(0, 3, n_stores)
+    scale = np.array([1_000.0, 5_000.0, 20_000.0])[tier]
+
+    store = np.repeat(np.arange(n_stores), days)
+    day = np.tile(np.arange(days), n_stores)
+    revenue = rng.gamma(4.0, scale[store] / 4.0)
+
+    return pd.DataFrame({
+        "Store_ID": store,
+        "Date": pd.Timestamp(start) + pd.to_timedelta(day, unit="D"),
+        "Revenue": revenue,
+        "Units_Sold": np.maximum(revenue / rng.uniform(20, 40, len(store)), 1).round(),
+        "Store_Rating": np.clip(rng.normal(3 + tier[store] * 0.5, 0.4), 1, 5),
+    })
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, round(time.perf_counter() - started, 4)
+
+
+def run(n_stores, days=28, new_days=7, seed=42):
+    history = _synthetic_rows(n_stores, days, "2024-01-01", seed)
+    batch = _synthetic_rows(n_stores, new_days, pd.Timestamp("2024-01-01") + pd.Timedelta(days=days), seed + 1)
+    batch = batch[batch["Store_ID"] % 10 == 0]  # a tenth of the stores report new sales
+
+    result = {"stores": n_stores, "history_rows": len(history), "batch_rows": len(batch)}
+
+    def full_fit():
+        totals = store_totals(pd.concat([history, batch]))
+        X = np.column_stack([totals["Revenue"], totals["Units_Sold"],
+                             totals["Rating_Sum"] / totals["Rating_Count"]])
+        return KMeans(n_clusters=3, random_state=42, n_init=3).fit(X)
+
+    _, result["full_refit_s"] = _timed(full_fit)
+
+    seg, result["initial_fit_s"] = _timed(lambda: StoreSegmentation().update(history))
+    _, result["incremental_update_s"] = _timed(lambda: seg.update(batch))
+    _, result["batch_assign_s"] = _timed(lambda: seg.assign(seg.totals))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        lookup_path = os.path.join(tmp, "store_segments.parquet")
+        _, result["save_s"] = _timed(lambda: seg.save(os.path.join(tmp, "state.pkl"), lookup_path))
+        _, result["lookup_load_s"] = _timed(lambda: load_store_segments(lookup_path))
+        _, result["lookup_cached_s"] = _timed(lambda: load_store_segments(lookup_path))
+
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental store segmentation benchmark.")
+    parser.add_argument("--stores", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--days", type=int, default=28, help="days of history per store")
+    parser.add_argument("--output", help="write results JSON here")
+    args = parser.parse_args()
+
+    results = [run(n, days=args.days) for n in args.stores]
+    text = json.dumps(results, indent=2)
+    print(text)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
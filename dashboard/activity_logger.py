@@ -1,11 +1,172 @@
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
 from db import get_connection
 
+# Activity events are queued in memory and written by one background thread
+# with executemany, either when ACTIVITY_LOG_BATCH events are waiting or every
+# ACTIVITY_LOG_INTERVAL seconds. log_activity() never touches the database.
+# When the queue is full a caller waits at most ENQUEUE_TIMEOUT, then the event
+# is dropped and counted; failed batches are retried with backoff before being
+# dropped. Whatever is queued at interpreter exit is flushed.
+
+BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH", "500"))
+FLUSH_INTERVAL = float(os.getenv("ACTIVITY_LOG_INTERVAL", "2.0"))
+MAX_QUEUE = int(os.getenv("ACTIVITY_LOG_QUEUE", "10000"))
+ENQUEUE_TIMEOUT = 0.05
+MAX_RETRIES = 3
+
+INSERT_SQL = "INSERT INTO activity_logs (username, action, timestamp) VALUES (%s, %s, %s)"
+
+
+class _FlushMarker(threading.Event):
+    pass  # queued by flush(); set once everything ahead of it is written
+
+
+class ActivityLogger:
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, max_queue=MAX_QUEUE,
+                 max_retries=MAX_RETRIES, connect=get_connection):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self._connect = connect
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+
+        self.counters = {"queued": 0, "written": 0, "dropped": 0, "retries": 0, "batches": 0}
+        self._counter_lock = threading.Lock()
+
+        self._thread = threading.Thread(target=self._worker, name="activity-logger", daemon=True)
+        self._thread.start()
+
+    def _count(self, name, n=1):
+        with self._counter_lock:
+            self.counters[name] += n
+
+    # ---------- PRODUCER ----------
+    def log(self, username, action):
+        if self._closed:
+            self._count("dropped")
+            return False
+
+        try:
+            self._queue.put((username, action, datetime.now()), timeout=ENQUEUE_TIMEOUT)
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+        self._count("queued")
+        return True
+
+    # Blocks until everything queued before the call is written (or dropped);
+    # False when that did not happen within `timeout`, queueing included
+    def flush(self, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        marker = _FlushMarker()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return False
+        return marker.wait(max(deadline - time.monotonic(), 0.0))
+
+    def close(self, timeout=10.0):
+        if self._closed:
+            return
+        deadline = time.monotonic() + timeout
+        self.flush(timeout)
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=max(deadline - time.monotonic(), 0.0))
+        except queue.Full:
+            return  # daemon thread; it goes with the interpreter
+        self._thread.join(max(deadline - time.monotonic(), 0.0))
+
+    def stats(self):
+        with self._counter_lock:
+            return dict(self.counters, pending=self._queue.qsize())
+
+    # ---------- CONSUMER ----------
+    def _write(self, batch):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self._connect() as conn:
+                    conn.cursor().executemany(INSERT_SQL, batch)
+            except Exception:
+                if attempt == self.max_retries:
+                    self._count("dropped", len(batch))
+                    return
+                self._count("retries")
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+            else:
+                self._count("written", len(batch))
+                self._count("batches")
+                return
+
+    def _worker(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                item = False  # interval elapsed
+
+            if isinstance(item, tuple):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+
+            if batch:
+                self._write(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if isinstance(item, _FlushMarker):
+                item.set()
+            elif item is None:
+                return
+
+
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def get_logger():
+    global _logger
+    if _logger is None:
+        with _logger_lock:
+            if _logger is None:
+                _logger = ActivityLogger()
+                atexit.register(_logger.close)
+    return _logger
+
+
 def log_activity(username, action):
-    conn = get_connection()
-    c = conn.cursor()
-    c.execute("INSERT INTO activity_logs (username, action) VALUES (%s, %s)",
-              (username, action))
-    conn.commit()
-    conn.close()
+    return get_logger().log(username, action)
+
+
+# ---------- DASHBOARD EVENTS ----------
+# session: st.session_state (any dict-like); one view per page per session,
+# one event per distinct filter selection.
+def log_page_view(session, username, page):
+    key = f"_logged_view_{page}"
+    if not session.get(key):
+        session[key] = True
+        log_activity(username, f"view:{page}")
+
 
+def log_filter_change(session, username, page, filters):
+    key = f"_logged_filters_{page}"
+    current = ",".join(f"{k}={v}" for k, v in filters.items())
+    previous = session.get(key)
+    session[key] = current
 
+    if previous is not None and previous != current:
+        log_activity(username, f"filter:{page}:{current}")
@@ -5,6 +5,11 @@ from datetime import datetime
 import pandas as pd
 from fpdf import FPDF
 
+from chart_renderer import png_stream, render_charts
+from cube import build_cube, kpis, top_value
+from instrumentation import timed
+from pdf_table import draw_table
+
 
 class AdminPDF(FPDF):
 
@@ -26,7 +31,11 @@ class AdminPDF(FPDF):
         self.cell(0, 10, f"Page {self.page_no()}", align="C")
 
 
-def generate_admin_report(df, filters, prepared_by, charts, date_range):
+@timed("report.admin_pdf")
+def generate_admin_report(df, filters, prepared_by, charts, date_range, cube=None,
+                          output_path=None, progress=None, appendix=False):
+    progress = progress or (lambda fraction, message=None: None)
+
     pdf = AdminPDF()
     pdf.add_page()
 
@@ -46,9 +55,13 @@ Applied Filters:
     pdf.ln(5)
 
     # ---------- KPIs ----------
-    total_revenue = df["Revenue"].sum()
-    avg_order = df["Revenue"].mean()
-    top_region = df.groupby("Region")["Revenue"].sum().idxmax()
+    if cube is None:
+        cube = build_cube(df)
+
+    stats = kpis(cube)
+    total_revenue = stats["total_revenue"]
+    avg_order = stats["avg_order"]
+    top_region = top_value(cube, "Region")
 
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Key Performance Indicators", ln=True)
@@ -61,22 +74,32 @@ Applied Filters:
     pdf.ln(5)
 
     # ---------- Charts ----------
+    progress(0.2, "Rendering charts")
     pdf.set_font("Arial", "B", 12)
     pdf.cell(0, 10, "Visual Analytics", ln=True)
 
-    for title, fig in charts:
+    # Rendered in memory: no shared temp file names between concurrent reports
+    images = render_charts([fig for _, fig in charts], width=900, height=500)
+    progress(0.8, "Laying out charts")
+
+    for (title, _), png in zip(charts, images):
         pdf.set_font("Arial", "B", 10)
         pdf.cell(0, 8, title, ln=True)
 
-        # Save chart temporarily
-        img_path = os.path.join(tempfile.gettempdir(), f"{title}.png")
-        fig.write_image(img_path, width=900, height=500)
-
-        pdf.image(img_path, x=15, w=180)
+        pdf.image(png_stream(png), x=15, w=180)
         pdf.ln(6)
 
+    # ---------- Appendix ----------
+    if appendix:
+        pdf.add_page(orientation="L")
+        pdf.set_font("Arial", "B", 12)
+        pdf.cell(0, 10, f"Appendix: Filtered Data ({len(df):,} Records)", ln=True)
+        draw_table(pdf, df, row_height=6, font_size=7,
+                   progress=lambda done: progress(0.8 + 0.19 * done, "Writing appendix"))
+
     # ---------- Save ----------
-    output_path = os.path.join(tempfile.gettempdir(), f"Admin_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
+    if output_path is None:
+        output_path = os.path.join(tempfile.gettempdir(), f"Admin_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf")
     pdf.output(output_path)
 
     return output_path
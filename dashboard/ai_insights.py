@@ -1,25 +1,72 @@
 import pandas as pd
 import numpy as np
 
-def generate_advanced_insights(df: pd.DataFrame):
-    insights = []
+from result_cache import cached
 
-    # Ensure date format
-    df["Date"] = pd.to_datetime(df["Date"])
-    df["Month"] = df["Date"].dt.to_period("M")
 
-    # ========== 1. Revenue trend ==========
-    monthly = df.groupby("Month")["Revenue"].sum()
+# ---------- SINGLE AGGREGATION PASS ----------
+# One scan of the rows gives Region x Category x day revenue; every insight
+# below is derived from that small table. A cube slice already has this shape.
+def _revenue_table(df):
+    dates = pd.to_datetime(df["Date"]).dt.normalize()
+
+    return (
+        df.groupby([df["Region"], df["Product_Category"], dates],
+                   observed=True, sort=False)["Revenue"]
+        .sum()
+        .rename("Revenue_sum")
+        .reset_index()
+    )
+
+
+def _trend_and_anomaly(daily):
+    monthly = daily.groupby(daily.index.to_period("M")).sum()
+    growth = None
 
     if len(monthly) > 1:
         growth = ((monthly.iloc[-1] - monthly.iloc[-2]) / monthly.iloc[-2]) * 100
+
+    mean = daily.mean()
+    std = daily.std()
+    anomalies = daily[daily < mean - 2 * std]
+
+    return growth, (anomalies.index[-1] if not anomalies.empty else None)
+
+
+# stats: optional incremental_stats.RevenueSeries for the same view; when given,
+# trend and anomaly come from its running aggregates instead of the rows.
+# cache_key: (dataset version, filters) -- results are shared through result_cache
+def generate_advanced_insights(df: pd.DataFrame, cube=None, cache_key=None, stats=None):
+    if cache_key is None:
+        return _compute_insights(df, cube, stats)
+
+    version, filters = cache_key
+    return cached("insights", version, filters, _compute_insights, df, cube, stats)
+
+
+def _compute_insights(df, cube=None, stats=None):
+    insights = []
+
+    table = cube if cube is not None else _revenue_table(df)
+
+    region_sales = table.groupby("Region", observed=True)["Revenue_sum"].sum()
+    cat_sales = table.groupby("Product_Category", observed=True)["Revenue_sum"].sum()
+
+    if stats is not None:
+        growth = stats.monthly_growth()
+        anomaly_day = stats.latest_anomaly()
+    else:
+        daily = table.groupby("Date")["Revenue_sum"].sum()
+        growth, anomaly_day = _trend_and_anomaly(daily)
+
+    # ========== 1. Revenue trend ==========
+    if growth is not None:
         trend = "increased" if growth > 0 else "decreased"
         insights.append(
             f"📈 Revenue has {trend} by {abs(growth):.2f}% compared to last month."
         )
 
     # ========== 2. Best/Worst Region ==========
-    region_sales = df.groupby("Region")["Revenue"].sum()
     best_region = region_sales.idxmax()
     worst_region = region_sales.idxmin()
 
@@ -27,7 +74,6 @@ def generate_advanced_insights(df: pd.DataFrame):
     insights.append(f"⚠️ Lowest performing region: {worst_region}.")
 
     # ========== 3. Best/Worst Category ==========
-    cat_sales = df.groupby("Product_Category")["Revenue"].sum()
     best_cat = cat_sales.idxmax()
     worst_cat = cat_sales.idxmin()
 
@@ -35,15 +81,9 @@ def generate_advanced_insights(df: pd.DataFrame):
     insights.append(f"📉 Weakest category: {worst_cat}.")
 
     # ========== 4. Anomaly Detection ==========
-    daily = df.groupby("Date")["Revenue"].sum()
-    mean = daily.mean()
-    std = daily.std()
-
-    anomalies = daily[daily < mean - 2 * std]
-
-    if not anomalies.empty:
+    if anomaly_day is not None:
         insights.append(
-            f"🚨 Anomaly detected: Unusual revenue drop on {anomalies.index[-1].date()}."
+            f"🚨 Anomaly detected: Unusual revenue drop on {anomaly_day.date()}."
         )
 
     # ========== 5. Smart Recommendation ==========
@@ -52,11 +92,16 @@ def generate_advanced_insights(df: pd.DataFrame):
     )
 
     # ========== 6. Executive Summary ==========
+    if growth is None:
+        direction = "stable"
+    else:
+        direction = "growing" if growth > 0 else "declining"
+
     summary = f"""
     Overall business performance shows that {best_region} is driving most revenue while
     {worst_region} is underperforming. The strongest product category is {best_cat},
     whereas {worst_cat} needs strategic improvement. Recent trends indicate revenue is
-    {'growing' if growth > 0 else 'declining'}, requiring data-driven decision making.
+    {direction}, requiring data-driven decision making.
     """
 
     return insights, summary.strip()
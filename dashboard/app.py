@@ -1,6 +1,8 @@
 import streamlit as st
-from auth_jwt import authenticate, register_user, decode_token
+from auth_jwt import BUSY, authenticate, register_user, decode_token
 from auth_jwt import request_password_reset, reset_password
+from activity_logger import log_activity
+from password_hashing import client_address, throttle
 import datetime
 from report_generator import generate_pdf_report
 
@@ -8,6 +10,13 @@ st.set_page_config(page_title="Retail System", layout="centered")
 
 st.title("🔐 Retail Analytics Platform")
 
+
+# Client address for login throttling; X-Forwarded-For only counts when the
+# peer is one of TRUSTED_PROXIES
+def client_ip():
+    return client_address(st.context.ip_address, st.context.headers.get("X-Forwarded-For"))
+
+
 menu = st.tabs(["Login", "Signup", "Forgot Password"])
 
 # ---------------- LOGIN ----------------
@@ -19,17 +28,23 @@ with menu[0]:
     remember = st.checkbox("Remember Me", key="login_remember")
 
     if st.button("Login", key="login_btn"):
-        token = authenticate(username, password)
+        ip = client_ip()
+        token = authenticate(username, password, ip)
 
-        if token:
+        if token is BUSY:
+            st.warning("The server is busy. Please try again in a moment.")
+        elif token:
             st.session_state.token = token
             user = decode_token(token)
 
             st.session_state.username = user["username"]
             st.session_state.role = user["role"]
+            log_activity(user["username"], "login")
 
             st.success(f"Welcome {user['username']} 👋")
             st.rerun()
+        elif throttle.retry_after(username, ip) > 0:
+            st.error(f"Too many attempts. Try again in {throttle.retry_after(username, ip):.0f} seconds.")
         else:
             st.error("Invalid credentials")
 
@@ -45,7 +60,10 @@ with menu[1]:
     role = st.selectbox("Select Role", ["user", "admin"], key="signup_role")
 
     if st.button("Create Account", key="signup_btn"):
-        if register_user(username, email, password, role):
+        created = register_user(username, email, password, role)
+        if created is BUSY:
+            st.warning("The server is busy. Please try again in a moment.")
+        elif created:
             st.success("Account created! Login now.")
         else:
             st.error("Username or email already exists")
@@ -73,7 +91,9 @@ with menu[2]:
 
     if st.button("Reset Password", key="reset_btn"):
         success = reset_password(reset_token, new_pass)
-        if success:
+        if success is BUSY:
+            st.warning("The server is busy. Please try again in a moment.")
+        elif success:
             st.success("Password updated successfully. You can login now.")
         else:
             st.error("Invalid or expired token")
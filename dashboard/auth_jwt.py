@@ -1,129 +1,131 @@
 import jwt
 import datetime
-import bcrypt
 from db import get_connection
+from instrumentation import count, timed
+from password_hashing import HashingBusy, hash_password, throttle, verify_and_upgrade
 import secrets
 
+# Returned instead of a result when password hashing is at capacity; the
+# caller should ask the user to try again rather than report bad input
+BUSY = object()
+
 # ---------- REQUEST RESET ----------
+@timed("auth.request_password_reset")
 def request_password_reset(email):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
 
-    cursor.execute("SELECT * FROM users WHERE email=%s", (email,))
-    user = cursor.fetchone()
+        # Unique index lookups (uq_users_email, then the primary key)
+        cursor.execute("SELECT id FROM users WHERE email=%s", (email,))
+        user = cursor.fetchone()
 
-    if not user:
-        conn.close()
-        return None
+        if not user:
+            return None
 
-    token = secrets.token_hex(16)
-    expiry = datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
+        token = secrets.token_hex(16)
+        expiry = datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
 
-    cursor.execute(
-        "UPDATE users SET reset_token=%s, reset_expiry=%s WHERE email=%s",
-        (token, expiry, email)
-    )
-    conn.commit()
-    conn.close()
+        cursor.execute(
+            "UPDATE users SET reset_token=%s, reset_expiry=%s WHERE id=%s",
+            (token, expiry, user["id"])
+        )
 
     return token
 
 
 # ---------- RESET PASSWORD ----------
 
+@timed("auth.reset_password")
 def reset_password(token, new_password):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT * FROM users WHERE reset_token=%s", (token,))
-    user = cursor.fetchone()
-
-    print("Token entered:", token)  # ✅ debug
-    print("DB user:", user)         # ✅ debug
-    if user:
-        print("Token in DB:", user["reset_token"])
-        print("Expiry:", user["reset_expiry"])
-        print("Now UTC:", datetime.datetime.utcnow())
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("SELECT id, reset_expiry FROM users WHERE reset_token=%s", (token,))
+        user = cursor.fetchone()
 
     if not user:
-        conn.close()
         return False
     if user["reset_expiry"] < datetime.datetime.utcnow():
-        conn.close()
         return False
 
-    hashed = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
-    cursor.execute(
-        "UPDATE users SET password=%s, reset_token=NULL, reset_expiry=NULL WHERE id=%s",
-        (hashed, user["id"])
-    )
-    conn.commit()
-    conn.close()
+    # Hashed without holding a pooled connection
+    try:
+        hashed = hash_password(new_password)
+    except HashingBusy:
+        return BUSY
 
-    return True
+    # The token is checked again: it may have been used in the meantime
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE users SET password=%s, reset_token=NULL, reset_expiry=NULL WHERE id=%s AND reset_token=%s",
+            (hashed, user["id"], token)
+        )
+        return cursor.rowcount == 1
 
 SECRET_KEY = "supersecretkey"
 
-def request_password_reset(email):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("SELECT * FROM users WHERE email=%s", (email,))
-    user = cursor.fetchone()
-
-    if not user:
-        conn.close()
-        return None
-
-    token = secrets.token_hex(16)
-    expiry = datetime.datetime.utcnow() + datetime.timedelta(minutes=15)
-
-    cursor.execute(
-        "UPDATE users SET reset_token=%s, reset_expiry=%s WHERE email=%s",
-        (token, expiry, email)
-    )
-
-    conn.commit()
-    conn.close()
-
-    return token
-
 # ---------- REGISTER ----------
+@timed("auth.register_user")
 def register_user(username, email, password, role="user"):
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    try:
+        hashed = hash_password(password)
+    except HashingBusy:
+        return BUSY
 
     try:
-        cursor.execute(
-            "INSERT INTO users (username, email, password, role) VALUES (%s,%s,%s,%s)",
-            (username, email, hashed, role)
-        )
-        conn.commit()
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO users (username, email, password, role) VALUES (%s,%s,%s,%s)",
+                (username, email, hashed, role)
+            )
         return True
 
     except Exception as e:
         print("Register error:", e)
         return False
 
-    finally:
-        conn.close()
-
 
 # ---------- LOGIN ----------
-def authenticate(username, password):
-    conn = get_connection()
-    cursor = conn.cursor(dictionary=True)
+# ip: client address for per-IP throttling; throttled attempts return None
+# without hashing (see password_hashing.throttle.retry_after). The attempt
+# counts against the username before the hash runs, so a concurrent burst
+# for one account cannot get past the limit; a success clears it.
+@timed("auth.authenticate")
+def authenticate(username, password, ip=None):
+    if not throttle.attempt(username, ip):
+        count("auth.login_throttled")
+        return None
 
     try:
-        cursor.execute(
-            "SELECT * FROM users WHERE username=%s",
-            (username,)
-        )
-        user = cursor.fetchone()
+        with get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute(
+                "SELECT username, email, password, role FROM users WHERE username=%s",
+                (username,)
+            )
+            user = cursor.fetchone()
+
+        try:
+            ok, upgraded = verify_and_upgrade(password, user["password"]) if user else (False, None)
+        except HashingBusy:
+            # Never checked: don't hold it against the account
+            throttle.cancel(username)
+            count("auth.login_busy")
+            return BUSY
+        throttle.result(username, ok)
+        count("auth.login_ok" if ok else "auth.login_failed")
+
+        if ok:
+            # Stored with an outdated cost: replace it now that we know the password
+            if upgraded:
+                with get_connection() as conn:
+                    conn.cursor().execute(
+                        "UPDATE users SET password=%s WHERE username=%s",
+                        (upgraded, username)
+                    )
+                count("auth.password_rehashed")
 
-        if user and bcrypt.checkpw(password.encode(), user["password"].encode()):
             payload = {
                 "username": user["username"],
                 "email": user["email"],
@@ -138,9 +140,6 @@ def authenticate(username, password):
         print("Login error:", e)
         return None
 
-    finally:
-        conn.close()
-
 
 # ---------- DECODE ----------
 def decode_token(token):
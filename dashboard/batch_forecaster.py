@@ -0,0 +1,174 @@
+import itertools
+
+import numpy as np
+
+# Vectorized forecasting over a (series x time) array. Every series shares one
+# calendar, so each step is a handful of matrix operations across all series.
+# Fitted on a 1-D series, forecast(h) returns a 1-D array like statsmodels, so
+# these objects can be saved to models/ and served by model_registry unchanged.
+
+
+def _as_batch(y):
+    y = np.asarray(y, dtype=float)
+    return (y[None, :], True) if y.ndim == 1 else (y, False)
+
+
+# ---------- AR(p) ON DIFFERENCES ----------
+class ARForecaster:
+
+    # order=(p, d): AR(p) on d-times differenced series; (5, 1) mirrors ARIMA(5,1,0)
+    def __init__(self, p=5, d=1, intercept=False, ridge=1e-8):
+        if p < 1 or d < 0:
+            raise ValueError(f"AR order must have p >= 1 and d >= 0, got ({p}, {d})")
+        self.p = p
+        self.d = d
+        self.intercept = intercept
+        self.ridge = ridge
+
+    def fit(self, y):
+        Y, self._single = _as_batch(y)
+        n, T = Y.shape
+        p = self.p
+
+        self._tails = []  # last value at each differencing level, for integration
+        Z = Y
+        for _ in range(self.d):
+            self._tails.append(Z[:, -1].copy())
+            Z = np.diff(Z, axis=1)
+
+        if Z.shape[1] <= p + 1:
+            raise ValueError(f"need more than {p + 1 + self.d} observations per series")
+
+        # Lag j regressor = Z[:, p-j : -j]; target = Z[:, p:]
+        m = Z.shape[1] - p
+        lags = [Z[:, p - j:Z.shape[1] - j] for j in range(1, p + 1)]
+        if self.intercept:
+            lags = [np.ones((n, m))] + lags
+        target = Z[:, p:]
+
+        k = len(lags)
+        XtX = np.empty((n, k, k))
+        Xty = np.empty((n, k))
+        for a in range(k):
+            Xty[:, a] = np.einsum("ij,ij->i", lags[a], target)
+            for b in range(a, k):
+                XtX[:, a, b] = XtX[:, b, a] = np.einsum("ij,ij->i", lags[a], lags[b])
+
+        XtX += self.ridge * np.eye(k)
+        self.coef_ = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+
+        self._history = Z[:, -p:].copy()
+        self.resid_ = target - sum(lags[a] * self.coef_[:, a:a + 1] for a in range(k))
+        return self
+
+    def forecast(self, h):
+        n = self.coef_.shape[0]
+        offset = 1 if self.intercept else 0
+
+        window = self._history.copy()
+        diffs = np.empty((n, h))
+
+        for step in range(h):
+            lagged = window[:, ::-1]  # lag 1 first
+            value = (lagged * self.coef_[:, offset:]).sum(axis=1)
+            if self.intercept:
+                value += self.coef_[:, 0]
+            diffs[:, step] = value
+            window = np.concatenate([window[:, 1:], value[:, None]], axis=1)
+
+        out = diffs
+        for tail in reversed(self._tails):
+            out = tail[:, None] + np.cumsum(out, axis=1)
+
+        return out[0] if self._single else out
+
+
+# ---------- HOLT-WINTERS (ADDITIVE) ----------
+DEFAULT_GRID = {
+    "alpha": (0.1, 0.3, 0.6),
+    "beta": (0.01, 0.1),
+    "gamma": (0.05, 0.3),
+}
+
+
+class HoltWintersForecaster:
+
+    # Smoothing parameters are picked per series from a small grid by in-sample SSE;
+    # all (series x parameter set) combinations run in the same vectorized pass.
+    def __init__(self, season_length=7, grid=None, damped=1.0):
+        self.m = season_length
+        self.grid = grid or DEFAULT_GRID
+        self.phi = damped
+
+    def _run(self, Y, alpha, beta, gamma):
+        n, T = Y.shape
+        m = self.m
+
+        level = Y[:, :m].mean(axis=1)
+        if T >= 2 * m:
+            trend = (Y[:, m:2 * m].mean(axis=1) - level) / m
+        else:
+            trend = np.zeros(n)
+        season = Y[:, :m] - level[:, None]
+
+        sse = np.zeros(n)
+        for t in range(m, T):
+            s = season[:, t % m]
+            fitted = level + self.phi * trend + s
+            err = Y[:, t] - fitted
+            sse += err * err
+
+            # Seasonal update against the prior level + trend, as statsmodels does
+            new_level = alpha * (Y[:, t] - s) + (1 - alpha) * (level + self.phi * trend)
+            season[:, t % m] = gamma * (Y[:, t] - level - self.phi * trend) + (1 - gamma) * s
+            trend = beta * (new_level - level) + (1 - beta) * self.phi * trend
+            level = new_level
+
+        return level, trend, season, sse
+
+    def fit(self, y):
+        Y, self._single = _as_batch(y)
+        n, T = Y.shape
+        if T < self.m + 1:
+            raise ValueError(f"need more than {self.m} observations per series")
+
+        combos = list(itertools.product(self.grid["alpha"], self.grid["beta"], self.grid["gamma"]))
+        k = len(combos)
+        params = np.repeat(np.array(combos), n, axis=0)  # (k*n, 3), combo-major
+
+        level, trend, season, sse = self._run(
+            np.tile(Y, (k, 1)), params[:, 0], params[:, 1], params[:, 2]
+        )
+
+        best = sse.reshape(k, n).argmin(axis=0)
+        pick = best * n + np.arange(n)
+
+        self.params_ = params[pick]
+        self.level_ = level[pick]
+        self.trend_ = trend[pick]
+        self.season_ = season[pick]
+        self.sse_ = sse[pick]
+        self._T = T
+        return self
+
+    def forecast(self, h):
+        steps = np.arange(1, h + 1)
+        if self.phi == 1.0:
+            damp = steps.astype(float)
+        else:
+            damp = np.cumsum(self.phi ** steps)
+
+        idx = (self._T + steps - 1) % self.m
+        out = self.level_[:, None] + damp[None, :] * self.trend_[:, None] + self.season_[:, idx]
+
+        return out[0] if self._single else out
+
+
+ENGINES = {
+    "ar": ARForecaster,
+    "holt_winters": HoltWintersForecaster,
+}
+
+
+def fit_batch(engine, Y, **params):
+    return ENGINES[engine](**params).fit(Y)
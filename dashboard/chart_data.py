@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Chart data preparation shared by the dashboards and the PDF reports. Line
+# charts are downsampled on the server to at most CHART_MAX_POINTS points
+# (LTTB keeps the visual shape; min/max bucketing keeps every extreme), and bar
+# charts keep the CHART_TOP_N largest categories with the rest summed into
+# "Other". Figure JSON size and Kaleido render time therefore stay bounded
+# however many days, stores or products a series covers.
+
+MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "500"))
+TOP_N = int(os.getenv("CHART_TOP_N", "10"))
+OTHER = "Other"
+
+METHODS = ["lttb", "minmax"]
+
+
+# ---------- SAMPLING ----------
+# Numeric positions for the x axis: datetimes as seconds from the first point,
+# numbers as-is, anything else (labels, period strings) by position
+def _positions(x):
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        values = x.to_numpy(dtype="datetime64[ns]").astype(np.int64)
+        return (values - values[0]) / 1e9
+    if pd.api.types.is_numeric_dtype(x) and not pd.api.types.is_bool_dtype(x):
+        return x.to_numpy(dtype=float)
+    return np.arange(len(x), dtype=float)
+
+
+# Largest-Triangle-Three-Buckets: row positions of `threshold` points, always
+# including the first and last
+def lttb_indices(x, y, threshold):
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the interior points 1 .. n-2
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (the last point for the final bucket)
+        if i == threshold - 3:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x = x[end:edges[i + 2]].mean()
+            avg_y = y[end:edges[i + 2]].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+
+    return selected
+
+
+# Min and max of each of `buckets` equal-width buckets (at most 2 * buckets points)
+def minmax_indices(y, buckets):
+    n = len(y)
+    if buckets < 1 or 2 * buckets >= n:
+        return np.arange(n)
+
+    values = pd.Series(np.asarray(y, dtype=float))
+    grouped = values.groupby(np.arange(n) * buckets // n)
+    keep = np.concatenate([grouped.idxmin().to_numpy(), grouped.idxmax().to_numpy(), [0, n - 1]])
+    return np.unique(keep)
+
+
+def _sample(df, x, y, max_points, method):
+    if len(df) <= max_points:
+        return df
+
+    if method == "lttb":
+        rows = lttb_indices(_positions(df[x]), df[y], max_points)
+    elif method == "minmax":
+        rows = minmax_indices(df[y], (max_points - 2) // 2)
+    else:
+        raise ValueError(f"Unknown downsampling method {method!r}; expected one of {METHODS}")
+
+    return df.iloc[rows]
+
+
+# df: one row per point; by: optional series column (one line per value),
+# which splits the point budget between the lines
+def downsample(df, x, y, max_points=MAX_POINTS, method="lttb", by=None):
+    if len(df) <= max_points:
+        return df
+
+    df = df[df[y].notna()]
+    if not df[x].is_monotonic_increasing:
+        df = df.sort_values([by, x] if by else x, kind="stable")
+
+    if by is None:
+        return _sample(df, x, y, max_points, method)
+
+    groups = df.groupby(by, observed=True, sort=False)
+    budget = max(max_points // max(groups.ngroups, 1), 3)
+    return pd.concat([_sample(part, x, y, budget, method) for _, part in groups])
+
+
+# ---------- CATEGORIES ----------
+# Keeps the `n` largest categories (ranked by `value`) and sums the rest into
+# one "Other" row; frames with at most n categories come back unchanged
+def top_n(df, category, value, n=TOP_N, other=OTHER):
+    if n is None or len(df) <= n:
+        return df
+
+    ranked = df.sort_values(value, ascending=False, kind="stable")
+    head, tail = ranked.iloc[:n], ranked.iloc[n:]
+
+    rest = pd.DataFrame({category: [other], value: [tail[value].sum()]})
+    head = head[[category, value]].astype({category: object})
+    return pd.concat([head, rest], ignore_index=True)
+
+
+# ---------- FIGURES ----------
+def line_figure(df, x, y, max_points=MAX_POINTS, method="lttb", by=None, **kwargs):
+    return px.line(downsample(df, x, y, max_points, method, by), x=x, y=y, color=by, **kwargs)
+
+
+# data: a frame, or a Series such as cube.rollup() output (index = categories)
+def bar_figure(data, x, y, top=TOP_N, **kwargs):
+    if isinstance(data, pd.Series):
+        data = data.rename(y).rename_axis(x).reset_index()
+    return px.bar(top_n(data, x, y, top), x=x, y=y, **kwargs)
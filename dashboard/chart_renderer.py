@@ -0,0 +1,118 @@
+import atexit
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from instrumentation import count, timed
+from result_cache import cache as results
+
+# Plotly -> PNG for the PDF reports. Every Kaleido render costs seconds, so the
+# figures of a report are rendered side by side in a small process pool (one
+# Kaleido per worker), and the PNG bytes are kept in result_cache keyed by a
+# hash of the figure spec + render size. A report whose charts did not change
+# renders nothing; concurrent requests for the same chart share one render.
+
+RENDER_WORKERS = int(os.getenv("CHART_RENDER_WORKERS", "4"))
+CACHE_NAME = "chart_png"  # content-addressed, so not tied to a dataset version
+
+_pending = {}  # chart key -> Future of a render in flight
+_lock = threading.Lock()
+
+_pool = None
+
+
+# ---------- WORKER ----------
+def _render(spec, width, height, scale):
+    import plotly.io as pio
+
+    return pio.from_json(spec).to_image(format="png", width=width, height=height, scale=scale)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(_reset_pool)
+
+
+# ---------- CACHE ----------
+def chart_key(spec, width=None, height=None, scale=1):
+    h = hashlib.sha1(spec.encode())
+    h.update(f"|{width}|{height}|{scale}".encode())
+    return h.hexdigest()
+
+
+def _cached_png(key):
+    return results.get(CACHE_NAME, None, {"chart": key})
+
+
+def _remember(key, png):
+    results.put(CACHE_NAME, None, {"chart": key}, png)
+
+
+def clear_cache():
+    results.invalidate(name=CACHE_NAME)
+
+
+# ---------- RENDERING ----------
+# figs: plotly figures; returns their PNG bytes in the same order
+@timed("charts.render")
+def render_charts(figs, width=None, height=None, scale=1):
+    specs = [fig.to_json() for fig in figs]
+    keys = [chart_key(spec, width, height, scale) for spec in specs]
+    futures = {}
+
+    with _lock:
+        found = {}
+        for spec, key in zip(specs, keys):
+            png = _cached_png(key)
+            if png is not None:
+                found[key] = png
+            elif key not in futures:
+                # Another request may already be rendering the same chart
+                if key not in _pending:
+                    _pending[key] = _get_pool().submit(_render, spec, width, height, scale)
+                futures[key] = _pending[key]
+
+    count("charts.cache_hit", len(found))
+    count("charts.cache_miss", len(futures))
+
+    try:
+        for key, future in futures.items():
+            found[key] = future.result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    finally:
+        with _lock:
+            for key, future in futures.items():
+                if future.done() and _pending.get(key) is future:
+                    del _pending[key]
+
+    for key in futures:
+        _remember(key, found[key])
+
+    return [found[key] for key in keys]
+
+
+def render_chart(fig, width=None, height=None, scale=1):
+    return render_charts([fig], width, height, scale)[0]
+
+
+# FPDF (fpdf2) reads images from file-like objects: nothing touches the temp dir
+def png_stream(png):
+    return io.BytesIO(png)
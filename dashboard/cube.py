@@ -0,0 +1,127 @@
+import threading
+
+import pandas as pd
+
+from dataset import DATA_PATH, append_frame, appended_since, get_dataset
+
+# ---------- CUBE LAYOUT ----------
+# One row per Region x Product_Category x Store_ID x day, holding sums and
+# non-null counts of each measure. Everything the dashboards and reports show
+# as KPIs or bar/line charts can be answered from here.
+DIMENSIONS = ["Region", "Product_Category", "Store_ID", "Date"]
+MEASURES = ["Revenue", "Units_Sold", "Discount_Percentage", "Store_Rating"]
+
+_cubes = {}  # dataset version -> cube
+_lock = threading.Lock()
+
+
+def build_cube(df):
+    keys = [df[d] for d in DIMENSIONS[:-1]] + [df["Date"].dt.normalize()]
+    grouped = df[MEASURES].groupby(keys, observed=True, sort=False, dropna=False)
+
+    sums = grouped.sum().add_suffix("_sum")
+    counts = grouped.count().add_suffix("_count")
+
+    cube = pd.concat([sums, counts], axis=1).reset_index()
+    cube.columns = DIMENSIONS + list(sums.columns) + list(counts.columns)
+    return cube
+
+
+# Folds appended rows into a cube. Only cells for days the batch touches are
+# re-aggregated; the rest of the history is carried over as-is.
+def extend_cube(cube, rows):
+    batch = build_cube(rows)
+    if batch.empty:
+        return cube
+
+    touched = cube["Date"].isin(batch["Date"].unique())
+    if touched.any():
+        batch = (
+            pd.concat([cube[touched], batch], ignore_index=True)
+            .groupby(DIMENSIONS, observed=True, sort=False, dropna=False)
+            .sum()
+            .reset_index()
+        )
+        cube = cube[~touched].reset_index(drop=True)
+    return append_frame(cube, batch[cube.columns])
+
+
+# Cube for the shared dataset, rebuilt only when the dataset version changes
+# (extended instead when the new version only appended rows)
+def get_cube(path=DATA_PATH):
+    df, version = get_dataset(path)
+
+    cube = _cubes.get(version)
+    if cube is not None:
+        return cube, version
+
+    with _lock:
+        cube = _cubes.get(version)
+        if cube is None:
+            previous = next(iter(_cubes.items()), None)
+            start = previous and appended_since(path, previous[0], version)
+
+            if start is None:
+                cube = build_cube(df)
+            else:
+                cube = extend_cube(previous[1], df.iloc[start:])
+            _cubes.clear()
+            _cubes[version] = cube
+    return cube, version
+
+
+# ---------- QUERIES ----------
+def slice_cube(cube, region="All", category="All", stores=None):
+    mask = None
+
+    if region not in (None, "All"):
+        mask = cube["Region"] == region
+
+    if category not in (None, "All"):
+        cat_mask = cube["Product_Category"] == category
+        mask = cat_mask if mask is None else mask & cat_mask
+
+    if stores is not None:
+        store_mask = cube["Store_ID"].isin(stores)
+        mask = store_mask if mask is None else mask & store_mask
+
+    return cube if mask is None else cube[mask]
+
+
+def _mean(cube, measure):
+    count = cube[f"{measure}_count"].sum()
+    return cube[f"{measure}_sum"].sum() / count if count else float("nan")
+
+
+def kpis(cube):
+    return {
+        "total_revenue": cube["Revenue_sum"].sum(),
+        "units_sold": cube["Units_Sold_sum"].sum(),
+        "avg_order": _mean(cube, "Revenue"),
+        "avg_discount": _mean(cube, "Discount_Percentage"),
+        "avg_rating": _mean(cube, "Store_Rating"),
+        "records": int(cube["Revenue_count"].sum()),
+    }
+
+
+def rollup(cube, by, measure="Revenue"):
+    return (
+        cube.groupby(by, observed=True)[f"{measure}_sum"]
+        .sum()
+        .rename(measure)
+    )
+
+
+def top_value(cube, by, measure="Revenue"):
+    return rollup(cube, by, measure).idxmax()
+
+
+def monthly_totals(cube, measure="Revenue"):
+    result = (
+        cube.groupby(cube["Date"].dt.to_period("M"))[f"{measure}_sum"]
+        .sum()
+        .rename(measure)
+        .reset_index()
+    )
+    result["Date"] = result["Date"].astype(str)
+    return result
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+from instrumentation import stage, timed
+from result_cache import invalidate
+
+# ---------- PATHS ----------
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DATA_PATH = os.path.join(DATA_DIR, "final_data.csv")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+
+CATEGORICAL_COLUMNS = ["Region", "Product_Category", "Store_Location", "Brand", "Customer_Type"]
+DATE_COLUMN = "Date"
+
+# One entry per source file: {"stamp": (mtime_ns, size), "version": str, "df": DataFrame,
+# "parent": version it was extended from in memory or None, "start": first appended row}
+# The DataFrame is shared by every session in the process -- treat it as read-only.
+_datasets = {}
+_lock = threading.Lock()
+
+
+# ---------- VERSIONING ----------
+def file_stamp(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+@timed("dataset.content_hash")
+def content_hash(path, block_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()[:16]
+
+
+# ---------- COLUMNAR CACHE ----------
+def _columnar_path(path, version):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}.{version}.parquet")
+
+
+@timed("dataset.parse_csv")
+def _read_csv(path):
+    df = pd.read_csv(
+        path,
+        dtype={col: "category" for col in CATEGORICAL_COLUMNS},
+        parse_dates=[DATE_COLUMN],
+    )
+    return df
+
+
+def _write_columnar(df, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, target)
+
+    # Drop columnar copies of older versions of the same file
+    prefix = os.path.basename(target).split(".")[0] + "."
+    for name in os.listdir(os.path.dirname(target)):
+        stale = os.path.join(os.path.dirname(target), name)
+        if name.startswith(prefix) and name.endswith(".parquet") and stale != target:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def _load_version(path, version, journal=None):
+    target = _columnar_path(path, version)
+
+    if os.path.exists(target):
+        with stage("dataset.read_columnar"):
+            return pd.read_parquet(target)
+
+    # Appended file: columnar copy of the base plus the batch partitions
+    base = journal and _columnar_path(path, journal["base"]["version"])
+    if base and os.path.exists(base):
+        with stage("dataset.read_columnar"):
+            df = pd.read_parquet(base)
+        return append_frame(df, _read_partitions(path, journal["appends"]))
+
+    df = _read_csv(path)
+    try:
+        _write_columnar(df, target)
+    except OSError as e:
+        print("Columnar cache write failed:", e)
+    return df
+
+
+# ---------- APPEND JOURNAL ----------
+# ingest.append_rows adds rows to the end of a dataset file and records every
+# batch in a journal next to the columnar cache: the chained version, the file
+# stamp after the append and a Parquet partition of the parsed rows. A process
+# holding an earlier version of the file reads only the partitions after it;
+# a cold start reads the base columnar copy plus the partitions. Versions of
+# appended files hash (parent version, batch bytes), so nothing re-reads the
+# history. A file rewritten any other way no longer matches the journal's last
+# stamp and is hashed and parsed as before.
+#
+# {"base": {"version", "size"}, "appends": [{"version", "parent", "stamp", "rows", "partition"}]}
+def journal_path(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}.appends.json")
+
+
+def partition_dir(path):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}.appends")
+
+
+def read_journal(path):
+    try:
+        with open(journal_path(os.path.abspath(path))) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_journal(path, journal):
+    target = journal_path(os.path.abspath(path))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(journal, f, indent=2)
+    os.replace(tmp, target)
+
+
+def chained_version(parent, batch_bytes):
+    return hashlib.sha1(parent.encode() + b"\0" + batch_bytes).hexdigest()[:16]
+
+
+# Journal whose last append produced the file as it is now, else None
+def _current_journal(path, stamp):
+    journal = read_journal(path)
+    if journal and journal["appends"] and tuple(journal["appends"][-1]["stamp"]) == stamp:
+        return journal
+    return None
+
+
+def _read_partitions(path, appends):
+    with stage("dataset.read_appends"):
+        parts = [pd.read_parquet(os.path.join(partition_dir(path), a["partition"])) for a in appends]
+    return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+
+# Rows of `extra` after `base`. Categorical columns stay categorical, with the
+# sorted union of old and new categories -- what read_csv(dtype="category")
+# gives for the whole file -- instead of falling back to object dtype.
+def append_frame(base, extra):
+    if extra.empty:
+        return base
+
+    widened = {}
+    for col in base.columns:
+        if isinstance(base[col].dtype, pd.CategoricalDtype):
+            categories = base[col].cat.categories
+            values = extra[col].astype(object)
+            unseen = values[values.notna() & ~values.isin(categories)].unique()
+            if len(unseen):
+                categories = categories.append(pd.Index(unseen, dtype=categories.dtype)).sort_values()
+            widened[col] = pd.CategoricalDtype(categories)
+
+    # Only columns that gained categories are recoded
+    base = base.assign(**{
+        col: base[col].cat.set_categories(dtype.categories)
+        for col, dtype in widened.items() if dtype != base[col].dtype
+    })
+    return pd.concat([base, extra[base.columns].astype(widened)], ignore_index=True)
+
+
+# ---------- PUBLIC API ----------
+# Returns (df, version); the CSV is parsed at most once per content version.
+def get_dataset(path=DATA_PATH):
+    path = os.path.abspath(path)
+    stamp = file_stamp(path)
+
+    entry = _datasets.get(path)
+    if entry and entry["stamp"] == stamp:
+        return entry["df"], entry["version"]
+
+    with _lock:
+        entry = _datasets.get(path)
+        if entry and entry["stamp"] == stamp:
+            return entry["df"], entry["version"]
+
+        journal = _current_journal(path, stamp)
+        if journal:
+            version = journal["appends"][-1]["version"]
+            known = [journal["base"]["version"]] + [a["version"] for a in journal["appends"]]
+
+            # Only rows were appended since the loaded version: read just those
+            if entry and entry["version"] in known[:-1]:
+                new = journal["appends"][known.index(entry["version"]):]
+                df = append_frame(entry["df"], _read_partitions(path, new))
+                _datasets[path] = {"stamp": stamp, "version": version, "df": df,
+                                   "parent": entry["version"], "start": len(entry["df"])}
+                invalidate(version=entry["version"])
+                return df, version
+        else:
+            version = content_hash(path)
+
+        # File was touched but not changed -- keep the loaded copy
+        if entry and entry["version"] == version:
+            entry["stamp"] = stamp
+            return entry["df"], version
+
+        df = _load_version(path, version, journal)
+        _datasets[path] = {"stamp": stamp, "version": version, "df": df, "parent": None, "start": 0}
+
+        # Results computed from the replaced version are unreachable now
+        if entry:
+            invalidate(version=entry["version"])
+        return df, version
+
+
+# Position of the first row appended on top of `since` when the loaded dataset
+# is `version` and was extended from `since` in memory; None otherwise. Derived
+# structures (cube, indexes, stats) use it to fold in the new rows only.
+def appended_since(path, since, version):
+    entry = _datasets.get(os.path.abspath(path))
+    if entry and entry["version"] == version and entry["parent"] == since:
+        return entry["start"]
+    return None
+
+
+def load_dataset(path=DATA_PATH):
+    return get_dataset(path)[0]
+
+
+def dataset_version(path=DATA_PATH):
+    return get_dataset(path)[1]
+
+
+def clear_cache():
+    with _lock:
+        _datasets.clear()
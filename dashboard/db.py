@@ -1,9 +1,331 @@
-import mysql.connector
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import weakref
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Pooled connections for auth and activity logging. Connections are opened
+# once and reused; a checkout blocks (up to DB_POOL_TIMEOUT) when all
+# DB_POOL_SIZE connections are busy instead of opening more. Both backends
+# expose the same mysql.connector-style interface: %s placeholders and
+# cursor(dictionary=True).
+#
+#   DB_BACKEND=mysql   DB_HOST / DB_PORT / DB_USER / DB_PASSWORD / DB_NAME
+#   DB_BACKEND=sqlite  DB_SQLITE_PATH (local runs and benchmarks, no server)
+#
+#   with get_connection() as conn:      # commit on success, rollback on error
+#       cur = conn.cursor(dictionary=True)
+#       cur.execute("SELECT ... WHERE username=%s", (name,))
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# ---------- CONFIG ----------
+def _config():
+    return {
+        "backend": os.getenv("DB_BACKEND", "mysql").lower(),
+        "host": os.getenv("DB_HOST", "localhost"),
+        "port": int(os.getenv("DB_PORT", "3306")),
+        "user": os.getenv("DB_USER", "root"),
+        "password": os.getenv("DB_PASSWORD", "12345"),
+        "database": os.getenv("DB_NAME", "retail_system"),
+        "sqlite_path": os.getenv("DB_SQLITE_PATH", os.path.join(BASE_DIR, "data", "retail_system.db")),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        # Idle connections older than this are pinged before reuse
+        "check_after": float(os.getenv("DB_POOL_CHECK_AFTER", "30")),
+        # ...and replaced outright after this many seconds
+        "recycle": float(os.getenv("DB_POOL_RECYCLE", "3600")),
+    }
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+# ---------- SQLITE BACKEND ----------
+# Same interface as mysql.connector; the schema comes from migrations.py
+_PLACEHOLDER = re.compile(r"%s")
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_converter("DATETIME", lambda raw: datetime.fromisoformat(raw.decode()))
+
+
+class SQLiteCursor:
+
+    def __init__(self, cursor, dictionary=False):
+        self._cursor = cursor
+        self._dictionary = dictionary
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return {d[0]: value for d, value in zip(self._cursor.description, row)}
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(_PLACEHOLDER.sub("?", sql), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(_PLACEHOLDER.sub("?", sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+
+    def __init__(self, path):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._conn = sqlite3.connect(
+            path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False,  # the pool hands a connection to one thread at a time
+            timeout=30,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._conn.cursor(), dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def ping(self):
+        self._conn.execute("SELECT 1").fetchone()
+
+    def close(self):
+        self._conn.close()
+
+
+# ---------- MYSQL BACKEND ----------
+def _mysql_connect(config):
+    import mysql.connector
 
-def get_connection():
     return mysql.connector.connect(
-        host="localhost",
-        user="root",
-        password="12345",
-        database="retail_system"
+        host=config["host"],
+        port=config["port"],
+        user=config["user"],
+        password=config["password"],
+        database=config["database"],
     )
+
+
+def _ping(raw):
+    if isinstance(raw, SQLiteConnection):
+        raw.ping()
+    else:
+        raw.ping(reconnect=False)
+
+
+# ---------- POOL ----------
+class PooledConnection:
+
+    def __init__(self, pool, raw, created):
+        self._pool = pool
+        self._raw = raw
+        self.created = created
+        self.broken = False
+        # A checkout dropped without close() would hold its pool slot forever;
+        # when it is garbage collected the connection is discarded, slot freed
+        self._leak = weakref.finalize(self, pool._release, raw, created, True)
+
+    def cursor(self, *args, **kwargs):
+        return self._raw.cursor(*args, **kwargs)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    # Hands the connection back to the pool instead of closing the socket
+    def close(self):
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._leak.detach()
+            self._pool._release(raw, self.created, self.broken)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.rollback()
+        except Exception:
+            self.broken = True
+            raise
+        finally:
+            self.close()
+
+
+class ConnectionPool:
+
+    def __init__(self, connect, size=5, timeout=10.0, check_after=30.0, recycle=3600.0, backend=None):
+        self._connect = connect
+        self.backend = backend
+        self.size = size
+        self.timeout = timeout
+        self.check_after = check_after
+        self.recycle = recycle
+
+        self._idle = queue.LifoQueue()  # (raw, created, returned_at); LIFO keeps hot ones hot
+        self._slots = threading.BoundedSemaphore(size)
+        self.stats = {"created": 0, "reused": 0, "replaced": 0, "timeouts": 0}
+
+    def _healthy(self, raw, created, returned_at):
+        now = time.monotonic()
+        if now - created > self.recycle:
+            return False
+        if now - returned_at > self.check_after:
+            try:
+                _ping(raw)
+            except Exception:
+                return False
+        return True
+
+    def checkout(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            self.stats["timeouts"] += 1
+            raise PoolTimeout(f"no database connection free within {self.timeout}s (pool size {self.size})")
+
+        try:
+            while True:
+                try:
+                    raw, created, returned_at = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+
+                if self._healthy(raw, created, returned_at):
+                    self.stats["reused"] += 1
+                    return PooledConnection(self, raw, created)
+
+                self.stats["replaced"] += 1
+                _close_quietly(raw)
+
+            raw = self._connect()
+            self.stats["created"] += 1
+            return PooledConnection(self, raw, time.monotonic())
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, raw, created, broken):
+        try:
+            if broken:
+                _close_quietly(raw)
+            else:
+                try:
+                    raw.rollback()  # never hand out an open transaction
+                except Exception:
+                    _close_quietly(raw)
+                else:
+                    self._idle.put((raw, created, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_all(self):
+        while True:
+            try:
+                raw, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _close_quietly(raw)
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def create_pool(config=None):
+    config = config or _config()
+
+    if config["backend"] == "sqlite":
+        connect = lambda: SQLiteConnection(config["sqlite_path"])  # noqa: E731
+    elif config["backend"] == "mysql":
+        connect = lambda: _mysql_connect(config)  # noqa: E731
+    else:
+        raise ValueError(f"unknown DB_BACKEND: {config['backend']}")
+
+    pool = ConnectionPool(
+        connect,
+        size=config["pool_size"],
+        timeout=config["timeout"],
+        check_after=config["check_after"],
+        recycle=config["recycle"],
+        backend=config["backend"],
+    )
+
+    # A local SQLite file is brought up to the current schema on first use
+    if config["backend"] == "sqlite":
+        from migrations import migrate
+        migrate(pool.checkout, "sqlite", log=lambda message: None)
+
+    return pool
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = create_pool()
+    return _pool
+
+
+# Swap the process-wide pool (tests / benchmarks switching backends)
+def configure(config=None):
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close_all()
+        _pool = create_pool(config)
+    return _pool
+
+
+# ---------- PUBLIC API ----------
+# Checked-out connection; close() (or leaving a with-block) returns it to the pool
+def get_connection():
+    return get_pool().checkout()
+
+
+def get_backend():
+    return get_pool().backend
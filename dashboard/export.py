@@ -0,0 +1,80 @@
+import gzip
+import os
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Data downloads for both dashboards, written only when a user asks for one.
+# Rows are serialized EXPORT_CHUNK_ROWS at a time straight into a gzip stream
+# or a Parquet row group, so the serialized file is never held in memory as a
+# whole. Pages submit write_export through report_jobs, which runs it off the
+# page thread and keeps the finished file per (dataset version, filters,
+# format) key; asking again for the same download reuses that file.
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "100000"))
+GZIP_LEVEL = int(os.getenv("EXPORT_GZIP_LEVEL", "3"))  # level 6 doubles the time for ~10% smaller files
+PARQUET_COMPRESSION = os.getenv("EXPORT_PARQUET_COMPRESSION", "zstd")
+
+# Format -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def _chunks(df, rows=None):
+    rows = rows or EXPORT_CHUNK_ROWS
+    for start in range(0, len(df), rows):
+        yield start, df.iloc[start:start + rows]
+
+
+# ---------- WRITERS ----------
+def write_csv_gz(df, output_path, progress):
+    with gzip.open(output_path, "wt", encoding="utf-8", newline="", compresslevel=GZIP_LEVEL) as f:
+        if df.empty:
+            df.to_csv(f, index=False)
+
+        for start, chunk in _chunks(df):
+            chunk.to_csv(f, header=start == 0, index=False)
+            progress((start + len(chunk)) / len(df), "Writing CSV")
+
+
+def write_parquet(df, output_path, progress):
+    schema = pa.Schema.from_pandas(df.iloc[:0], preserve_index=False)
+
+    with pq.ParquetWriter(output_path, schema, compression=PARQUET_COMPRESSION) as writer:
+        for start, chunk in _chunks(df):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            progress((start + len(chunk)) / len(df), "Writing Parquet")
+
+
+WRITERS = {"csv.gz": write_csv_gz, "parquet": write_parquet}
+
+
+# ---------- PUBLIC API ----------
+def export_filename(stem, fmt):
+    return f"{stem}.{EXPORT_FORMATS[fmt][0]}"
+
+
+def export_mime(filename):
+    for extension, mime in EXPORT_FORMATS.values():
+        if filename.endswith(f".{extension}"):
+            return mime
+    return "application/octet-stream"
+
+
+# Same signature as the report builders, so report_jobs can run and cache it
+def write_export(df, fmt, output_path, progress=None):
+    progress = progress or (lambda fraction, message=None: None)
+    extension = EXPORT_FORMATS[fmt][0]
+
+    # Written under a temp name: a half-written file is never offered for download
+    tmp = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        WRITERS[extension](df, tmp, progress)
+        os.replace(tmp, output_path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+    return output_path
@@ -0,0 +1,144 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from dataset import DATA_PATH, appended_since, get_dataset
+
+# ---------- FILTER DIMENSIONS ----------
+# Any column can be indexed; add it here and it becomes a sidebar filter candidate.
+FILTER_DIMENSIONS = ["Region", "Product_Category"]
+
+ALL = "All"
+
+_indexes = {}  # (dataset version, dimensions) -> FilterIndex
+_lock = threading.Lock()
+
+
+# ---------- POSTINGS ----------
+# Maps every distinct value of a column to the sorted row positions holding it.
+def build_postings(values):
+    values = pd.Series(values).reset_index(drop=True)
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        codes = values.cat.codes.to_numpy()
+        labels = values.cat.categories
+    else:
+        codes, labels = pd.factorize(values, sort=True)
+
+    valid = codes >= 0
+    rows = np.flatnonzero(valid)
+    codes = codes[valid]
+
+    # Stable sort keeps row positions ascending inside each value
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=len(labels))
+    bounds = np.concatenate([[0], np.cumsum(counts)])
+    sorted_rows = rows[order].astype(np.int64)
+
+    return {
+        label: sorted_rows[bounds[i]:bounds[i + 1]]
+        for i, label in enumerate(labels)
+        if counts[i]
+    }
+
+
+# Postings for rows appended at position `start` onward, merged into `postings`
+def extend_postings(postings, values, start):
+    merged = dict(postings)
+    for value, rows in build_postings(values).items():
+        rows = rows + start
+        merged[value] = np.concatenate([postings[value], rows]) if value in postings else rows
+    return merged
+
+
+def _union(arrays):
+    if not arrays:
+        return np.empty(0, dtype=np.int64)
+    if len(arrays) == 1:
+        return arrays[0]
+    return np.unique(np.concatenate(arrays))
+
+
+def _intersect(arrays):
+    arrays = sorted(arrays, key=len)
+    result = arrays[0]
+    for other in arrays[1:]:
+        if len(result) == 0:
+            break
+        result = np.intersect1d(result, other, assume_unique=True)
+    return result
+
+
+# ---------- INDEX ----------
+class FilterIndex:
+
+    def __init__(self, df, dimensions=FILTER_DIMENSIONS):
+        self.n_rows = len(df)
+        self.postings = {dim: build_postings(df[dim]) for dim in dimensions}
+
+    # New index covering `rows` appended after the rows this one was built on
+    def extended(self, rows):
+        index = FilterIndex.__new__(FilterIndex)
+        index.n_rows = self.n_rows + len(rows)
+        index.postings = {dim: extend_postings(p, rows[dim], self.n_rows) for dim, p in self.postings.items()}
+        return index
+
+    def values(self, dimension):
+        return sorted(self.postings[dimension])
+
+    # filters: {dimension: value | [values] | "All" | None}
+    def rows(self, filters):
+        selected = []
+
+        for dim, wanted in filters.items():
+            if wanted is None or wanted == ALL:
+                continue
+
+            postings = self.postings[dim]
+            if isinstance(wanted, (list, tuple, set)):
+                selected.append(_union([postings[v] for v in wanted if v in postings]))
+            else:
+                selected.append(postings.get(wanted, np.empty(0, dtype=np.int64)))
+
+        if not selected:
+            return None  # no active filter -> every row
+
+        return _intersect(selected)
+
+    def apply(self, df, filters):
+        rows = self.rows(filters)
+
+        # No active filter: hand back the shared frame itself, no copy
+        if rows is None:
+            return df
+
+        return df.take(rows)
+
+
+def get_filter_index(path=DATA_PATH, dimensions=FILTER_DIMENSIONS):
+    df, version = get_dataset(path)
+    key = (version, tuple(dimensions))
+
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            # Drop indexes built for older dataset versions, extending the
+            # previous one when the new version only appended rows
+            previous = None
+            for stale in [k for k in _indexes if k[0] != version]:
+                if stale[1] == key[1]:
+                    previous = (stale[0], _indexes[stale])
+                del _indexes[stale]
+
+            start = previous and appended_since(path, previous[0], version)
+            if start is not None and start == previous[1].n_rows:
+                index = previous[1].extended(df.iloc[start:])
+            else:
+                index = FilterIndex(df, dimensions)
+            _indexes[key] = index
+    return index
@@ -0,0 +1,261 @@
+import bisect
+import copy
+import heapq
+import math
+import threading
+from collections import deque
+
+import pandas as pd
+
+from dataset import DATA_PATH, appended_since, get_dataset
+
+ALL = "All"
+DEFAULT_WINDOW = 30  # days
+
+_stores = {}  # dataset version -> SalesStatsStore
+_lock = threading.Lock()
+
+
+# ---------- WELFORD ----------
+class RunningStats:
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def remove(self, x):
+        if self.count <= 1:
+            self.count, self.mean, self.m2 = 0, 0.0, 0.0
+            return
+        delta = x - self.mean
+        self.count -= 1
+        self.mean -= delta / self.count
+        self.m2 -= delta * (x - self.mean)
+
+    def replace(self, old, new):
+        self.remove(old)
+        self.add(new)
+
+    @property
+    def variance(self):
+        # Sample variance (ddof=1), matching pandas .std()
+        return max(self.m2, 0.0) / (self.count - 1) if self.count > 1 else float("nan")
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+# Welford statistics over the last `window` days
+class RollingStats:
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.values = deque()
+        self.stats = RunningStats()
+
+    def push(self, x):
+        self.values.append(x)
+        self.stats.add(x)
+        if len(self.values) > self.window:
+            self.stats.remove(self.values.popleft())
+
+    def replace_last(self, x):
+        self.stats.replace(self.values[-1], x)
+        self.values[-1] = x
+
+    def reset(self, values):
+        self.values.clear()
+        self.stats = RunningStats()
+        for x in values:
+            self.push(x)
+
+    def copy(self):
+        rolling = copy.copy(self)
+        rolling.values = deque(self.values)
+        rolling.stats = copy.copy(self.stats)
+        return rolling
+
+    @property
+    def mean(self):
+        return self.stats.mean
+
+    @property
+    def std(self):
+        return self.stats.std
+
+
+# ---------- ONE REVENUE SERIES ----------
+class RevenueSeries:
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.daily = {}    # Timestamp -> revenue
+        self.monthly = {}  # Period -> revenue
+        self.stats = RunningStats()
+        self.rolling = RollingStats(window)
+        self.last_day = None
+        # (revenue, day) sorted by revenue: the days under any threshold are a prefix
+        self.by_value = []
+        self._latest = None
+
+    # day_totals: revenue per day for the new rows only
+    def update(self, day_totals):
+        late = False
+
+        for day, amount in day_totals.items():
+            old = self.daily.get(day)
+
+            if old is None:
+                new = amount
+                self.stats.add(new)
+            else:
+                new = old + amount
+                self.stats.replace(old, new)
+                del self.by_value[bisect.bisect_left(self.by_value, (old, day))]
+            self.daily[day] = new
+            bisect.insort(self.by_value, (new, day))
+
+            month = day.to_period("M")
+            self.monthly[month] = self.monthly.get(month, 0.0) + amount
+
+            if self.last_day is None or day > self.last_day:
+                self.rolling.push(new)
+                self.last_day = day
+            elif day == self.last_day:
+                self.rolling.replace_last(new)
+            else:
+                late = True
+
+        # Rows for days before the newest: rebuild the window from the latest days
+        if late:
+            days = sorted(heapq.nlargest(self.rolling.window, self.daily))
+            self.rolling.reset(self.daily[d] for d in days)
+
+        # The threshold moved with the update, so re-derive the flagged days:
+        # everything below it, which is usually a short prefix of by_value
+        self._latest = None
+        if self.stats.count > 1:
+            below = bisect.bisect_left(self.by_value, (self.anomaly_threshold(),))
+            self._latest = max((day for _, day in self.by_value[:below]), default=None)
+
+    # Independent copy; days and totals are immutable, so the containers are
+    # copied shallowly
+    def copy(self):
+        series = copy.copy(self)
+        series.daily = dict(self.daily)
+        series.monthly = dict(self.monthly)
+        series.stats = copy.copy(self.stats)
+        series.rolling = self.rolling.copy()
+        series.by_value = list(self.by_value)
+        return series
+
+    def monthly_growth(self):
+        if len(self.monthly) < 2:
+            return None
+        prev, last = sorted(self.monthly)[-2:]
+        return ((self.monthly[last] - self.monthly[prev]) / self.monthly[prev]) * 100
+
+    def anomaly_threshold(self):
+        return self.stats.mean - 2 * self.stats.std
+
+    def is_anomaly(self, day):
+        value = self.daily.get(day)
+        return value is not None and value < self.anomaly_threshold()
+
+    # Latest day below the current threshold; same answer as a full scan
+    def latest_anomaly(self):
+        return self._latest
+
+    # Trailing-window mean - 2 * std, for checking the newest days against
+    # recent history rather than the whole series
+    def rolling_threshold(self):
+        return self.rolling.mean - 2 * self.rolling.std
+
+
+# ---------- SEGMENTED STORE ----------
+# Keeps one series per dashboard filter combination:
+# (region, category), (region, All), (All, category) and (All, All).
+class SalesStatsStore:
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.segments = {}
+        self.rows_seen = 0
+
+    def _series(self, key):
+        series = self.segments.get(key)
+        if series is None:
+            series = self.segments[key] = RevenueSeries(self.window)
+        return series
+
+    def update(self, rows):
+        if rows.empty:
+            return
+
+        dates = pd.to_datetime(rows["Date"]).dt.normalize()
+        table = (
+            rows.groupby([rows["Region"], rows["Product_Category"], dates],
+                         observed=True, sort=True)["Revenue"]
+            .sum()
+        )
+        table.index.names = ["Region", "Product_Category", "Date"]
+
+        rollups = [
+            (table, lambda r, c: (r, c), ["Region", "Product_Category"]),
+            (table.groupby(level=["Region", "Date"], observed=True).sum(), lambda r: (r, ALL), ["Region"]),
+            (table.groupby(level=["Product_Category", "Date"], observed=True).sum(), lambda c: (ALL, c), ["Product_Category"]),
+        ]
+
+        for frame, make_key, levels in rollups:
+            for seg, part in frame.groupby(level=levels, observed=True):
+                seg = seg if isinstance(seg, tuple) else (seg,)
+                self._series(make_key(*seg)).update(part.droplevel(levels))
+
+        self._series((ALL, ALL)).update(table.groupby(level="Date").sum())
+        self.rows_seen += len(rows)
+
+    def copy(self):
+        store = copy.copy(self)
+        store.segments = {key: series.copy() for key, series in self.segments.items()}
+        return store
+
+    def get(self, region=ALL, category=ALL):
+        return self.segments.get((region, category))
+
+    # Trailing-window statistics for one filter combination, or None
+    def rolling(self, region=ALL, category=ALL):
+        series = self.get(region, category)
+        return series.rolling if series is not None else None
+
+
+def get_stats_store(path=DATA_PATH):
+    df, version = get_dataset(path)
+
+    store = _stores.get(version)
+    if store is not None:
+        return store
+
+    with _lock:
+        store = _stores.get(version)
+        if store is None:
+            previous = next(iter(_stores.items()), None)
+            start = previous and appended_since(path, previous[0], version)
+
+            # Appended rows only: fold them into a copy (sessions may still be
+            # reading the old store), which holds per-day totals, not rows
+            if start is not None and start == previous[1].rows_seen:
+                store = previous[1].copy()
+                store.update(df.iloc[start:])
+            else:
+                store = SalesStatsStore()
+                store.update(df)
+            _stores.clear()
+            _stores[version] = store
+    return store
@@ -0,0 +1,252 @@
+import argparse
+import fcntl
+import io
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+
+import dataset
+from dataset import (
+    DATA_PATH, chained_version, content_hash, file_stamp,
+    partition_dir, read_journal, write_journal,
+)
+from instrumentation import timed
+from streaming_prep import add_date_features
+
+# Appends a batch of new sales rows (e.g. one day) to the published dataset
+# without regenerating it. The batch is validated against SCHEMA, the
+# derived date columns are computed, and the rows are appended to the CSV and
+# recorded in the dataset's append journal (see dataset.py). Work here is
+# proportional to the batch, not the history.
+#
+# Running dashboards pick the new version up on their next rerun. They read
+# only the new partition, and the cube, filter/search indexes and revenue
+# stats store fold the appended rows into the structures they already hold.
+# When a store segmentation state has been saved it is updated too.
+#
+#   python dashboard/ingest.py new_sales.csv
+#   python dashboard/ingest.py day1.parquet day2.parquet --no-segments
+
+# ---------- SCHEMA ----------
+# Column -> kind for the raw columns a batch must carry; Year, Month,
+# DayOfWeek and Is_Weekend are always derived from Date
+SCHEMA = {
+    "Date": "date",
+    "Store_ID": "text",
+    "Store_Location": "text",
+    "Product_ID": "text",
+    "Product_Category": "text",
+    "Product_Subcategory": "text",
+    "Brand": "text",
+    "Unit_Price": "number",
+    "Units_Sold": "integer",
+    "Total_Sales": "number",
+    "Discount_Percentage": "number",
+    "Revenue": "number",
+    "Customer_Type": "text",
+    "Payment_Mode": "text",
+    "Promotion_Applied": "text",
+    "Stock_On_Hand": "integer",
+    "Store_Rating": "number",
+    "Region": "text",
+    "Holiday_Flag": "integer",
+}
+DERIVED_COLUMNS = ["Year", "Month", "DayOfWeek", "Is_Weekend"]
+
+# Cube dimensions and the filter columns: a missing value would drop the row
+# from every view
+KEY_COLUMNS = ["Date", "Store_ID", "Region", "Product_Category"]
+NON_NEGATIVE = ["Unit_Price", "Units_Sold", "Total_Sales", "Discount_Percentage", "Revenue", "Stock_On_Hand"]
+
+_lock = threading.Lock()
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _header(path):
+    with open(path, newline="") as f:
+        return f.readline().rstrip("\r\n").split(",")
+
+
+# Returns the batch in the dataset's column order, or raises SchemaError
+# listing every problem found
+def validate_rows(rows, columns):
+    problems = []
+
+    expected = set(columns) - set(DERIVED_COLUMNS)
+    missing = sorted(expected - set(rows.columns))
+    unknown = sorted(set(rows.columns) - set(columns))
+    if missing:
+        problems.append(f"missing columns: {', '.join(missing)}")
+    if unknown:
+        problems.append(f"columns not in the dataset: {', '.join(unknown)}")
+    if problems:
+        raise SchemaError("; ".join(problems))
+
+    original, rows = rows, rows.copy()
+    for col, kind in SCHEMA.items():
+        if col not in rows:
+            continue
+
+        values = rows[col]
+        if kind == "date":
+            rows[col] = pd.to_datetime(values, errors="coerce")
+            bad = rows[col].isna() & values.notna()
+        elif kind in ("number", "integer"):
+            rows[col] = pd.to_numeric(values, errors="coerce")
+            bad = rows[col].isna() & values.notna()
+            if kind == "integer":
+                bad |= rows[col].notna() & (rows[col] % 1 != 0)
+        else:
+            continue
+
+        if bad.any():
+            problems.append(f"{col}: {int(bad.sum())} value(s) not a valid {kind}, e.g. {values[bad].iloc[0]!r}")
+
+    for col in KEY_COLUMNS:
+        if col in original and original[col].isna().any():
+            problems.append(f"{col}: {int(original[col].isna().sum())} missing value(s)")
+
+    for col in NON_NEGATIVE:
+        if col in rows and (rows[col] < 0).any():
+            problems.append(f"{col}: {int((rows[col] < 0).sum())} negative value(s)")
+
+    if "Discount_Percentage" in rows and (rows["Discount_Percentage"] > 100).any():
+        problems.append("Discount_Percentage: values above 100")
+
+    if problems:
+        raise SchemaError("; ".join(problems))
+
+    return add_date_features(rows)[columns]
+
+
+# ---------- APPEND ----------
+# Serialized once: the same bytes are appended to the CSV, hashed into the
+# version and parsed back, so the partition holds exactly what a full re-read
+# of the file would produce for these rows
+def _serialize(rows, columns, path):
+    body = rows.to_csv(index=False, header=False, lineterminator="\n")
+
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        if f.tell():
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                body = "\n" + body
+
+    parsed = dataset._read_csv(io.StringIO(",".join(columns) + "\n" + body.lstrip("\n")))
+    return body.encode(), parsed
+
+
+# Journal for the file as it is now, started afresh (one full hash) when the
+# file was rewritten since the last append
+def _journal(path):
+    journal = read_journal(path)
+    stamp = file_stamp(path)
+
+    if journal and journal["appends"] and tuple(journal["appends"][-1]["stamp"]) == stamp:
+        return journal
+
+    shutil.rmtree(partition_dir(path), ignore_errors=True)
+    return {"base": {"version": content_hash(path), "size": stamp[1]}, "appends": []}
+
+
+# Only a saved state holds the history's per-store totals; seeding a new one
+# from the KMeans file here would segment stores on this batch alone
+def _update_segments(rows):
+    from segmentation import LOOKUP_PATH, STATE_PATH, load_segmentation
+
+    if not os.path.exists(STATE_PATH):
+        return False
+    load_segmentation(STATE_PATH).update(rows).save(STATE_PATH, LOOKUP_PATH)
+    return True
+
+
+@timed("ingest.append")
+def append_rows(rows, path=DATA_PATH, segments=True):
+    started = time.time()
+    path = os.path.abspath(path)
+    columns = _header(path)
+    rows = validate_rows(rows, columns)
+
+    if rows.empty:
+        return {"rows": 0, "version": None, "parent": None, "segments": False, "seconds": 0.0}
+
+    # One writer at a time, across threads and processes
+    os.makedirs(dataset.CACHE_DIR, exist_ok=True)
+    with _lock, open(f"{dataset.journal_path(path)}.lock", "a+") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+
+        journal = _journal(path)
+        parent = (journal["appends"] or [journal["base"]])[-1]["version"]
+        data, parsed = _serialize(rows, columns, path)
+        version = chained_version(parent, data)
+
+        # Partition first: a journal entry never points at a missing file
+        partition = f"{version}.parquet"
+        target = os.path.join(partition_dir(path), partition)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        parsed.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Readers that look between the append and this write don't match the
+        # journal and fall back to a full load of the (complete) file
+        journal["appends"].append({
+            "version": version,
+            "parent": parent,
+            "stamp": list(file_stamp(path)),
+            "rows": len(parsed),
+            "partition": partition,
+        })
+        write_journal(path, journal)
+
+    updated = segments and _update_segments(parsed)
+
+    return {
+        "rows": len(parsed),
+        "version": version,
+        "parent": parent,
+        "segments": updated,
+        "seconds": round(time.time() - started, 3),
+    }
+
+
+def read_batch(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+# ---------- CLI ----------
+def main():
+    parser = argparse.ArgumentParser(description="Append new sales rows to the published dataset.")
+    parser.add_argument("batches", nargs="+", metavar="FILE", help="CSV or Parquet files of new rows")
+    parser.add_argument("--data", default=DATA_PATH, help="dataset to append to")
+    parser.add_argument("--no-segments", action="store_true", help="leave the store segmentation state alone")
+    args = parser.parse_args()
+
+    batches = [read_batch(p) for p in args.batches]
+    rows = pd.concat(batches, ignore_index=True)
+
+    try:
+        result = append_rows(rows, args.data, segments=not args.no_segments)
+    except SchemaError as e:
+        parser.exit(1, f"Rejected: {e}\n")
+
+    print(f"Appended {result['rows']:,} rows -> version {result['version']} "
+          f"(segments {'updated' if result['segments'] else 'unchanged'}) in {result['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
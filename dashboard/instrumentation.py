@@ -0,0 +1,289 @@
+import functools
+import os
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+
+# Stage timers and event counters for dashboard reruns, reports and auth.
+#
+#   with stage("user.filter"): ...          # time a block
+#   @timed("report.user_pdf")               # time every call of a function
+#   count("insights.memo_hit")              # bump a counter
+#
+# A page wraps its script in begin_run(page) / end_run(); the stages timed on
+# that thread in between, with their RSS deltas, become one run in a ring
+# buffer of the last INSTRUMENTATION_RUNS reruns. Stages outside a run (report
+# jobs, logins) only feed the per-stage totals. export_prometheus() renders
+# the totals in the Prometheus text format (and writes INSTRUMENTATION_PROM_FILE
+# after every run when set, for a node_exporter textfile collector).
+#
+# Disabled by default (INSTRUMENTATION=1 or enable() turns it on); while off,
+# stage() returns a shared no-op context and the wrappers add one flag check.
+
+RING_SIZE = int(os.getenv("INSTRUMENTATION_RUNS", "200"))
+PROM_FILE = os.getenv("INSTRUMENTATION_PROM_FILE")
+PREFIX = "retail"
+
+_enabled = os.getenv("INSTRUMENTATION", "0").lower() in ("1", "true", "yes", "on")
+
+_runs = deque(maxlen=RING_SIZE)
+_stages = defaultdict(lambda: {"count": 0, "seconds": 0.0, "max_seconds": 0.0, "memory_bytes": 0})
+_pages = defaultdict(lambda: {"count": 0, "seconds": 0.0})
+_counters = defaultdict(int)
+_lock = threading.Lock()
+_local = threading.local()
+
+_NULL = nullcontext()
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def enabled():
+    return _enabled
+
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+
+def reset():
+    with _lock:
+        _runs.clear()
+        _stages.clear()
+        _pages.clear()
+        _counters.clear()
+
+
+# ---------- MEMORY ----------
+_statm = {"pid": None, "fd": None}
+
+
+# Current resident set size from a kept-open /proc/self/statm (reopened after a
+# fork); elsewhere falls back to peak RSS
+def rss_bytes():
+    try:
+        if _statm["pid"] != os.getpid():
+            _statm["fd"] = os.open("/proc/self/statm", os.O_RDONLY)
+            _statm["pid"] = os.getpid()
+        return int(os.pread(_statm["fd"], 128, 0).split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# ---------- RUNS ----------
+class Run:
+
+    def __init__(self, page):
+        self.page = page
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self._rss0 = rss_bytes()
+        self.stages = []  # (name, seconds, memory delta bytes, depth); depth 0 = outermost
+        self.counters = defaultdict(int)
+
+    def as_dict(self, seconds, complete):
+        return {
+            "page": self.page,
+            "started": self.started,
+            "seconds": seconds,
+            "memory_delta_bytes": rss_bytes() - self._rss0,
+            "complete": complete,
+            "stages": list(self.stages),
+            "counters": dict(self.counters),
+        }
+
+
+def _finish(run, complete):
+    seconds = time.perf_counter() - run._t0
+    record = run.as_dict(seconds, complete)
+
+    with _lock:
+        _runs.append(record)
+        page = _pages[run.page]
+        page["count"] += 1
+        page["seconds"] += seconds
+    return record
+
+
+def begin_run(page):
+    if not _enabled:
+        return None
+
+    # A rerun cut short (st.stop, exception) never reached end_run
+    previous = getattr(_local, "run", None)
+    if previous is not None:
+        _finish(previous, complete=False)
+
+    _local.run = Run(page)
+    return _local.run
+
+
+def end_run():
+    run = getattr(_local, "run", None)
+    if run is None:
+        return None
+
+    _local.run = None
+    record = _finish(run, complete=True)
+
+    if PROM_FILE:
+        try:
+            write_prometheus(PROM_FILE)
+        except OSError as e:
+            print("Prometheus export failed:", e)
+    return record
+
+
+# ---------- TIMERS ----------
+class _Stage:
+
+    __slots__ = ("name", "_t0", "_rss0", "_depth")
+
+    def __init__(self, name):
+        self.name = name
+
+    # Stages open on this thread around this one; a nested stage's time is
+    # also part of its parent's
+    def __enter__(self):
+        self._depth = getattr(_local, "depth", 0)
+        _local.depth = self._depth + 1
+        self._rss0 = rss_bytes()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._t0
+        memory = rss_bytes() - self._rss0
+        _local.depth = self._depth
+
+        with _lock:
+            totals = _stages[self.name]
+            totals["count"] += 1
+            totals["seconds"] += seconds
+            totals["max_seconds"] = max(totals["max_seconds"], seconds)
+            totals["memory_bytes"] += memory
+
+        run = getattr(_local, "run", None)
+        if run is not None:
+            run.stages.append((self.name, seconds, memory, self._depth))
+        return False
+
+
+def stage(name):
+    return _Stage(name) if _enabled else _NULL
+
+
+def timed(name):
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if not _enabled:
+        return
+
+    with _lock:
+        _counters[name] += n
+
+    run = getattr(_local, "run", None)
+    if run is not None:
+        run.counters[name] += n
+
+
+# ---------- READING ----------
+def recent_runs(page=None, limit=None):
+    with _lock:
+        runs = [r for r in _runs if page is None or r["page"] == page]
+    runs.reverse()  # newest first
+    return runs[:limit] if limit else runs
+
+
+# Seconds per stage name for one run record, repeats summed. Nested stages are
+# keyed "↳ name" so they are not read as extra time on top of their parent.
+def run_breakdown(run):
+    totals = {}
+    for name, seconds, _, depth in run["stages"]:
+        key = f"↳ {name}" if depth else name
+        totals[key] = totals.get(key, 0.0) + seconds
+    return totals
+
+
+def stage_totals():
+    with _lock:
+        return {name: dict(totals) for name, totals in _stages.items()}
+
+
+def counters():
+    with _lock:
+        return dict(_counters)
+
+
+# ---------- PROMETHEUS ----------
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _metric(name):
+    return f"{PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def export_prometheus():
+    with _lock:
+        stages = {name: dict(totals) for name, totals in _stages.items()}
+        pages = {name: dict(totals) for name, totals in _pages.items()}
+        events = dict(_counters)
+
+    lines = []
+
+    def family(name, kind, help_text, samples):
+        if not samples:
+            return
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+
+    family(_metric("stage_seconds"), "summary", "Time spent per instrumented stage.", [
+        line
+        for stage_name, t in sorted(stages.items())
+        for line in (f'{_metric("stage_seconds")}_sum{{stage="{_label(stage_name)}"}} {t["seconds"]:.6f}',
+                     f'{_metric("stage_seconds")}_count{{stage="{_label(stage_name)}"}} {t["count"]}')
+    ])
+    family(_metric("stage_seconds_max"), "gauge", "Slowest single execution per stage.", [
+        f'{_metric("stage_seconds_max")}{{stage="{_label(n)}"}} {t["max_seconds"]:.6f}'
+        for n, t in sorted(stages.items())
+    ])
+    # RSS deltas can be negative, so the running sum is a gauge, not a counter
+    family(_metric("stage_memory_delta_bytes"), "gauge", "Sum of RSS deltas per stage.", [
+        f'{_metric("stage_memory_delta_bytes")}{{stage="{_label(n)}"}} {t["memory_bytes"]}'
+        for n, t in sorted(stages.items())
+    ])
+    family(_metric("rerun_seconds"), "summary", "Dashboard script reruns per page.", [
+        line
+        for page, t in sorted(pages.items())
+        for line in (f'{_metric("rerun_seconds")}_sum{{page="{_label(page)}"}} {t["seconds"]:.6f}',
+                     f'{_metric("rerun_seconds")}_count{{page="{_label(page)}"}} {t["count"]}')
+    ])
+    family(_metric("events_total"), "counter", "Instrumentation counters.", [
+        f'{_metric("events_total")}{{event="{_label(n)}"}} {v}'
+        for n, v in sorted(events.items())
+    ])
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(export_prometheus())
+    os.replace(tmp, path)
@@ -0,0 +1,304 @@
+import argparse
+from datetime import date, datetime
+
+from db import get_backend, get_connection
+
+# Versioned schema for the auth and activity tables. Each migration runs once
+# and is recorded in schema_migrations; re-running is a no-op. SQLite databases
+# are migrated automatically when the pool is created; MySQL is migrated with
+#
+#   python dashboard/migrations.py             # apply pending migrations
+#   python dashboard/migrations.py --status
+#   python dashboard/migrations.py --partitions-ahead 6
+#
+# activity_logs is RANGE-partitioned by month on MySQL (one partition per
+# month plus a catch-all pmax), so time-bounded queries prune partitions and
+# old months can be dropped whole. SQLite has no partitioning; there the
+# timestamp index serves the same queries.
+
+LOG_PARTITIONS_AHEAD = 3
+
+
+# ---------- HELPERS ----------
+def _index_columns(cur, table):
+    cur.execute(
+        "SELECT INDEX_NAME, NON_UNIQUE, COLUMN_NAME FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+        (table,),
+    )
+    indexes = {}
+    for name, non_unique, column in cur.fetchall():
+        columns, _ = indexes.get(name, ((), True))
+        indexes[name] = (columns + (column,), not non_unique)
+    return indexes
+
+
+# Skips the index when one on the same columns already exists (MySQL has no IF NOT EXISTS)
+def ensure_index(cur, backend, table, name, columns, unique=False):
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+
+    if backend == "sqlite":
+        cur.execute(f"CREATE {kind} IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+        return
+
+    for existing, is_unique in _index_columns(cur, table).values():
+        if existing == tuple(columns) and (is_unique or not unique):
+            return
+    cur.execute(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})")
+
+
+def _month_start(day, offset=0):
+    months = day.year * 12 + day.month - 1 + offset
+    return date(months // 12, months % 12 + 1, 1)
+
+
+def _partition_clause(first_month, last_month):
+    parts = []
+    month = first_month
+    while month <= last_month:
+        upper = _month_start(month, 1)
+        parts.append(f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper:%Y-%m-%d}'))")
+        month = upper
+    parts.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    return ",\n    ".join(parts)
+
+
+def _is_partitioned(cur, table):
+    cur.execute(
+        "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL",
+        (table,),
+    )
+    return cur.fetchone()[0] > 0
+
+
+def _table_exists(cur, backend, table):
+    if backend == "sqlite":
+        cur.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+    else:
+        cur.execute(
+            "SELECT 1 FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table,),
+        )
+    return cur.fetchone() is not None
+
+
+# MySQL: partitioning needs the partition column in every unique key, hence PRIMARY KEY (id, timestamp)
+def _mysql_activity_logs(name):
+    this_month = _month_start(date.today())
+    return f"""
+CREATE TABLE IF NOT EXISTS {name} (
+    id BIGINT NOT NULL AUTO_INCREMENT,
+    username VARCHAR(64) NULL,
+    action TEXT NULL,
+    timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, timestamp)
+) ENGINE=InnoDB
+PARTITION BY RANGE (TO_DAYS(timestamp)) (
+    {_partition_clause(this_month, _month_start(this_month, LOG_PARTITIONS_AHEAD))}
+)"""
+
+
+# ---------- MIGRATIONS ----------
+def m001_create_tables(cur, backend):
+    if backend == "sqlite":
+        cur.execute("""
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    email TEXT,
+    password TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'user',
+    reset_token TEXT,
+    reset_expiry DATETIME,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+)""")
+        cur.execute("""
+CREATE TABLE IF NOT EXISTS activity_logs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT,
+    action TEXT,
+    timestamp DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+)""")
+        return
+
+    cur.execute("""
+CREATE TABLE IF NOT EXISTS users (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    username VARCHAR(64) NOT NULL,
+    email VARCHAR(255) NULL,
+    password VARCHAR(255) NOT NULL,
+    role VARCHAR(16) NOT NULL DEFAULT 'user',
+    reset_token CHAR(32) NULL,
+    reset_expiry DATETIME NULL,
+    created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+) ENGINE=InnoDB""")
+    cur.execute(_mysql_activity_logs("activity_logs"))
+
+
+# Every auth lookup is a point query: login by username, reset request by
+# email, reset by token. NULL tokens/emails do not collide in unique indexes.
+def m002_auth_indexes(cur, backend):
+    ensure_index(cur, backend, "users", "uq_users_username", ["username"], unique=True)
+    ensure_index(cur, backend, "users", "uq_users_email", ["email"], unique=True)
+    ensure_index(cur, backend, "users", "uq_users_reset_token", ["reset_token"], unique=True)
+    ensure_index(cur, backend, "activity_logs", "ix_activity_logs_username_ts", ["username", "timestamp"])
+    if backend == "sqlite":
+        ensure_index(cur, backend, "activity_logs", "ix_activity_logs_ts", ["timestamp"])
+
+
+# Tables created before migrations existed are not partitioned: copy them into a
+# partitioned table and swap names, keeping the original as activity_logs_unpartitioned.
+def m003_partition_activity_logs(cur, backend):
+    if backend == "sqlite" or _is_partitioned(cur, "activity_logs"):
+        return
+
+    cur.execute("DROP TABLE IF EXISTS activity_logs_partitioned")
+    cur.execute(_mysql_activity_logs("activity_logs_partitioned"))
+    cur.execute(
+        "INSERT INTO activity_logs_partitioned (username, action, timestamp) "
+        "SELECT username, action, COALESCE(timestamp, NOW()) FROM activity_logs"
+    )
+    cur.execute(
+        "RENAME TABLE activity_logs TO activity_logs_unpartitioned, "
+        "activity_logs_partitioned TO activity_logs"
+    )
+    ensure_index(cur, backend, "activity_logs", "ix_activity_logs_username_ts", ["username", "timestamp"])
+
+
+MIGRATIONS = [
+    (1, "create users and activity_logs", m001_create_tables),
+    (2, "auth lookup and activity indexes", m002_auth_indexes),
+    (3, "partition activity_logs by month", m003_partition_activity_logs),
+]
+
+
+# ---------- RUNNER ----------
+def _ensure_migrations_table(cur, backend):
+    if backend == "sqlite":
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations "
+            "(version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at DATETIME NOT NULL)"
+        )
+    else:
+        cur.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations "
+            "(version INT NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, applied_at DATETIME NOT NULL) "
+            "ENGINE=InnoDB"
+        )
+
+
+def applied_versions(connect=get_connection, backend=None):
+    backend = backend or get_backend()
+    with connect() as conn:
+        cur = conn.cursor()
+        _ensure_migrations_table(cur, backend)
+        cur.execute("SELECT version FROM schema_migrations")
+        return {row[0] for row in cur.fetchall()}
+
+
+# connect: connection factory (db.get_connection or a pool's checkout)
+def migrate(connect=get_connection, backend=None, target=None, log=print):
+    backend = backend or get_backend()
+    done = applied_versions(connect, backend)
+    ran = []
+
+    for version, name, run in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+
+        with connect() as conn:
+            cur = conn.cursor()
+            run(cur, backend)
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name, applied_at) VALUES (%s, %s, %s)",
+                (version, name, datetime.now()),
+            )
+
+        log(f"[migrate] {version:03d} {name}")
+        ran.append(version)
+
+    return ran
+
+
+# ---------- PARTITION MAINTENANCE (MySQL) ----------
+# Splits pmax so monthly partitions exist up to `months_ahead` from now; run monthly
+def ensure_log_partitions(months_ahead=LOG_PARTITIONS_AHEAD, connect=get_connection):
+    if get_backend() == "sqlite":
+        return []
+
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'activity_logs' AND PARTITION_NAME <> 'pmax'"
+        )
+        existing = sorted(row[0] for row in cur.fetchall())
+        if not existing:
+            return []
+
+        last = datetime.strptime(existing[-1], "p%Y%m").date()
+        target = _month_start(date.today(), months_ahead)
+        if last >= target:
+            return []
+
+        cur.execute(
+            f"ALTER TABLE activity_logs REORGANIZE PARTITION pmax INTO (\n"
+            f"    {_partition_clause(_month_start(last, 1), target)}\n)"
+        )
+
+    added = []
+    month = _month_start(last, 1)
+    while month <= target:
+        added.append(f"p{month:%Y%m}")
+        month = _month_start(month, 1)
+    return added
+
+
+# Retention: drops whole monthly partitions older than `before` (a date)
+def drop_log_partitions_before(before, connect=get_connection):
+    if get_backend() == "sqlite":
+        with connect() as conn:
+            conn.cursor().execute("DELETE FROM activity_logs WHERE timestamp < %s", (before,))
+        return []
+
+    with connect() as conn:
+        cur = conn.cursor()
+        cur.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'activity_logs' AND PARTITION_NAME <> 'pmax'"
+        )
+        names = sorted(row[0] for row in cur.fetchall())
+        cutoff = f"p{_month_start(before):%Y%m}"
+        # Keep at least one range partition; the first one also holds anything older
+        old = [name for name in names[:-1] if name < cutoff]
+        if old:
+            cur.execute(f"ALTER TABLE activity_logs DROP PARTITION {', '.join(old)}")
+    return old
+
+
+# ---------- CLI ----------
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations.")
+    parser.add_argument("--status", action="store_true", help="list migrations and whether they are applied")
+    parser.add_argument("--target", type=int, help="apply up to this version")
+    parser.add_argument("--partitions-ahead", type=int, metavar="MONTHS",
+                        help="also create monthly activity_logs partitions this far ahead")
+    args = parser.parse_args()
+
+    if args.status:
+        done = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"{'x' if version in done else ' '} {version:03d} {name}")
+        return
+
+    ran = migrate(target=args.target)
+    print(f"{len(ran)} migration(s) applied ({get_backend()})")
+
+    if args.partitions_ahead is not None:
+        added = ensure_log_partitions(args.partitions_ahead)
+        print(f"Added partitions: {', '.join(added) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import os
+import threading
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from dataset import BASE_DIR, content_hash, file_stamp
+from result_cache import cached, invalidate
+
+# ---------- PATHS ----------
+MODEL_DIR = os.path.join(BASE_DIR, "models")
+SALES_FORECAST_MODEL = "sales_forecast_model.pkl"
+
+# path -> {"stamp": (mtime_ns, size), "version": str, "model": object}
+# Forecasts live in result_cache, keyed by model version.
+_models = {}
+_lock = threading.Lock()
+
+
+def model_path(name):
+    return os.path.join(MODEL_DIR, name)
+
+
+def model_exists(name=SALES_FORECAST_MODEL):
+    return os.path.exists(model_path(name))
+
+
+# ---------- MODELS ----------
+# Unpickles an artifact once per process; reloads only when its content changes.
+def get_model(name=SALES_FORECAST_MODEL):
+    path = model_path(name)
+    stamp = file_stamp(path)
+
+    entry = _models.get(path)
+    if entry and entry["stamp"] == stamp:
+        return entry["model"], entry["version"]
+
+    with _lock:
+        entry = _models.get(path)
+        if entry and entry["stamp"] == stamp:
+            return entry["model"], entry["version"]
+
+        version = content_hash(path)
+        if entry and entry["version"] == version:
+            entry["stamp"] = stamp
+            return entry["model"], version
+
+        model = joblib.load(path)
+        _models[path] = {"stamp": stamp, "version": version, "model": model}
+
+        # Forecasts of the replaced model can never be asked for again
+        if entry:
+            invalidate(version=entry["version"])
+        return model, version
+
+
+# ---------- FORECASTS ----------
+def _forecast_values(model, horizon):
+    values = np.asarray(model.forecast(horizon), dtype=float)
+    values.setflags(write=False)
+    return values
+
+
+# Read-only array, computed once per (model version, horizon) across sessions
+def forecast(horizon, name=SALES_FORECAST_MODEL):
+    model, version = get_model(name)
+    return cached("forecast", version, {"model": name, "horizon": horizon}, _forecast_values, model, horizon)
+
+
+# Daily forecast frame shared by both dashboards and the PDF reports.
+# Returns None when no trained model has been saved yet.
+def sales_forecast_frame(start, horizon=15, name=SALES_FORECAST_MODEL):
+    if not model_exists(name):
+        return None
+
+    return pd.DataFrame({
+        "Date": pd.date_range(start=start, periods=horizon),
+        "Forecast": forecast(horizon, name),
+    })
+
+
+def clear_cache():
+    with _lock:
+        _models.clear()
+    invalidate(name="forecast")
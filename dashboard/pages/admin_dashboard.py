@@ -1,10 +1,23 @@
 import streamlit as st
 import pandas as pd
 import os
-import plotly.express as px
+from datetime import datetime
 from auth_jwt import decode_token
+from activity_logger import log_filter_change, log_page_view
+from dataset import DATA_PATH, get_dataset
+from chart_data import bar_figure, line_figure
+from cube import get_cube, kpis, monthly_totals, rollup, top_value
+from search_index import get_search_index
+from result_cache import cached
+import result_cache
+from incremental_stats import get_stats_store
+from model_registry import sales_forecast_frame
 from ai_insights import generate_advanced_insights
 from admin_report import generate_admin_report
+from export import EXPORT_FORMATS, export_filename, export_mime, write_export
+from report_jobs import job_file, job_status, report_key, submit_report
+import instrumentation
+from instrumentation import begin_run, end_run, stage
 
 
 # ---------- AUTH GUARD ----------
@@ -23,6 +36,9 @@ st.session_state["username"] = user.get("username", "User")
 
 st.set_page_config(page_title="Admin Dashboard", layout="wide")
 
+# Stages below are timed into one run per rerun when instrumentation is enabled
+begin_run("admin_dashboard")
+
 # ---------- SIDEBAR ----------
 role = st.session_state.get("role", "Admin")
 username = st.session_state.get("username", "User")
@@ -32,25 +48,29 @@ st.sidebar.markdown(f"🛡 Role: **{role.capitalize()}**")
 st.sidebar.markdown("---")
 
 # ---------- DATA ----------
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-DATA_PATH = os.path.join(BASE_DIR, "data", "final_data.csv")
-
 if not os.path.exists(DATA_PATH):
     st.error(f"File not found: {DATA_PATH}")
     st.stop()
 
-df = pd.read_csv(DATA_PATH)
-df["Date"] = pd.to_datetime(df["Date"])
+# Shared, version-aware copy -- do not mutate
+with stage("admin.load"):
+    df, data_version = get_dataset(DATA_PATH)
+    cube, _ = get_cube(DATA_PATH)
 
 # ---------- HEADER ----------
 st.title("🛠️ Admin Control Panel")
 st.caption("System-wide analytics overview")
 
 # ---------- KPIs ----------
-total_revenue = df["Revenue"].sum()
-total_users = df["Customer_Type"].nunique()
-avg_order = df["Revenue"].mean()
-best_region = df.groupby("Region")["Revenue"].sum().idxmax()
+# KPI block, figures and insights are computed once per dataset version and
+# shared with every admin session through result_cache
+def admin_kpis():
+    stats = kpis(cube)
+    return stats["total_revenue"], df["Customer_Type"].nunique(), stats["avg_order"], top_value(cube, "Region")
+
+
+with stage("admin.kpis"):
+    total_revenue, total_users, avg_order, best_region = cached("admin.kpis", data_version, None, admin_kpis)
 
 col1, col2, col3, col4 = st.columns(4)
 col1.metric("💰 Total Revenue", f"{total_revenue:,.0f}")
@@ -62,41 +82,70 @@ st.markdown("---")
 
 # ---------- MAIN CHART ----------
 st.subheader("Revenue by Region")
-region_sales = df.groupby("Region")["Revenue"].sum().reset_index()
-fig_region = px.bar(region_sales, x="Region", y="Revenue")
-st.plotly_chart(fig_region, use_container_width=True)
+with stage("admin.charts"):
+    fig_region = cached("admin.fig_region", data_version, None,
+                        lambda: bar_figure(rollup(cube, "Region"), "Region", "Revenue"))
+    st.plotly_chart(fig_region, use_container_width=True)
 
 st.markdown("---")
 
 # ---------- EXTRA CHARTS FOR PDF ----------
-category_sales = df.groupby("Product_Category")["Revenue"].sum().reset_index()
-fig_category = px.bar(category_sales, x="Product_Category", y="Revenue")
+with stage("admin.pdf_charts"):
+    fig_category = cached("admin.fig_category", data_version, None,
+                          lambda: bar_figure(rollup(cube, "Product_Category"), "Product_Category", "Revenue"))
 
-monthly = df.groupby(df["Date"].dt.to_period("M"))["Revenue"].sum().reset_index()
-monthly["Date"] = monthly["Date"].astype(str)
-fig_monthly = px.line(monthly, x="Date", y="Revenue")
+    fig_monthly = cached("fig_monthly", data_version, None,
+                         lambda: line_figure(monthly_totals(cube), "Date", "Revenue"))
 
-forecast_df = monthly.tail(6).copy()
-forecast_df["Revenue"] = forecast_df["Revenue"] * 1.05
-fig_forecast = px.line(forecast_df, x="Date", y="Revenue")
+# Same cached model forecast the user dashboard shows
+with stage("admin.forecast"):
+    forecast_df = sales_forecast_frame(df["Date"].max(), 15)
+    fig_forecast = None
+
+    if forecast_df is not None:
+        fig_forecast = line_figure(forecast_df, "Date", "Forecast", markers=True)
 
 # ---------- SEARCH ----------
 st.subheader("Data Explorer")
 
 search = st.text_input("Search by Store / Product / City")
-filtered = df.copy()
 
-if search:
-    filtered = df[
-        df["Store_Location"].str.contains(search, case=False, na=False) |
-        df["Product_Category"].str.contains(search, case=False, na=False)
-    ]
+log_page_view(st.session_state, username, "admin_dashboard")
+log_filter_change(st.session_state, username, "admin_dashboard", {"Search": search})
 
-st.dataframe(filtered.head(50), use_container_width=True)
+# Trigram lookup over distinct values; empty search returns the shared frame
+with stage("admin.search"):
+    filtered = get_search_index(DATA_PATH).apply(df, search)
+
+    st.dataframe(filtered.head(50), use_container_width=True)
 
 # ---------- DOWNLOAD DATA ----------
-csv = filtered.to_csv(index=False).encode("utf-8")
-st.download_button("📥 Download Full Dataset", csv, "full_data.csv")
+# Written on demand in chunks by a background job; the file is reused per
+# (dataset version, filters, format) until it ages out of the job cache
+export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+
+if st.button("Prepare Dataset Export"):
+    st.session_state["export_job"] = submit_report(
+        write_export,
+        report_key(data_version, {"Search": search}, f"export:{export_format}", None),
+        export_filename("full_data", export_format),
+        df=filtered,
+        fmt=export_format
+    )
+
+export_job = job_status(st.session_state.get("export_job"))
+
+if export_job is not None:
+    if export_job["status"] in ("queued", "running"):
+        st.progress(export_job["progress"], text=export_job["message"])
+        st.button("🔄 Refresh export status")
+    elif export_job["status"] == "done":
+        st.download_button("📥 Download Full Dataset", job_file(export_job), file_name=export_job["filename"],
+                           mime=export_mime(export_job["filename"]))
+    elif export_job["status"] == "failed":
+        st.error(f"Export failed: {export_job['error']}")
+    else:
+        st.warning(export_job["message"])
 
 # ---------- LOGOUT ----------
 if st.sidebar.button("Logout"):
@@ -116,37 +165,61 @@ st.markdown(hide_style, unsafe_allow_html=True)
 st.markdown("---")
 st.subheader("📄 Export Report")
 
+appendix = st.checkbox("Include full filtered data appendix")
+
 if st.button("Generate Professional PDF Report"):
-    path = generate_admin_report(
-    df=filtered,
-    filters={
-        "Search": search if search else "All",
-        "Records Included": len(filtered)
-    },
-    prepared_by=st.session_state["username"],
-    charts=[
+    charts = [
         ("Revenue by Region", fig_region),
         ("Revenue by Category", fig_category),
-        ("Monthly Revenue Trend", fig_monthly),
-        ("15-Day Sales Forecast", fig_forecast)
-    ],
-    date_range=(filtered["Date"].min().date(), filtered["Date"].max().date())
-)
+        ("Monthly Revenue Trend", fig_monthly)
+    ]
 
+    if fig_forecast is not None:
+        charts.append(("15-Day Sales Forecast", fig_forecast))
 
-    with open(path, "rb") as f:
-        st.download_button(
-            "⬇️ Download Report",
-            f,
-            file_name=os.path.basename(path),
-            mime="application/pdf"
-        )
+    filters = {
+        "Search": search if search else "All",
+        "Records Included": len(filtered)
+    }
+
+    st.session_state["report_job"] = submit_report(
+        generate_admin_report,
+        report_key(data_version, {**filters, "Appendix": appendix}, "admin", st.session_state["username"]),
+        f"Admin_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
+        df=filtered,
+        filters=filters,
+        prepared_by=st.session_state["username"],
+        charts=charts,
+        cube=None if search else cube,
+        date_range=(filtered["Date"].min().date(), filtered["Date"].max().date()),
+        appendix=appendix
+    )
+
+# Build runs in the background; the page only polls the job
+job = job_status(st.session_state.get("report_job"))
+
+if job is not None:
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"], text=job["message"])
+        st.button("🔄 Refresh status")
+    elif job["status"] == "done":
+        st.download_button("⬇️ Download Report", job_file(job), file_name=job["filename"], mime="application/pdf")
+    elif job["status"] == "failed":
+        st.error(f"Report failed: {job['error']}")
+    else:
+        st.warning(job["message"])
 
 # ---------- AI INSIGHTS ----------
 st.markdown("---")
 st.subheader("🧠 AI Business Insights")
 
-insights, summary = generate_advanced_insights(filtered)
+with stage("admin.insights"):
+    insights, summary = generate_advanced_insights(
+        filtered,
+        cube=None if search else cube,
+        cache_key=(data_version, {"Search": search}),
+        stats=None if search else get_stats_store(DATA_PATH).get()
+    )
 
 st.markdown("### 📋 Executive Summary")
 st.info(summary)
@@ -154,3 +227,60 @@ st.info(summary)
 st.markdown("### 📌 Key Insights")
 for i in insights:
     st.write(i)
+
+# ---------- DIAGNOSTICS ----------
+end_run()
+
+st.markdown("---")
+with st.expander("🩺 Diagnostics"):
+    on = st.toggle("Record stage timings (all sessions)", value=instrumentation.enabled())
+    if on != instrumentation.enabled():
+        instrumentation.enable(on)
+        st.rerun()
+
+    runs = instrumentation.recent_runs(limit=50)
+
+    if not runs:
+        st.caption("No runs recorded yet. Enable recording and reload a dashboard page.")
+    else:
+        st.markdown("#### Recent reruns")
+        st.dataframe(pd.DataFrame([
+            {
+                "Page": r["page"],
+                "Started": datetime.fromtimestamp(r["started"]).strftime("%H:%M:%S"),
+                "Total (ms)": round(r["seconds"] * 1000, 1),
+                "Memory Δ (MB)": round(r["memory_delta_bytes"] / 2**20, 1),
+                "Complete": r["complete"],
+                **{name: round(sec * 1000, 1) for name, sec in instrumentation.run_breakdown(r).items()},
+            }
+            for r in runs
+        ]), use_container_width=True)
+
+        st.markdown("#### Stage totals")
+        st.dataframe(pd.DataFrame([
+            {
+                "Stage": name,
+                "Calls": t["count"],
+                "Mean (ms)": round(t["seconds"] / t["count"] * 1000, 2),
+                "Max (ms)": round(t["max_seconds"] * 1000, 2),
+                "Memory Δ (MB)": round(t["memory_bytes"] / 2**20, 1),
+            }
+            for name, t in sorted(instrumentation.stage_totals().items())
+        ]), use_container_width=True)
+
+        events = instrumentation.counters()
+        if events:
+            st.markdown("#### Counters")
+            st.dataframe(pd.Series(events, name="Count").sort_index(), use_container_width=True)
+
+    results = result_cache.cache.stats()
+    st.markdown("#### Result cache")
+    st.caption(f"{results['entries']} entries · {results['bytes'] / 2**20:.1f} of "
+               f"{results['budget_bytes'] / 2**20:.0f} MB · hit rate "
+               + (f"{results['hit_rate']:.0%}" if results["hit_rate"] is not None else "n/a"))
+    if results["by_name"]:
+        st.dataframe(pd.DataFrame.from_dict(results["by_name"], orient="index").fillna(0).sort_index(),
+                     use_container_width=True)
+
+    st.download_button("📈 Export Prometheus metrics", instrumentation.export_prometheus(),
+                       "retail_metrics.prom", mime="text/plain")
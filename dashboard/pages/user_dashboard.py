@@ -1,11 +1,22 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import joblib
 import os
+from datetime import datetime
 from auth_jwt import decode_token
+from activity_logger import log_filter_change, log_page_view
+from dataset import DATA_PATH, get_dataset
+from chart_data import bar_figure, line_figure
+from cube import get_cube, kpis, monthly_totals, rollup, slice_cube
+from filter_engine import FILTER_DIMENSIONS, get_filter_index
+from incremental_stats import get_stats_store
+from model_registry import sales_forecast_frame
+from segment_forecast import segment_forecast_frame
+from segmentation import load_store_segments, segments_version
+from result_cache import cached
 from ai_insights import generate_advanced_insights
 from report_generator import generate_pdf_report
+from export import EXPORT_FORMATS, export_filename, export_mime, write_export
+from report_jobs import job_file, job_status, report_key, submit_report
+from instrumentation import begin_run, end_run, stage
 
 
 # ---------- AUTH GUARD ----------
@@ -23,6 +34,9 @@ st.session_state["username"] = user.get("username", "User")
 
 st.set_page_config(page_title="User Dashboard", layout="wide")
 
+# Stages below are timed into one run per rerun when instrumentation is enabled
+begin_run("user_dashboard")
+
 # ---------- SIDEBAR ----------
 role = st.session_state.get("role", "user")
 username = st.session_state.get("username", "User")
@@ -32,16 +46,16 @@ st.sidebar.markdown(f"🛡 Role: **{role.capitalize()}**")
 st.sidebar.markdown("---")
 
 # ---------- DATA ----------
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-DATA_PATH = os.path.join(BASE_DIR, "data", "final_data.csv")
-MODEL_PATH = os.path.join(BASE_DIR, "models", "sales_forecast_model.pkl")
-
 if not os.path.exists(DATA_PATH):
     st.error(f"File not found: {DATA_PATH}")
     st.stop()
 
-df = pd.read_csv(DATA_PATH)
-df["Date"] = pd.to_datetime(df["Date"])
+# Shared, version-aware copy -- do not mutate
+with stage("user.load"):
+    df, data_version = get_dataset(DATA_PATH)
+    cube, _ = get_cube(DATA_PATH)
+    filter_index = get_filter_index(DATA_PATH, FILTER_DIMENSIONS + ["Store_ID"])
+    store_segments = load_store_segments()
 
 # ---------- HEADER ----------
 st.title("📊 Retail Analytics Dashboard")
@@ -50,68 +64,115 @@ st.caption("Business performance insights")
 # ---------- FILTERS ----------
 st.sidebar.header("Filters")
 
-region = st.sidebar.selectbox("Region", ["All"] + sorted(df["Region"].unique()))
-category = st.sidebar.selectbox("Category", ["All"] + sorted(df["Product_Category"].unique()))
+region = st.sidebar.selectbox("Region", ["All"] + filter_index.values("Region"))
+category = st.sidebar.selectbox("Category", ["All"] + filter_index.values("Product_Category"))
+
+# Precomputed Store_ID -> cluster table; absent until segmentation.py has run
+segment = "All"
+stores = None
+if store_segments is not None:
+    segment = st.sidebar.selectbox("Store Segment", ["All"] + sorted(store_segments.unique().tolist()))
+    if segment != "All":
+        stores = store_segments.index[store_segments == segment].tolist()
 
-filtered = df.copy()
+# Queued and written in batches by a background thread
+log_page_view(st.session_state, username, "user_dashboard")
+log_filter_change(st.session_state, username, "user_dashboard",
+                  {"Region": region, "Category": category, "Segment": segment})
 
-if region != "All":
-    filtered = filtered[filtered["Region"] == region]
+# Index lookup + take of matching rows; unfiltered view is the shared frame itself
+with stage("user.filter"):
+    filtered = filter_index.apply(df, {"Region": region, "Product_Category": category, "Store_ID": stores})
 
-if category != "All":
-    filtered = filtered[filtered["Product_Category"] == category]
+    view = slice_cube(cube, region, category, stores)
+
+# Results below are shared with every session looking at the same view
+view_filters = {"Region": region, "Category": category, "Segment": segment, "Segments": segments_version()}
 
 # ---------- KPIs ----------
+with stage("user.kpis"):
+    stats = cached("user.kpis", data_version, view_filters, kpis, view)
+
 col1, col2, col3, col4 = st.columns(4)
-col1.metric("Revenue", f"{filtered['Revenue'].sum():,.0f}")
-col2.metric("Units Sold", f"{filtered['Units_Sold'].sum():,.0f}")
-col3.metric("Avg Discount", f"{filtered['Discount_Percentage'].mean():.2f}%")
-col4.metric("Rating", f"{filtered['Store_Rating'].mean():.2f}")
+col1.metric("Revenue", f"{stats['total_revenue']:,.0f}")
+col2.metric("Units Sold", f"{stats['units_sold']:,.0f}")
+col3.metric("Avg Discount", f"{stats['avg_discount']:.2f}%")
+col4.metric("Rating", f"{stats['avg_rating']:.2f}")
 
 st.markdown("---")
 
 # ---------- DASHBOARD CHARTS ----------
-st.subheader("Revenue by Region")
-fig1 = px.bar(filtered.groupby("Region")["Revenue"].sum().reset_index(),
-              x="Region", y="Revenue")
-st.plotly_chart(fig1, use_container_width=True)
-
-st.subheader("Revenue by Category")
-fig2 = px.bar(filtered.groupby("Product_Category")["Revenue"].sum().reset_index(),
-              x="Product_Category", y="Revenue")
-st.plotly_chart(fig2, use_container_width=True)
+with stage("user.charts"):
+    st.subheader("Revenue by Region")
+    fig1 = cached("user.fig_region", data_version, view_filters,
+                  lambda: bar_figure(rollup(view, "Region"), "Region", "Revenue"))
+    st.plotly_chart(fig1, use_container_width=True)
+
+    st.subheader("Revenue by Category")
+    fig2 = cached("user.fig_category", data_version, view_filters,
+                  lambda: bar_figure(rollup(view, "Product_Category"), "Product_Category", "Revenue"))
+    st.plotly_chart(fig2, use_container_width=True)
+
+    fig_segments = None
+    if store_segments is not None:
+        st.subheader("Revenue by Store Segment")
+        fig_segments = cached("user.fig_segments", data_version, view_filters, lambda: bar_figure(
+            rollup(view.assign(Segment=view["Store_ID"].map(store_segments)), "Segment"), "Segment", "Revenue"))
+        st.plotly_chart(fig_segments, use_container_width=True)
 
 # ---------- PDF EXTRA CHARTS ----------
 
 # Monthly Revenue Trend
-monthly = df.groupby(df["Date"].dt.to_period("M"))["Revenue"].sum().reset_index()
-monthly["Date"] = monthly["Date"].astype(str)
-fig_monthly = px.line(monthly, x="Date", y="Revenue")
-
-# Forecast dummy
-forecast_df = monthly.tail(6).copy()
-forecast_df["Revenue"] = forecast_df["Revenue"] * 1.05
-fig_forecast = px.line(forecast_df, x="Date", y="Revenue")
+with stage("user.pdf_charts"):
+    fig_monthly = cached("fig_monthly", data_version, None,
+                         lambda: line_figure(monthly_totals(cube), "Date", "Revenue"))
 
 # ---------- FORECAST SECTION ----------
 st.subheader("15-Day Sales Forecast")
 
-if os.path.exists(MODEL_PATH):
-    model = joblib.load(MODEL_PATH)
-    forecast = model.forecast(15)
+# Per-segment forecast from the nightly table; falls back to the overall model
+with stage("user.forecast"):
+    forecast_df = segment_forecast_frame(region, category)
 
-    future_dates = pd.date_range(start=df["Date"].max(), periods=15)
-    forecast_df = pd.DataFrame({"Date": future_dates, "Forecast": forecast})
+    if forecast_df is None:
+        forecast_df = sales_forecast_frame(df["Date"].max(), 15)
+    fig_forecast = None
 
-    fig3 = px.line(forecast_df, x="Date", y="Forecast", markers=True)
-    st.plotly_chart(fig3, use_container_width=True)
+    if forecast_df is not None:
+        fig_forecast = line_figure(forecast_df, "Date", "Forecast", markers=True)
+        st.plotly_chart(fig_forecast, use_container_width=True)
 
 # ---------- DATA EXPORT ----------
 with st.expander("View Sample Data"):
     st.dataframe(filtered.head(20))
 
-csv = filtered.to_csv(index=False).encode("utf-8")
-st.download_button("📥 Download Filtered Data", csv, "filtered.csv")
+# Written on demand in chunks by a background job; the file is reused per
+# (dataset version, filters incl. segments version, format) until it ages out
+# of the job cache
+export_format = st.selectbox("Export format", list(EXPORT_FORMATS))
+
+if st.button("Prepare Filtered Data Export"):
+    st.session_state["export_job"] = submit_report(
+        write_export,
+        report_key(data_version, view_filters, f"export:{export_format}", None),
+        export_filename("filtered", export_format),
+        df=filtered,
+        fmt=export_format
+    )
+
+export_job = job_status(st.session_state.get("export_job"))
+
+if export_job is not None:
+    if export_job["status"] in ("queued", "running"):
+        st.progress(export_job["progress"], text=export_job["message"])
+        st.button("🔄 Refresh export status")
+    elif export_job["status"] == "done":
+        st.download_button("📥 Download Filtered Data", job_file(export_job), file_name=export_job["filename"],
+                           mime=export_mime(export_job["filename"]))
+    elif export_job["status"] == "failed":
+        st.error(f"Export failed: {export_job['error']}")
+    else:
+        st.warning(export_job["message"])
 
 # ---------- LOGOUT ----------
 if st.sidebar.button("Logout"):
@@ -131,36 +192,67 @@ st.markdown(hide_style, unsafe_allow_html=True)
 st.markdown("---")
 st.subheader("📄 Generate Report")
 
+appendix = st.checkbox("Include full filtered data appendix")
+
 if st.button("Generate PDF Report"):
 
     charts = [
         ("Revenue by Region", fig1),
         ("Revenue by Category", fig2),
-        ("Monthly Revenue Trend", fig_monthly),
-        ("15-Day Sales Forecast", fig_forecast)
+        ("Monthly Revenue Trend", fig_monthly)
     ]
 
+    if fig_segments is not None:
+        charts.append(("Revenue by Store Segment", fig_segments))
+
+    if fig_forecast is not None:
+        charts.append(("15-Day Sales Forecast", fig_forecast))
+
     filters = {
         "Region": region,
-        "Category": category
+        "Category": category,
+        "Store Segment": segment
     }
 
-    path = generate_pdf_report(
+    st.session_state["report_job"] = submit_report(
+        generate_pdf_report,
+        report_key(data_version, {**view_filters, "Appendix": appendix}, "user", st.session_state["username"]),
+        f"Retail_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf",
         df=filtered,
         filters=filters,
         prepared_by=st.session_state["username"],
         charts=charts,
-        date_range=(filtered["Date"].min().date(), filtered["Date"].max().date())
+        cube=view,
+        date_range=(filtered["Date"].min().date(), filtered["Date"].max().date()),
+        appendix=appendix
     )
 
-    st.success("Report generated successfully!")
-    st.download_button("📥 Download Report", open(path, "rb"), file_name=os.path.basename(path))
+# Build runs in the background; the page only polls the job
+job = job_status(st.session_state.get("report_job"))
+
+if job is not None:
+    if job["status"] in ("queued", "running"):
+        st.progress(job["progress"], text=job["message"])
+        st.button("🔄 Refresh status")
+    elif job["status"] == "done":
+        st.download_button("📥 Download Report", job_file(job), file_name=job["filename"], mime="application/pdf")
+    elif job["status"] == "failed":
+        st.error(f"Report failed: {job['error']}")
+    else:
+        st.warning(job["message"])
 
 # ---------- AI INSIGHTS ----------
 st.markdown("---")
 st.subheader("🧠 AI Business Insights")
 
-insights, summary = generate_advanced_insights(filtered)
+with stage("user.insights"):
+    insights, summary = generate_advanced_insights(
+        filtered,
+        cube=view,
+        cache_key=(data_version, view_filters),
+        # The stats store is kept per region/category only
+        stats=get_stats_store(DATA_PATH).get(region, category) if stores is None else None
+    )
 
 st.markdown("### 📋 Executive Summary")
 st.info(summary)
@@ -168,3 +260,5 @@ st.info(summary)
 st.markdown("### 📌 Key Insights")
 for i in insights:
     st.write(i)
+
+end_run()
@@ -0,0 +1,226 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+
+# bcrypt off the request thread. Hashes and checks run in a process pool of
+# HASH_WORKERS processes (0 = inline, for tests); at most HASH_MAX_PENDING jobs
+# may be queued or running, and a caller that cannot get a slot within
+# HASH_QUEUE_TIMEOUT gets HashingBusy instead of piling up behind a burst.
+# BCRYPT_ROUNDS sets the cost of new hashes; older-cost hashes are upgraded on
+# the next successful login. LoginThrottle rejects attempts before any hashing.
+# TRUSTED_PROXIES lists the peer addresses whose X-Forwarded-For is believed.
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", str(max(HASH_WORKERS, 1) * 4)))
+HASH_QUEUE_TIMEOUT = float(os.getenv("HASH_QUEUE_TIMEOUT", "5"))
+TRUSTED_PROXIES = {p.strip() for p in os.getenv("TRUSTED_PROXIES", "").split(",") if p.strip()}
+
+_COST = re.compile(r"^\$2[abxy]?\$(\d\d)\$")
+
+_pool = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(HASH_MAX_PENDING)
+
+
+class HashingBusy(Exception):
+    pass
+
+
+# ---------- WORKER FUNCTIONS ----------
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _check(password, hashed):
+    try:
+        return bcrypt.checkpw(password.encode(), hashed.encode())
+    except ValueError:  # malformed stored hash
+        return False
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProcessPoolExecutor(max_workers=HASH_WORKERS)
+    return _pool
+
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def _run(fn, *args):
+    if HASH_WORKERS <= 0:
+        return fn(*args)
+
+    if not _slots.acquire(timeout=HASH_QUEUE_TIMEOUT):
+        raise HashingBusy("password hashing capacity exhausted")
+    try:
+        return _get_pool().submit(fn, *args).result()
+    except BrokenProcessPool:
+        _reset_pool()
+        raise
+    finally:
+        _slots.release()
+
+
+# ---------- PUBLIC API ----------
+def hash_password(password, rounds=None):
+    return _run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+
+def verify_password(password, hashed):
+    return _run(_check, password, hashed)
+
+
+def hash_cost(hashed):
+    match = _COST.match(hashed or "")
+    return int(match.group(1)) if match else None
+
+
+def needs_rehash(hashed, rounds=None):
+    return hash_cost(hashed) != (rounds or BCRYPT_ROUNDS)
+
+
+# Returns (ok, new_hash); new_hash is set when the stored cost is out of date
+def verify_and_upgrade(password, hashed):
+    if not verify_password(password, hashed):
+        return False, None
+    if needs_rehash(hashed):
+        return True, hash_password(password)
+    return True, None
+
+
+# ---------- THROTTLING ----------
+class SlidingWindow:
+
+    # At most max_keys keys are tracked. Keys are kept in hit order, so when
+    # full the least recently hit (idle) key is dropped in O(1), and random
+    # usernames cannot grow memory forever
+    def __init__(self, limit, window, max_keys=100_000):
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._events = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _trim(self, key, now):
+        events = self._events[key]
+        while events and events[0] <= now - self.window:
+            events.popleft()
+        if not events:
+            del self._events[key]
+        return events
+
+    def _append(self, key, now):
+        if key not in self._events:
+            while len(self._events) >= self.max_keys:
+                self._events.popitem(last=False)
+        self._events.setdefault(key, deque()).append(now)
+        self._events.move_to_end(key)
+
+    def __len__(self):
+        return len(self._events)
+
+    # Seconds until `key` may try again; 0 when allowed
+    def retry_after(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            if key not in self._events:
+                return 0.0
+            events = self._trim(key, now)
+            if len(events) < self.limit:
+                return 0.0
+            return events[0] + self.window - now
+
+    def hit(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            if key in self._events:
+                self._trim(key, now)
+            self._append(key, now)
+
+    # Check and record in one step; False (nothing recorded) when over the limit
+    def try_hit(self, key, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            if key in self._events and len(self._trim(key, now)) >= self.limit:
+                return False
+            self._append(key, now)
+            return True
+
+    # Takes back the most recent hit
+    def cancel(self, key):
+        with self._lock:
+            events = self._events.get(key)
+            if events:
+                events.pop()
+                if not events:
+                    del self._events[key]
+
+    def reset(self, key):
+        with self._lock:
+            self._events.pop(key, None)
+
+
+class LoginThrottle:
+
+    # Login attempts per username (cleared by a success), and all attempts per
+    # client IP. Both are counted before any hashing.
+    def __init__(self, user_failures=5, user_window=900, ip_attempts=30, ip_window=60):
+        self.users = SlidingWindow(user_failures, user_window)
+        self.ips = SlidingWindow(ip_attempts, ip_window)
+
+    def retry_after(self, username, ip=None):
+        wait = self.users.retry_after(username)
+        if ip:
+            wait = max(wait, self.ips.retry_after(ip))
+        return wait
+
+    def attempt(self, username, ip=None):
+        if ip and not self.ips.try_hit(ip):
+            return False
+        return self.users.try_hit(username)
+
+    def result(self, username, ok):
+        if ok:
+            self.users.reset(username)
+
+    # The attempt never reached a password check (e.g. HashingBusy)
+    def cancel(self, username):
+        self.users.cancel(username)
+
+
+# Address to throttle on. The peer address is used as-is unless it is a
+# trusted proxy; then the right-most X-Forwarded-For hop that is not itself a
+# trusted proxy is taken, since hops further left are client-supplied.
+def client_address(peer, forwarded=None, trusted=None):
+    trusted = TRUSTED_PROXIES if trusted is None else trusted
+    if not peer or peer not in trusted or not forwarded:
+        return peer
+    hops = [h.strip() for h in forwarded.split(",") if h.strip()]
+    for hop in reversed(hops):
+        if hop not in trusted:
+            return hop
+    return peer
+
+
+throttle = LoginThrottle(
+    user_failures=int(os.getenv("LOGIN_MAX_FAILURES", "5")),
+    user_window=float(os.getenv("LOGIN_FAILURE_WINDOW", "900")),
+    ip_attempts=int(os.getenv("LOGIN_MAX_ATTEMPTS_PER_IP", "30")),
+    ip_window=float(os.getenv("LOGIN_IP_WINDOW", "60")),
+)
@@ -0,0 +1,201 @@
+import numpy as np
+import pandas as pd
+
+# Table layout shared by report_generator and admin_report. Columns are
+# formatted a chunk at a time with vectorized pandas string ops, and rows are
+# drawn with plain text/line/rect primitives instead of one bordered cell()
+# per value, so a 50k-row appendix renders in seconds. Only one chunk of
+# formatted strings is alive at a time.
+
+CHUNK_ROWS = 1_000
+CELL_PADDING = 1.0
+
+# (column, share of the page width, kind); kind picks formatter and alignment
+DATA_COLUMNS = [
+    ("Date", 0.10, "date"),
+    ("Store_ID", 0.10, "text"),
+    ("Store_Location", 0.16, "text"),
+    ("Product_Category", 0.18, "text"),
+    ("Brand", 0.12, "text"),
+    ("Units_Sold", 0.08, "int"),
+    ("Revenue", 0.14, "money"),
+    ("Region", 0.12, "text"),
+]
+
+RIGHT_ALIGNED = {"int", "money"}
+
+HEADER_FILL = (230, 238, 249)
+ZEBRA_FILL = (245, 245, 245)
+GRID_COLOR = (0, 0, 0)
+
+_THOUSANDS = r"\B(?=(\d{3})+$)"
+
+
+# ---------- FORMATTING ----------
+# Round |x| * 100 to integer cents the way "{:.2f}" does: half-even on the
+# exact binary value. x * 100 is rounded once in float; the Dekker product
+# error tells which way a tie produced by that rounding really goes.
+def _cents(x):
+    p = x * 100
+    c = 134217729.0 * x
+    hi = c - (c - x)
+    err = (hi * 100 - p) + (x - hi) * 100
+
+    cents = np.rint(p)
+    cents += np.where((p - cents == 0.5) & (err > 0), 1, 0)
+    cents -= np.where((p - cents == -0.5) & (err < 0), 1, 0)
+    return cents.astype(np.int64)
+
+
+# "{:,.2f}" for a whole column: integer cents, then the whole part gets its
+# separators and the cents are zero-padded with string ops
+def format_money(values):
+    numbers = pd.to_numeric(values).astype(float)
+    cents = _cents(numbers.fillna(0).abs().to_numpy())
+
+    whole = pd.Series(cents // 100, index=values.index).astype(str).str.replace(_THOUSANDS, ",", regex=True)
+    fraction = pd.Series(cents % 100, index=values.index).astype(str).str.zfill(2)
+    sign = pd.Series(np.where(np.signbit(numbers.to_numpy()), "-", ""), index=values.index)
+
+    return (sign + whole + "." + fraction).mask(numbers.isna())
+
+
+def format_column(values, kind, max_chars):
+    if kind == "date":
+        text = pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+    elif kind == "money":
+        text = format_money(values)
+    elif kind == "int":
+        text = values.astype("Int64").astype("string")
+    else:
+        text = values.astype(str)
+
+    return text.fillna("").str.slice(0, max_chars)
+
+
+# Widths of formatted numbers from per-glyph widths: digits share one width in
+# the core fonts, so only separators and signs need counting.
+def numeric_widths(text, glyphs):
+    widths = text.str.len() * glyphs["0"]
+    for ch in ",.-":
+        widths += text.str.count(f"\\{ch}") * (glyphs[ch] - glyphs["0"])
+    return widths.to_numpy(dtype=float)
+
+
+# ---------- LAYOUT ----------
+class TableLayout:
+
+    def __init__(self, pdf, columns=DATA_COLUMNS, row_height=8, font_size=9):
+        self.pdf = pdf
+        self.columns = columns
+        self.row_height = row_height
+        self.font_size = font_size
+
+        page_width = pdf.w - pdf.l_margin - pdf.r_margin
+        total_share = sum(share for _, share, _ in columns)
+        self.widths = [page_width * share / total_share for _, share, _ in columns]
+        self.x = [pdf.l_margin + sum(self.widths[:i]) for i in range(len(columns))]
+
+        # Header labels are fixed; measure them once in the bold font
+        pdf.set_font("Arial", "B", font_size)
+        self.labels = [name.replace("_", " ") for name, _, _ in columns]
+        self.label_widths = [pdf.get_string_width(label) for label in self.labels]
+
+        # Characters that fit a column, from the width of a wide glyph in the body font
+        pdf.set_font("Arial", size=font_size)
+        self.glyphs = {ch: pdf.get_string_width(ch) for ch in "0,.-E"}
+        self.max_chars = [max(int((w - 2 * CELL_PADDING) / self.glyphs["E"]), 1) for w in self.widths]
+
+        # Baseline offset that vertically centres capitals in a row (pdf.k: points per unit)
+        self.baseline = (row_height + 0.7 * font_size / pdf.k) / 2
+
+    @property
+    def bottom(self):
+        return self.pdf.h - self.pdf.b_margin
+
+    def header(self):
+        pdf = self.pdf
+        y = pdf.get_y()
+
+        pdf.set_font("Arial", "B", self.font_size)
+        pdf.set_fill_color(*HEADER_FILL)
+        pdf.set_draw_color(*GRID_COLOR)
+
+        for label, label_width, x, w in zip(self.labels, self.label_widths, self.x, self.widths):
+            pdf.rect(x, y, w, self.row_height, style="DF")
+            pdf.text(x + (w - label_width) / 2, y + self.baseline, label)
+
+        pdf.set_y(y + self.row_height)
+        pdf.set_font("Arial", size=self.font_size)
+
+    # Grid for the rows drawn on the current page, in one pass per page
+    def _grid(self, top, y):
+        pdf = self.pdf
+        if y <= top:
+            return
+
+        left, right = self.x[0], self.x[-1] + self.widths[-1]
+        for x in self.x + [right]:
+            pdf.line(x, top, x, y)
+
+        row_y = top + self.row_height
+        while row_y <= y + 0.01:
+            pdf.line(left, row_y, right, row_y)
+            row_y += self.row_height
+
+    def rows(self, df, zebra=True, progress=None):
+        pdf = self.pdf
+        total = len(df)
+        kinds = [kind for _, _, kind in self.columns]
+        names = [name for name, _, _ in self.columns]
+        left, right = self.x[0], self.x[-1] + self.widths[-1]
+
+        if pdf.get_y() + 2 * self.row_height > self.bottom:
+            pdf.add_page(orientation=pdf.cur_orientation)
+        self.header()
+
+        top = y = pdf.get_y()
+        shaded = False
+
+        for start in range(0, total, CHUNK_ROWS):
+            chunk = df.iloc[start:start + CHUNK_ROWS]
+            text = [format_column(chunk[name], kind, n)
+                    for name, kind, n in zip(names, kinds, self.max_chars)]
+
+            # Right-aligned columns: x offset from the vectorized string widths
+            offsets = [
+                w - CELL_PADDING - numeric_widths(col, self.glyphs) if kind in RIGHT_ALIGNED else None
+                for col, kind, w in zip(text, kinds, self.widths)
+            ]
+            cells = [col.to_numpy(dtype=object) for col in text]
+
+            for r in range(len(chunk)):
+                if y + self.row_height > self.bottom:
+                    self._grid(top, y)
+                    pdf.add_page(orientation=pdf.cur_orientation)
+                    self.header()
+                    top = y = pdf.get_y()
+
+                if zebra and shaded:
+                    pdf.set_fill_color(*ZEBRA_FILL)
+                    pdf.rect(left, y, right - left, self.row_height, style="F")
+                shaded = not shaded
+
+                for c, x in enumerate(self.x):
+                    value = cells[c][r]
+                    if value:
+                        dx = offsets[c][r] if offsets[c] is not None else CELL_PADDING
+                        pdf.text(x + dx, y + self.baseline, value)
+
+                y += self.row_height
+
+            if progress:
+                progress(min(start + CHUNK_ROWS, total) / total)
+
+        self._grid(top, y)
+        pdf.set_y(y)
+
+
+def draw_table(pdf, df, columns=DATA_COLUMNS, row_height=8, font_size=9, zebra=True, progress=None):
+    columns = [col for col in columns if col[0] in df.columns]
+    TableLayout(pdf, columns, row_height, font_size).rows(df, zebra=zebra, progress=progress)
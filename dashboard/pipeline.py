@@ -0,0 +1,308 @@
+import argparse
+import copy
+import hashlib
+import inspect
+import json
+import os
+import time
+import warnings
+
+import joblib
+import pandas as pd
+
+from dataset import CATEGORICAL_COLUMNS, DATA_DIR, DATA_PATH, content_hash, file_stamp
+from model_registry import MODEL_DIR
+
+# Replaces notebooks 01-05: raw CSV -> clean -> features -> {publish, forecast, clustering}.
+# Every stage is keyed on a hash of its code, parameters and inputs; a stage whose
+# key matches the manifest is skipped. Intermediates are Parquet, not CSV.
+#
+#   python dashboard/pipeline.py                       # run everything that changed
+#   python dashboard/pipeline.py clustering --set clustering.n_clusters=4
+#   python dashboard/pipeline.py --force features
+
+# ---------- PATHS ----------
+RAW_PATH = os.path.join(DATA_DIR, "Retail_Sales_Data.csv")
+PIPELINE_DIR = os.path.join(DATA_DIR, "pipeline")
+MANIFEST_PATH = os.path.join(PIPELINE_DIR, "manifest.json")
+
+FORECAST_MODEL_PATH = os.path.join(MODEL_DIR, "sales_forecast_model.pkl")
+CLUSTER_MODEL_PATH = os.path.join(MODEL_DIR, "kmeans_store_segmentation.pkl")
+SEGMENT_STATE_PATH = os.path.join(MODEL_DIR, "store_segmentation_state.pkl")
+SEGMENT_LOOKUP_PATH = os.path.join(MODEL_DIR, "store_segments.parquet")
+
+# ---------- PARAMETERS ----------
+PARAMS = {
+    "clean": {"drop_duplicates": True},
+    "features": {},
+    "publish": {},
+    "forecast": {"order": [5, 1, 0]},
+    "clustering": {
+        "n_clusters": 3,
+        "random_state": 42,
+        "features": {"Revenue": "sum", "Units_Sold": "sum", "Store_Rating": "mean"},
+    },
+}
+
+
+# ---------- STAGES ----------
+def stage_clean(ctx):
+    df = pd.read_csv(
+        ctx.source("raw"),
+        dtype={col: "category" for col in CATEGORICAL_COLUMNS},
+    )
+    df["Date"] = pd.to_datetime(df["Date"])
+
+    if ctx.params["drop_duplicates"]:
+        df = df.drop_duplicates(ignore_index=True)
+    return df
+
+
+def stage_features(ctx):
+    df = ctx.frame("clean").copy()
+
+    df["Year"] = df["Date"].dt.year
+    df["Month"] = df["Date"].dt.month
+    df["DayOfWeek"] = df["Date"].dt.day_name()
+    df["Is_Weekend"] = df["Date"].dt.weekday >= 5
+    return df
+
+
+def stage_publish(ctx):
+    _atomic(DATA_PATH, lambda tmp: ctx.frame("features").to_csv(tmp, index=False))
+
+
+def stage_forecast(ctx):
+    from statsmodels.tsa.arima.model import ARIMA
+
+    df = ctx.frame("features")
+    daily_sales = df.groupby("Date")["Revenue"].sum()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        model_fit = ARIMA(daily_sales, order=tuple(ctx.params["order"])).fit()
+
+    _atomic(FORECAST_MODEL_PATH, lambda tmp: joblib.dump(model_fit, tmp))
+
+
+def stage_clustering(ctx):
+    from sklearn.cluster import KMeans
+    from segmentation import StoreSegmentation
+
+    df = ctx.frame("features")
+    store_data = df.groupby("Store_ID").agg(ctx.params["features"])
+
+    kmeans = KMeans(n_clusters=ctx.params["n_clusters"], random_state=ctx.params["random_state"])
+    store_data["Cluster"] = kmeans.fit_predict(store_data)
+
+    _atomic(CLUSTER_MODEL_PATH, lambda tmp: joblib.dump(kmeans, tmp))
+
+    # Incremental state + Store_ID lookup for the dashboard, seeded from this fit
+    StoreSegmentation(
+        n_clusters=kmeans.n_clusters,
+        random_state=ctx.params["random_state"],
+        seed_centers=kmeans.cluster_centers_,
+    ).update(df).save(SEGMENT_STATE_PATH, SEGMENT_LOOKUP_PATH)
+
+    return store_data.reset_index()
+
+
+# name -> upstream stages, external sources, function, files it writes besides its Parquet
+STAGES = {
+    "clean": {"deps": [], "sources": {"raw": RAW_PATH}, "run": stage_clean, "artifacts": []},
+    "features": {"deps": ["clean"], "sources": {}, "run": stage_features, "artifacts": []},
+    "publish": {"deps": ["features"], "sources": {}, "run": stage_publish, "artifacts": [DATA_PATH]},
+    "forecast": {"deps": ["features"], "sources": {}, "run": stage_forecast, "artifacts": [FORECAST_MODEL_PATH]},
+    "clustering": {"deps": ["features"], "sources": {}, "run": stage_clustering,
+                   "artifacts": [CLUSTER_MODEL_PATH, SEGMENT_STATE_PATH, SEGMENT_LOOKUP_PATH]},
+}
+
+
+# ---------- HELPERS ----------
+def _atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def stage_output(name):
+    return os.path.join(PIPELINE_DIR, f"{name}.parquet")
+
+
+def _load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {"stages": {}, "sources": {}}
+    with open(MANIFEST_PATH) as f:
+        return json.load(f)
+
+
+def _save_manifest(manifest):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+    _atomic(MANIFEST_PATH, write)
+
+
+# Content hash of an external file, re-hashed only when its mtime/size changes
+def _source_hash(path, manifest):
+    stamp = list(file_stamp(path))
+    known = manifest["sources"].get(path)
+    if known and known["stamp"] == stamp:
+        return known["hash"]
+
+    digest = content_hash(path)
+    manifest["sources"][path] = {"stamp": stamp, "hash": digest}
+    return digest
+
+
+def execution_order(targets):
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        seen.add(name)
+        for dep in STAGES[name]["deps"]:
+            visit(dep)
+        order.append(name)
+
+    for name in targets:
+        visit(name)
+    return order
+
+
+class StageContext:
+
+    def __init__(self, name, params, frames, sources):
+        self.name = name
+        self.params = params
+        self._frames = frames
+        self._sources = sources
+
+    def source(self, key):
+        return self._sources[key]
+
+    # Upstream output: in memory if produced this run, else read from Parquet
+    def frame(self, name):
+        if name not in self._frames:
+            self._frames[name] = pd.read_parquet(stage_output(name))
+        return self._frames[name]
+
+
+# ---------- RUNNER ----------
+def run_pipeline(targets=None, params=None, sources=None, force=(), log=print):
+    params = params or PARAMS
+    targets = targets or list(STAGES)
+    force = set(force)
+
+    manifest = _load_manifest()
+    keys, frames, report = {}, {}, []
+
+    for name in execution_order(targets):
+        stage = STAGES[name]
+        stage_sources = {k: (sources or {}).get(k, v) for k, v in stage["sources"].items()}
+
+        h = hashlib.sha1()
+        h.update(inspect.getsource(stage["run"]).encode())
+        h.update(json.dumps(params.get(name, {}), sort_keys=True).encode())
+        for dep in stage["deps"]:
+            h.update(keys[dep].encode())
+        for key, path in sorted(stage_sources.items()):
+            h.update(f"{key}={_source_hash(path, manifest)}".encode())
+        keys[name] = h.hexdigest()[:16]
+
+        previous = manifest["stages"].get(name, {})
+        outputs = list(stage["artifacts"])
+        if previous.get("has_frame"):
+            outputs.append(stage_output(name))
+
+        up_to_date = (
+            name not in force
+            and previous.get("key") == keys[name]
+            and all(os.path.exists(p) for p in outputs)
+        )
+        if up_to_date:
+            log(f"[skip] {name}")
+            report.append((name, "skipped", 0.0))
+            continue
+
+        started = time.time()
+        ctx = StageContext(name, params.get(name, {}), frames, stage_sources)
+        result = stage["run"](ctx)
+
+        if result is not None:
+            frames[name] = result
+            os.makedirs(PIPELINE_DIR, exist_ok=True)
+            _atomic(stage_output(name), lambda tmp: result.to_parquet(tmp, index=False))
+
+        seconds = round(time.time() - started, 2)
+        manifest["stages"][name] = {
+            "key": keys[name],
+            "has_frame": result is not None,
+            "seconds": seconds,
+            "finished": time.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        _save_manifest(manifest)
+
+        log(f"[run]  {name} ({seconds}s)")
+        report.append((name, "ran", seconds))
+
+    _save_manifest(manifest)
+    return report
+
+
+# ---------- CLI ----------
+def _parse_overrides(pairs):
+    params = copy.deepcopy(PARAMS)
+
+    for pair in pairs:
+        dotted, _, raw = pair.partition("=")
+        stage, _, key = dotted.partition(".")
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        params.setdefault(stage, {})[key] = value
+    return params
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the retail data pipeline.")
+    parser.add_argument("targets", nargs="*",
+                        help=f"stages to build with their dependencies: {', '.join(STAGES)} (default all)")
+    parser.add_argument("--raw", default=RAW_PATH, help="raw sales CSV")
+    parser.add_argument("--set", nargs="*", default=[], metavar="STAGE.KEY=VALUE",
+                        help="override a stage parameter, e.g. clustering.n_clusters=4")
+    parser.add_argument("--force", nargs="*", default=None, metavar="STAGE",
+                        help="re-run these stages even if cached (no names = all)")
+    parser.add_argument("--list", action="store_true", help="show stages and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in execution_order(list(STAGES)):
+            print(f"{name:<12} <- {', '.join(STAGES[name]['deps']) or 'raw'}")
+        return
+
+    unknown = [name for name in args.targets + (args.force or []) if name not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}")
+
+    if args.force is None:
+        force = ()
+    else:
+        force = args.force or list(STAGES)
+
+    started = time.time()
+    run_pipeline(
+        targets=args.targets or None,
+        params=_parse_overrides(args.set),
+        sources={"raw": args.raw},
+        force=force,
+    )
+    print(f"Pipeline finished in {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
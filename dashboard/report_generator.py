@@ -1,9 +1,13 @@
 import os
 import tempfile
 from datetime import datetime
-import pandas as pd
 from fpdf import FPDF
 
+from chart_renderer import png_stream, render_charts
+from cube import build_cube, kpis, top_value
+from instrumentation import timed
+from pdf_table import draw_table
+
 
 # ================= PDF CLASS =================
 class PDF(FPDF):
@@ -46,11 +50,15 @@ def section_title(pdf, title):
     pdf.ln(6)
 
 
-def generate_executive_summary(df):
-    revenue = df["Revenue"].sum()
-    units = df["Units_Sold"].sum()
-    best_region = df.groupby("Region")["Revenue"].sum().idxmax()
-    best_category = df.groupby("Product_Category")["Revenue"].sum().idxmax()
+def generate_executive_summary(df, cube=None):
+    if cube is None:
+        cube = build_cube(df)
+
+    stats = kpis(cube)
+    revenue = stats["total_revenue"]
+    units = stats["units_sold"]
+    best_region = top_value(cube, "Region")
+    best_category = top_value(cube, "Product_Category")
 
     return (
         f"This report presents a comprehensive analysis of retail performance based on the selected filters. "
@@ -61,15 +69,20 @@ def generate_executive_summary(df):
     )
 
 
-def kpi_table(pdf, df):
+def kpi_table(pdf, df, cube=None):
+    if cube is None:
+        cube = build_cube(df)
+
+    stats = kpis(cube)
+
     pdf.set_font("Arial", "B", 10)
     pdf.set_fill_color(245, 245, 245)
 
     data = [
-        ("Total Revenue", f"{df['Revenue'].sum():,.0f}"),
-        ("Units Sold", f"{df['Units_Sold'].sum():,.0f}"),
-        ("Average Discount", f"{df['Discount_Percentage'].mean():.2f}%"),
-        ("Average Store Rating", f"{df['Store_Rating'].mean():.2f}")
+        ("Total Revenue", f"{stats['total_revenue']:,.0f}"),
+        ("Units Sold", f"{stats['units_sold']:,.0f}"),
+        ("Average Discount", f"{stats['avg_discount']:.2f}%"),
+        ("Average Store Rating", f"{stats['avg_rating']:.2f}")
     ]
 
     col_widths = [80, 60]
@@ -84,7 +97,17 @@ def kpi_table(pdf, df):
 
 
 # ================= MAIN PDF =================
-def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None):
+# output_path: where to write (default: timestamped file in the temp dir)
+# progress: optional callback(fraction, message), used by report_jobs
+# appendix: add every filtered row as a table at the end
+@timed("report.user_pdf")
+def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None, cube=None,
+                        output_path=None, progress=None, appendix=False):
+    progress = progress or (lambda fraction, message=None: None)
+
+    # KPIs and summary are answered from the cube; build it once if the caller has none
+    if cube is None:
+        cube = build_cube(df)
 
     pdf = PDF()
     pdf.set_auto_page_break(auto=True, margin=20)
@@ -108,7 +131,7 @@ def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None):
     pdf.set_fill_color(248, 249, 250)
     pdf.multi_cell(
         0, 8,
-        generate_executive_summary(df),
+        generate_executive_summary(df, cube),
         border=0,
         fill=True
     )
@@ -117,29 +140,30 @@ def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None):
 
     # -------- BUSINESS OVERVIEW --------
     section_title(pdf, "Business Overview")
-    kpi_table(pdf, df)
+    kpi_table(pdf, df, cube)
+    progress(0.2, "Rendering charts")
 
     # -------- VISUAL INSIGHTS --------
     if charts:
         pdf.add_page()
         section_title(pdf, "Visual Insights")
 
-        tmp = tempfile.mkdtemp()
+        # All charts render in parallel (or come from the cache) before layout
+        images = render_charts([fig for _, fig in charts], scale=2)
+        progress(0.8, "Laying out charts")
 
-        for title, fig in charts:
+        for (title, _), png in zip(charts, images):
             if pdf.get_y() > 140:
                 pdf.add_page()
 
             pdf.set_font("Arial", "B", 11)
             pdf.cell(0, 8, title, ln=True)
 
-            img_path = os.path.join(tmp, f"{title}.png")
-            fig.write_image(img_path, scale=2)
-
-            pdf.image(img_path, x=15, w=180)
+            pdf.image(png_stream(png), x=15, w=180)
             pdf.ln(12)
 
     # -------- DATA PREVIEW (LANDSCAPE FIX) --------
+    progress(0.9, "Writing data preview")
     pdf.add_page(orientation="L")
 
     pdf.set_left_margin(10)
@@ -147,56 +171,14 @@ def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None):
     pdf.set_top_margin(15)
 
     section_title(pdf, "Data Preview (Top 15 Records)")
+    draw_table(pdf, df.head(15))
 
-    preview = df.head(15).copy()
-    preview["Date"] = pd.to_datetime(preview["Date"]).dt.strftime("%Y-%m-%d")
-    preview["Revenue"] = preview["Revenue"].map(lambda x: f"{x:,.2f}")
-    preview["Units_Sold"] = preview["Units_Sold"].astype(int)
-
-    cols = [
-        "Date", "Store_ID", "Store_Location",
-        "Product_Category", "Brand",
-        "Units_Sold", "Revenue", "Region"
-    ]
-
-    page_width = pdf.w - pdf.l_margin - pdf.r_margin
-    col_widths = [
-        page_width * 0.10,
-        page_width * 0.10,
-        page_width * 0.16,
-        page_width * 0.18,
-        page_width * 0.12,
-        page_width * 0.08,
-        page_width * 0.14,
-        page_width * 0.12
-    ]
-
-    row_height = 8
-
-    # Header
-    pdf.set_font("Arial", "B", 9)
-    pdf.set_fill_color(230, 238, 249)
-
-    for i, col in enumerate(cols):
-        pdf.cell(col_widths[i], row_height, col.replace("_", " "), border=1, align="C", fill=True)
-    pdf.ln()
-
-    # Rows
-    pdf.set_font("Arial", size=9)
-    fill = False
-
-    for _, row in preview.iterrows():
-        pdf.set_fill_color(245, 245, 245) if fill else pdf.set_fill_color(255, 255, 255)
-
-        for i, col in enumerate(cols):
-            align = "R" if col in ["Units_Sold", "Revenue"] else "L"
-            text = str(row[col])[:40]
-            pdf.cell(col_widths[i], row_height, text, border=1, align=align, fill=True)
-        pdf.ln()
-        fill = not fill
-
-
-
+    # -------- APPENDIX --------
+    if appendix:
+        pdf.add_page(orientation="L")
+        section_title(pdf, f"Appendix: Filtered Data ({len(df):,} Records)")
+        draw_table(pdf, df, row_height=6, font_size=7,
+                   progress=lambda done: progress(0.9 + 0.09 * done, "Writing appendix"))
 
     # -------- PREPARED BY --------
     pdf.ln(12)
@@ -204,8 +186,10 @@ def generate_pdf_report(df, filters, prepared_by, charts=None, date_range=None):
     pdf.cell(0, 6, f"Prepared by: {prepared_by}", ln=True)
 
     # -------- SAVE --------
-    filename = f"Retail_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    path = os.path.join(tempfile.gettempdir(), filename)
+    path = output_path
+    if path is None:
+        filename = f"Retail_Report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+        path = os.path.join(tempfile.gettempdir(), filename)
     pdf.output(path)
 
     return path
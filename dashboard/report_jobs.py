@@ -0,0 +1,155 @@
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from result_cache import normalize_filters
+
+# Background PDF builds for both dashboards. A page submits a report and gets a
+# job id back immediately; the build runs on a small worker pool and the page
+# polls status/progress. Finished PDFs stay on disk in a bounded cache keyed by
+# (dataset version, filters, report type, user), so asking again for the same
+# report returns the existing file, and a request identical to one still
+# running joins that job instead of starting another.
+# Data exports (export.write_export) run through the same queue and cache.
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+MAX_CACHED_REPORTS = 32
+MAX_TRACKED_JOBS = 256
+REPORT_DIR = os.path.join(tempfile.gettempdir(), "retail_reports")
+
+QUEUED, RUNNING, DONE, FAILED, EXPIRED = "queued", "running", "done", "failed", "expired"
+
+_jobs = OrderedDict()  # job id -> ReportJob
+_by_key = OrderedDict()  # report key -> job id (queued, running or done)
+_lock = threading.Lock()
+
+_pool = ThreadPoolExecutor(max_workers=REPORT_WORKERS, thread_name_prefix="report")
+
+
+# ---------- JOB ----------
+class ReportJob:
+
+    def __init__(self, job_id, key, filename):
+        self.id = job_id
+        self.key = key
+        self.filename = filename
+        self.path = os.path.join(REPORT_DIR, job_id, filename)
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a worker"
+        self.error = None
+        self.submitted = time.time()
+        self.finished = None
+
+    # Progress callback handed to the report builder
+    def update(self, fraction, message=None):
+        self.progress = max(self.progress, min(float(fraction), 1.0))
+        if message:
+            self.message = message
+
+    def snapshot(self):
+        status = self.status
+        if status == DONE and not os.path.exists(self.path):
+            status = EXPIRED
+
+        return {
+            "id": self.id,
+            "status": status,
+            "progress": self.progress,
+            "message": self.message,
+            "path": self.path if status == DONE else None,
+            "filename": self.filename,
+            "error": self.error,
+            "seconds": round((self.finished or time.time()) - self.submitted, 2),
+        }
+
+
+# Filters are normalized like result_cache keys so dict order / value types do not matter
+def report_key(version, filters, kind, user):
+    return version, normalize_filters(filters), kind, user
+
+
+# ---------- RUNNER ----------
+def _run(job, build, kwargs):
+    job.status = RUNNING
+    job.update(0.0, "Building report")
+
+    try:
+        os.makedirs(os.path.dirname(job.path), exist_ok=True)
+        build(**kwargs, output_path=job.path, progress=job.update)
+    except Exception as exc:
+        job.status = FAILED
+        job.error = f"{type(exc).__name__}: {exc}"
+        job.message = "Report failed"
+        with _lock:
+            if _by_key.get(job.key) == job.id:
+                del _by_key[job.key]
+    else:
+        job.update(1.0, "Report ready")
+        job.status = DONE
+    finally:
+        job.finished = time.time()
+        with _lock:
+            _evict()
+
+
+def _remove_files(job):
+    try:
+        os.remove(job.path)
+        os.rmdir(os.path.dirname(job.path))
+    except OSError:
+        pass
+
+
+# Called with _lock held
+def _evict():
+    done = [key for key, job_id in _by_key.items() if _jobs[job_id].status == DONE]
+    for key in done[:max(len(done) - MAX_CACHED_REPORTS, 0)]:
+        job = _jobs[_by_key.pop(key)]
+        job.status = EXPIRED
+        job.message = "Report expired, generate it again"
+        _remove_files(job)
+
+    finished = [job_id for job_id, job in _jobs.items()
+                if job.status in (DONE, FAILED, EXPIRED) and _by_key.get(job.key) != job_id]
+    for job_id in finished[:max(len(_jobs) - MAX_TRACKED_JOBS, 0)]:
+        _remove_files(_jobs.pop(job_id))
+
+
+# build: generate_pdf_report / generate_admin_report; kwargs are its arguments
+# minus output_path and progress, which the job supplies.
+def submit_report(build, key, filename, **kwargs):
+    with _lock:
+        job_id = _by_key.get(key)
+        if job_id is not None:
+            job = _jobs[job_id]
+            if job.status != DONE or os.path.exists(job.path):
+                _by_key.move_to_end(key)
+                return job_id
+
+        job = ReportJob(uuid.uuid4().hex, key, filename)
+        _jobs[job.id] = job
+        _by_key[key] = job.id
+
+    _pool.submit(_run, job, build, kwargs)
+    return job.id
+
+
+def job_status(job_id):
+    job = _jobs.get(job_id)
+    return job.snapshot() if job is not None else None
+
+
+# For st.download_button(data=...): the finished file is read only when the
+# user clicks, not on every rerun of the page that shows the button
+def job_file(job):
+    path = job["path"]
+
+    def read():
+        with open(path, "rb") as f:
+            return f.read()
+    return read
@@ -0,0 +1,178 @@
+import os
+import sys
+import threading
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future
+
+import numpy as np
+
+from instrumentation import count
+
+# One process-wide cache for derived results (KPI blocks, chart frames and
+# figures, insights, forecasts, rendered chart PNGs), shared by every session.
+# Keys are (version, name, normalized filters): the same view of the same data
+# is computed once no matter how many users ask for it, and concurrent misses
+# on one key wait for a single computation instead of repeating it.
+#
+# Entries are sized when stored and evicted least-recently-used first once the
+# total passes RESULT_CACHE_MB; a result larger than the whole budget is
+# returned but not kept. invalidate(version=...) drops everything derived from
+# a dataset version -- dataset.get_dataset calls it when the file changes.
+#
+# Cached values are shared between sessions: treat them as read-only.
+
+BUDGET_BYTES = int(float(os.getenv("RESULT_CACHE_MB", "256")) * 1024 * 1024)
+
+
+# ---------- KEYS ----------
+# Filter dicts compare equal regardless of order and value type ("All" vs "All", 5 vs "5")
+def normalize_filters(filters):
+    return tuple(sorted((k, str(v)) for k, v in (filters or {}).items()))
+
+
+def make_key(name, version, filters=None):
+    return version, name, normalize_filters(filters)
+
+
+# ---------- SIZING ----------
+def size_of(value, _depth=0):
+    if hasattr(value, "memory_usage") and callable(value.memory_usage):  # DataFrame / Series
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if hasattr(usage, "sum") else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, bytearray, str)):
+        return sys.getsizeof(value)
+    if hasattr(value, "to_plotly_json"):  # plotly figure
+        return size_of(value.to_plotly_json(), _depth + 1)
+    if _depth < 6 and isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(k, _depth + 1) + size_of(v, _depth + 1)
+                                          for k, v in value.items())
+    if _depth < 6 and isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(size_of(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+# ---------- CACHE ----------
+class ResultCache:
+
+    def __init__(self, budget_bytes=BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._pending = {}  # key -> Future of a computation in flight
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0})
+
+    def _store(self, key, value):
+        size = size_of(value)
+        name = key[1]
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+
+            if size > self.budget_bytes:
+                self._stats[name]["uncacheable"] += 1
+                return
+
+            self._entries[key] = (value, size)
+            self._bytes += size
+
+            while self._bytes > self.budget_bytes:
+                old_key, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self._stats[old_key[1]]["evictions"] += 1
+
+    def get(self, name, version, filters=None, default=None):
+        key = make_key(name, version, filters)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats[name]["hits"] += 1
+                return self._entries[key][0]
+        return default
+
+    def put(self, name, version, filters, value):
+        self._store(make_key(name, version, filters), value)
+        return value
+
+    # Returns the cached result for the key, or runs compute(*args, **kwargs) once
+    def get_or_compute(self, name, version, filters, compute, *args, **kwargs):
+        key = make_key(name, version, filters)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats[name]["hits"] += 1
+                count("result_cache.hit")
+                return self._entries[key][0]
+
+            self._stats[name]["misses"] += 1
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        count("result_cache.miss")
+
+        # Another session is already computing this key: share its result
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute(*args, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            self._store(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    # Drops entries by dataset version and/or name; no arguments clears everything
+    def invalidate(self, version=None, name=None):
+        with self._lock:
+            stale = [key for key in self._entries
+                     if (version is None or key[0] == version) and (name is None or key[1] == name)]
+            for key in stale:
+                self._bytes -= self._entries.pop(key)[1]
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            per_name = {name: dict(s) for name, s in self._stats.items()}
+            entries = defaultdict(lambda: [0, 0])
+            for (_, name, _), (_, size) in self._entries.items():
+                entries[name][0] += 1
+                entries[name][1] += size
+
+        for name, (n, size) in entries.items():
+            per_name.setdefault(name, {"hits": 0, "misses": 0, "evictions": 0, "uncacheable": 0})
+            per_name[name].update(entries=n, bytes=size)
+
+        hits = sum(s["hits"] for s in per_name.values())
+        misses = sum(s["misses"] for s in per_name.values())
+        return {
+            "entries": sum(n for n, _ in entries.values()),
+            "bytes": sum(size for _, size in entries.values()),
+            "budget_bytes": self.budget_bytes,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "by_name": per_name,
+        }
+
+
+cache = ResultCache()
+
+
+def cached(name, version, filters, compute, *args, **kwargs):
+    return cache.get_or_compute(name, version, filters, compute, *args, **kwargs)
+
+
+def invalidate(version=None, name=None):
+    return cache.invalidate(version, name)
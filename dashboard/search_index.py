@@ -0,0 +1,124 @@
+import threading
+
+import numpy as np
+
+from dataset import DATA_PATH, appended_since, get_dataset
+from filter_engine import build_postings
+
+# ---------- SEARCHABLE COLUMNS ----------
+# Only distinct values are indexed, so adding e.g. "Brand" or "Store_ID" costs
+# one postings build per dataset version, not a scan per keystroke.
+SEARCH_COLUMNS = ["Store_Location", "Product_Category"]
+
+_indexes = {}  # (dataset version, columns) -> SearchIndex
+_lock = threading.Lock()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# ---------- INDEX ----------
+class SearchIndex:
+
+    def __init__(self, df, columns=SEARCH_COLUMNS):
+        self.n_rows = len(df)
+        self.entries = []   # (column, value, lowercased text)
+        self.postings = []  # row positions per entry
+        self.trigrams = {}  # trigram -> set of entry ids
+
+        for col in columns:
+            for value, rows in build_postings(df[col]).items():
+                entry_id = len(self.entries)
+                text = str(value).lower()
+
+                self.entries.append((col, value, text))
+                self.postings.append(rows)
+
+                for gram in _trigrams(text):
+                    self.trigrams.setdefault(gram, set()).add(entry_id)
+
+    # New index covering `rows` appended after the rows this one was built on;
+    # only values first seen in the batch get new entries and trigrams
+    def extended(self, rows):
+        index = SearchIndex.__new__(SearchIndex)
+        index.n_rows = self.n_rows + len(rows)
+        index.entries = list(self.entries)
+        index.postings = list(self.postings)
+        index.trigrams = {gram: set(ids) for gram, ids in self.trigrams.items()}
+
+        ids = {(col, value): entry_id for entry_id, (col, value, _) in enumerate(self.entries)}
+        for col in dict.fromkeys(col for col, _, _ in self.entries):
+            for value, positions in build_postings(rows[col]).items():
+                positions = positions + self.n_rows
+                entry_id = ids.get((col, value))
+
+                if entry_id is not None:
+                    index.postings[entry_id] = np.concatenate([index.postings[entry_id], positions])
+                    continue
+
+                entry_id = len(index.entries)
+                text = str(value).lower()
+                index.entries.append((col, value, text))
+                index.postings.append(positions)
+                for gram in _trigrams(text):
+                    index.trigrams.setdefault(gram, set()).add(entry_id)
+        return index
+
+    def _candidates(self, query):
+        if len(query) < 3:
+            return range(len(self.entries))
+
+        grams = sorted((self.trigrams.get(g, set()) for g in _trigrams(query)), key=len)
+        if not grams[0]:
+            return []
+        return set.intersection(*grams)
+
+    # Case-insensitive plain substring match over the distinct values
+    def matches(self, query):
+        query = query.lower()
+        return [
+            entry_id for entry_id in self._candidates(query)
+            if query in self.entries[entry_id][2]
+        ]
+
+    def rows(self, query):
+        if not query:
+            return None  # empty search -> every row
+
+        hits = [self.postings[entry_id] for entry_id in self.matches(query)]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        if len(hits) == 1:
+            return hits[0]
+        return np.unique(np.concatenate(hits))
+
+    def apply(self, df, query):
+        rows = self.rows(query)
+        return df if rows is None else df.take(rows)
+
+
+def get_search_index(path=DATA_PATH, columns=SEARCH_COLUMNS):
+    df, version = get_dataset(path)
+    key = (version, tuple(columns))
+
+    index = _indexes.get(key)
+    if index is not None:
+        return index
+
+    with _lock:
+        index = _indexes.get(key)
+        if index is None:
+            previous = None
+            for stale in [k for k in _indexes if k[0] != version]:
+                if stale[1] == key[1]:
+                    previous = (stale[0], _indexes[stale])
+                del _indexes[stale]
+
+            start = previous and appended_since(path, previous[0], version)
+            if start is not None and start == previous[1].n_rows:
+                index = previous[1].extended(df.iloc[start:])
+            else:
+                index = SearchIndex(df, columns)
+            _indexes[key] = index
+    return index
@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from batch_forecaster import fit_batch
+from cube import build_cube
+from dataset import DATA_PATH, file_stamp, get_dataset
+from model_registry import MODEL_DIR
+
+# ---------- SETTINGS ----------
+FORECAST_TABLE = os.path.join(MODEL_DIR, "segment_forecasts.parquet")
+
+ARIMA_ORDER = (5, 1, 0)   # same model as notebooks/04_forecasting.ipynb
+HORIZON = 15
+MIN_HISTORY_DAYS = 30
+
+# "arima" fits statsmodels per series in a process pool; the others fit every
+# pending series at once with batch_forecaster
+ENGINES = ["arima", "ar", "holt_winters"]
+
+# Segment type -> cube dimensions it is grouped by
+SEGMENT_TYPES = {
+    "Total": [],
+    "Region": ["Region"],
+    "Product_Category": ["Product_Category"],
+    "Region_Category": ["Region", "Product_Category"],
+    "Store_ID": ["Store_ID"],
+}
+SEGMENT_COLUMNS = ["Region", "Product_Category", "Store_ID"]
+
+TABLE_COLUMNS = [
+    "Segment_Type", "Segment", *SEGMENT_COLUMNS,
+    "Series_Hash", "Step", "Date", "Forecast",
+]
+
+_table = {"stamp": None, "df": None}
+_table_lock = threading.Lock()
+
+
+def segment_key(dims):
+    if not dims:
+        return "All"
+    return "|".join(f"{k}={v}" for k, v in dims.items())
+
+
+# ---------- SERIES ----------
+# Daily revenue per segment, on a continuous calendar (missing days = 0), and
+# the number of days the segment actually has rows for
+def iter_segment_series(cube, segment_types=SEGMENT_TYPES):
+    calendar = pd.date_range(cube["Date"].min(), cube["Date"].max(), freq="D")
+
+    for seg_type in segment_types:
+        by = SEGMENT_TYPES[seg_type]
+        daily = cube.groupby(by + ["Date"], observed=True)["Revenue_sum"].sum()
+
+        if not by:
+            groups = [((), daily)]
+        else:
+            groups = daily.groupby(level=by, observed=True)
+
+        for values, part in groups:
+            values = values if isinstance(values, tuple) else (values,)
+            dims = dict(zip(by, values))
+            series = part.droplevel(by) if by else part
+            observed = len(series)
+            series = series.reindex(calendar, fill_value=0.0)
+            yield seg_type, dims, series, observed
+
+
+def series_hash(series, order, horizon, engine="arima"):
+    h = hashlib.sha1()
+    h.update(str((series.index[0], len(series), order, horizon, engine)).encode())
+    h.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()[:16]
+
+
+# ---------- FITTING (runs in worker processes) ----------
+def _fit_arima(task):
+    segment, values, order, horizon = task
+    from statsmodels.tsa.arima.model import ARIMA
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        try:
+            fit = ARIMA(values, order=order).fit()
+            return segment, np.asarray(fit.forecast(horizon), dtype=float), None
+        except Exception as e:
+            return segment, None, str(e)
+
+
+def _fit_pool(tasks, workers):
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+        yield from pool.map(_fit_arima, tasks, chunksize=chunksize)
+
+
+def _fit_vectorized(tasks, engine):
+    if not tasks:
+        return
+
+    order, horizon = tasks[0][2], tasks[0][3]
+    params = {"p": order[0], "d": order[1]} if engine == "ar" else {}
+
+    Y = np.vstack([values for _, values, _, _ in tasks])
+    forecasts = fit_batch(engine, Y, **params).forecast(horizon)
+
+    for (segment, _, _, _), forecast in zip(tasks, forecasts):
+        yield segment, forecast, None
+
+
+# ---------- BATCH JOB ----------
+def _load_previous(output):
+    if not os.path.exists(output):
+        return pd.DataFrame(columns=TABLE_COLUMNS)
+    return pd.read_parquet(output)
+
+
+def run_segment_forecasts(df, output=FORECAST_TABLE, segment_types=SEGMENT_TYPES,
+                          order=ARIMA_ORDER, horizon=HORIZON, workers=None,
+                          force=False, min_history=MIN_HISTORY_DAYS, engine="arima"):
+    started = time.time()
+    cube = build_cube(df)
+
+    previous = _load_previous(output)
+    previous_hashes = {} if force else previous.groupby("Segment")["Series_Hash"].first().to_dict()
+
+    kept, tasks, meta = [], [], {}
+
+    for seg_type, dims, series, observed in iter_segment_series(cube, segment_types):
+        # Sparse segments would be fitted mostly on calendar padding
+        if observed < min_history:
+            continue
+
+        segment = f"{seg_type}:{segment_key(dims)}"
+        digest = series_hash(series, order, horizon, engine)
+
+        # Unchanged series: reuse last run's rows
+        if previous_hashes.get(segment) == digest:
+            kept.append(segment)
+            continue
+
+        meta[segment] = (seg_type, dims, digest, series.index[-1])
+        tasks.append((segment, series.to_numpy(dtype=float), order, horizon))
+
+    rows, failed = [], []
+
+    if engine == "arima":
+        results = _fit_pool(tasks, workers)
+    else:
+        results = _fit_vectorized(tasks, engine)
+
+    for segment, forecast, error in results:
+        if forecast is None:
+            failed.append((segment, error))
+            continue
+
+        seg_type, dims, digest, last_day = meta[segment]
+        dates = pd.date_range(last_day + pd.Timedelta(days=1), periods=horizon)
+
+        rows.append(pd.DataFrame({
+            "Segment_Type": seg_type,
+            "Segment": segment,
+            **{col: dims.get(col) for col in SEGMENT_COLUMNS},
+            "Series_Hash": digest,
+            "Step": np.arange(1, horizon + 1),
+            "Date": dates,
+            "Forecast": forecast,
+        }))
+
+    # A failed refit keeps the segment's last good rows (with their old hash,
+    # so the next run tries again)
+    reused = previous[
+        previous["Segment"].isin(kept + [segment for segment, _ in failed])
+        | ~previous["Segment_Type"].isin(segment_types)
+    ]
+    table = pd.concat([reused, *rows], ignore_index=True)[TABLE_COLUMNS]
+    for col in SEGMENT_COLUMNS:
+        table[col] = table[col].astype("string")
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp = f"{output}.{os.getpid()}.tmp"
+    table.to_parquet(tmp, index=False)
+    os.replace(tmp, output)
+
+    return {
+        "fitted": len(rows),
+        "reused": len(kept),
+        "failed": failed,
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+# ---------- DASHBOARD LOOKUP ----------
+def load_forecast_table(path=FORECAST_TABLE):
+    if not os.path.exists(path):
+        return None
+
+    stamp = file_stamp(path)
+    if _table["stamp"] == stamp:
+        return _table["df"]
+
+    with _table_lock:
+        if _table["stamp"] != stamp:
+            _table["df"] = pd.read_parquet(path)
+            _table["stamp"] = stamp
+    return _table["df"]
+
+
+# Forecast for the dashboard's Region/Category selection, or None if not in the table
+def segment_forecast_frame(region="All", category="All", path=FORECAST_TABLE):
+    table = load_forecast_table(path)
+    if table is None:
+        return None
+
+    dims = {}
+    if region != "All":
+        dims["Region"] = region
+    if category != "All":
+        dims["Product_Category"] = category
+
+    seg_type = {
+        (): "Total",
+        ("Region",): "Region",
+        ("Product_Category",): "Product_Category",
+        ("Region", "Product_Category"): "Region_Category",
+    }[tuple(dims)]
+
+    rows = table[table["Segment"] == f"{seg_type}:{segment_key(dims)}"]
+    if rows.empty:
+        return None
+
+    return rows[["Date", "Forecast"]].reset_index(drop=True)
+
+
+# ---------- CLI ----------
+def main():
+    parser = argparse.ArgumentParser(description="Fit per-segment sales forecasts in parallel.")
+    parser.add_argument("--data", default=DATA_PATH)
+    parser.add_argument("--output", default=FORECAST_TABLE)
+    parser.add_argument("--types", nargs="+", default=list(SEGMENT_TYPES), choices=list(SEGMENT_TYPES))
+    parser.add_argument("--horizon", type=int, default=HORIZON)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", default="arima", choices=ENGINES)
+    parser.add_argument("--force", action="store_true", help="refit every series")
+    args = parser.parse_args()
+
+    df, _ = get_dataset(args.data)
+    result = run_segment_forecasts(
+        df,
+        output=args.output,
+        segment_types=args.types,
+        horizon=args.horizon,
+        workers=args.workers,
+        force=args.force,
+        engine=args.engine,
+    )
+
+    print(f"Fitted {result['fitted']} series, reused {result['reused']} "
+          f"unchanged, {len(result['failed'])} failed in {result['seconds']}s")
+    for segment, error in result["failed"]:
+        print(f"  {segment}: {error}")
+
+
+if __name__ == "__main__":
+    main()
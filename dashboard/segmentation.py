@@ -0,0 +1,202 @@
+import argparse
+import os
+import threading
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+
+from dataset import DATA_PATH, file_stamp, get_dataset
+from model_registry import MODEL_DIR
+
+# ---------- PATHS ----------
+KMEANS_PATH = os.path.join(MODEL_DIR, "kmeans_store_segmentation.pkl")
+STATE_PATH = os.path.join(MODEL_DIR, "store_segmentation_state.pkl")
+LOOKUP_PATH = os.path.join(MODEL_DIR, "store_segments.parquet")
+
+# Same per-store features as notebooks/05_clustering.ipynb, all three divided by
+# the number of days seen so far. Revenue and units per day stay put as history
+# grows, which incremental updates rely on. Dividing every feature by the same
+# number is a uniform rescaling, so a full-history fit groups stores exactly as
+# the notebook's unscaled KMeans does; dividing only the sums would shrink them
+# against Store_Rating and change the grouping. Incremental centres are running
+# averages over earlier batches and can drift from that; --rebuild refits.
+FEATURES = ["Revenue", "Units_Sold", "Store_Rating"]
+N_CLUSTERS = 3
+BATCH_SIZE = 4096
+
+_lookup = {"stamp": None, "series": None}
+_lookup_lock = threading.Lock()
+
+
+# ---------- PER-STORE ACCUMULATORS ----------
+# Sums and counts, so a new batch of rows folds in without re-reading history
+def store_totals(rows):
+    grouped = rows.groupby("Store_ID", observed=True)
+    return pd.DataFrame({
+        "Revenue": grouped["Revenue"].sum(),
+        "Units_Sold": grouped["Units_Sold"].sum(),
+        "Rating_Sum": grouped["Store_Rating"].sum(),
+        "Rating_Count": grouped["Store_Rating"].count(),
+    })
+
+
+def _features(totals, n_days):
+    rating = totals["Rating_Sum"] / totals["Rating_Count"].where(totals["Rating_Count"] > 0)
+    return np.column_stack([
+        totals["Revenue"].to_numpy(dtype=float) / n_days,
+        totals["Units_Sold"].to_numpy(dtype=float) / n_days,
+        rating.fillna(0.0).to_numpy(dtype=float) / n_days,
+    ])
+
+
+# ---------- SEGMENTATION ----------
+class StoreSegmentation:
+
+    # seed_centers: centres of a full KMeans fit on the notebook's (unscaled) features
+    def __init__(self, n_clusters=N_CLUSTERS, random_state=42, seed_centers=None):
+        self.n_clusters = n_clusters
+        self.random_state = random_state
+        self.seed_centers = seed_centers
+        self.model = None
+        self.totals = pd.DataFrame(columns=["Revenue", "Units_Sold", "Rating_Sum", "Rating_Count"])
+        self.first_day = None
+        self.last_day = None
+        self.clusters = pd.Series(dtype="int64", name="Cluster")
+        self.fitted = False
+
+    # Start from the full KMeans fit the pipeline / notebook saved
+    @classmethod
+    def from_kmeans(cls, path=KMEANS_PATH):
+        kmeans = joblib.load(path)
+        return cls(n_clusters=kmeans.n_clusters, seed_centers=np.asarray(kmeans.cluster_centers_, dtype=float))
+
+    @property
+    def n_days(self):
+        if self.first_day is None:
+            return 1
+        return (self.last_day - self.first_day).days + 1
+
+    def _make_model(self):
+        init = "k-means++"
+        if self.seed_centers is not None:
+            init = self.seed_centers.copy()
+            init /= self.n_days
+
+        return MiniBatchKMeans(
+            n_clusters=self.n_clusters,
+            random_state=self.random_state,
+            batch_size=BATCH_SIZE,
+            init=init,
+            n_init=1 if self.seed_centers is not None else 3,
+        )
+
+    def update(self, rows):
+        batch = store_totals(rows)
+        if batch.empty:
+            return self
+
+        dates = pd.to_datetime(rows["Date"])
+        first, last = dates.min(), dates.max()
+        self.first_day = first if self.first_day is None else min(self.first_day, first)
+        self.last_day = last if self.last_day is None else max(self.last_day, last)
+
+        self.totals = batch if self.totals.empty else self.totals.add(batch, fill_value=0)
+        touched = self.totals.loc[batch.index]
+        X = _features(touched, self.n_days)
+
+        # partial_fit needs at least n_clusters samples on the first call
+        if not self.fitted and len(X) < self.n_clusters:
+            return self
+
+        if self.model is None:
+            self.model = self._make_model()
+        self.model.partial_fit(X)
+        self.fitted = True
+
+        # Centres moved: relabel every store in one vectorized predict
+        self.clusters = self.assign(self.totals)
+        return self
+
+    # Batch assignment of (new) stores to the current centres
+    def assign(self, totals):
+        if totals.empty:
+            return pd.Series(dtype="int64", name="Cluster")
+        labels = self.model.predict(_features(totals, self.n_days))
+        return pd.Series(labels, index=totals.index, name="Cluster")
+
+    def lookup(self):
+        return self.clusters.rename_axis("Store_ID").reset_index()
+
+    def save(self, state_path=STATE_PATH, lookup_path=LOOKUP_PATH):
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+        tmp = f"{state_path}.{os.getpid()}.tmp"
+        joblib.dump(self, tmp)
+        os.replace(tmp, state_path)
+
+        table = self.lookup()
+        tmp = f"{lookup_path}.{os.getpid()}.tmp"
+        table.to_parquet(tmp, index=False)
+        os.replace(tmp, lookup_path)
+
+
+def load_segmentation(state_path=STATE_PATH, kmeans_path=KMEANS_PATH):
+    if os.path.exists(state_path):
+        return joblib.load(state_path)
+    if os.path.exists(kmeans_path):
+        return StoreSegmentation.from_kmeans(kmeans_path)
+    return StoreSegmentation()
+
+
+# ---------- DASHBOARD LOOKUP ----------
+# Store_ID -> cluster, read from the precomputed table; no model runs at request time
+# Changes whenever the lookup file is rewritten; part of result cache keys
+def segments_version(path=LOOKUP_PATH):
+    return "|".join(map(str, file_stamp(path))) if os.path.exists(path) else None
+
+
+def load_store_segments(path=LOOKUP_PATH):
+    if not os.path.exists(path):
+        return None
+
+    stamp = file_stamp(path)
+    if _lookup["stamp"] == stamp:
+        return _lookup["series"]
+
+    with _lookup_lock:
+        if _lookup["stamp"] != stamp:
+            table = pd.read_parquet(path)
+            _lookup["series"] = table.set_index("Store_ID")["Cluster"]
+            _lookup["stamp"] = stamp
+    return _lookup["series"]
+
+
+# ---------- CLI ----------
+def main():
+    parser = argparse.ArgumentParser(description="Build or incrementally update store segments.")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--rebuild", action="store_true",
+                      help="segment the full dataset, seeded from the saved KMeans if present")
+    mode.add_argument("--append", metavar="CSV", help="fold new sales rows into the saved state")
+    parser.add_argument("--data", default=DATA_PATH, help="dataset used by --rebuild")
+    args = parser.parse_args()
+
+    started = time.time()
+    if args.rebuild:
+        seg = StoreSegmentation.from_kmeans() if os.path.exists(KMEANS_PATH) else StoreSegmentation()
+        rows, _ = get_dataset(args.data)
+    else:
+        seg = load_segmentation()
+        rows = pd.read_csv(args.append)
+
+    seg.update(rows).save()
+
+    counts = seg.clusters.value_counts().sort_index().to_dict()
+    print(f"{len(seg.clusters)} stores segmented {counts} in {time.time() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
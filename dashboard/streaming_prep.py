@@ -0,0 +1,285 @@
+import argparse
+import glob
+import math
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from dataset import DATA_DIR
+
+# Out-of-core version of notebooks 01 + 03 for raw exports that do not fit in RAM.
+#
+# Pass 1 streams the raw CSV in chunks, derives the date features per chunk,
+# hashes every row and appends it to one of N hash buckets on disk. Identical
+# rows always land in the same bucket. Pass 2 loads one bucket at a time and
+# keeps the first occurrence of each row; the hash only picks the bucket, rows
+# count as duplicates when their values are equal. Pass 3 k-way merges the
+# deduplicated buckets on the input row number, so the output store (and the
+# CSV export) keeps the input order. Chunk size and bucket count are both
+# derived from memory_mb (the working set on top of the interpreter and
+# library baseline), so peak memory depends on the budget, not on the input size.
+#
+#   python dashboard/streaming_prep.py --memory-mb 512 --csv data/final_data.csv
+
+RAW_PATH = os.path.join(DATA_DIR, "Retail_Sales_Data.csv")
+OUTPUT_DIR = os.path.join(DATA_DIR, "final_data_parts")
+
+DEFAULT_MEMORY_MB = 512
+SAMPLE_ROWS = 5_000
+
+# Share of the budget one chunk / one bucket may take once loaded; the rest
+# covers pandas temporaries (hashing, sorting, Parquet encoding).
+WORKING_SET_FRACTION = 0.25
+
+_HASH = "_row_hash"
+_SEQ = "_row_seq"
+
+# Derived columns get fixed dtypes too; NaT dates would otherwise turn
+# Year/Month into floats in some chunks only
+FEATURE_DTYPES = {
+    "Date": "datetime64[ns]",
+    "Year": "Int64",
+    "Month": "Int64",
+    "DayOfWeek": "string",
+    "Is_Weekend": "boolean",
+}
+
+
+# ---------- FEATURES ----------
+def add_date_features(chunk):
+    dates = pd.to_datetime(chunk["Date"])
+    chunk["Date"] = dates
+    chunk["Year"] = dates.dt.year
+    chunk["Month"] = dates.dt.month
+    chunk["DayOfWeek"] = dates.dt.day_name()
+    chunk["Is_Weekend"] = dates.dt.weekday >= 5
+    return chunk
+
+
+# ---------- SIZING ----------
+def _csv_bytes_per_row(path, rows):
+    with open(path, "rb") as f:
+        f.readline()  # header
+        sizes = [len(f.readline()) for _ in range(rows)]
+    sizes = [size for size in sizes if size]
+    return sum(sizes) / len(sizes) if sizes else 1.0
+
+
+# Fixed per-column dtypes so every chunk (and every Parquet part) has one schema
+def _column_dtypes(sample):
+    dtypes = {}
+    for col, dtype in sample.dtypes.items():
+        if sample[col].isna().all():
+            dtypes[col] = "string"  # no values to infer from
+        elif pd.api.types.is_integer_dtype(dtype):
+            dtypes[col] = "Int64"
+        elif pd.api.types.is_bool_dtype(dtype):
+            dtypes[col] = "boolean"
+        elif pd.api.types.is_float_dtype(dtype):
+            dtypes[col] = "float64"
+        else:
+            dtypes[col] = "string"
+    return dtypes
+
+
+def plan(raw_path, memory_mb=DEFAULT_MEMORY_MB):
+    sample = pd.read_csv(raw_path, nrows=SAMPLE_ROWS)
+    if sample.empty:
+        return {"chunk_rows": 1_000, "buckets": 1, "dtypes": {}}
+
+    dtypes = _column_dtypes(sample)
+    mem_per_row = add_date_features(sample).memory_usage(deep=True).sum() / len(sample)
+    est_rows = os.path.getsize(raw_path) / _csv_bytes_per_row(raw_path, len(sample))
+
+    budget = memory_mb * 1024 * 1024 * WORKING_SET_FRACTION
+
+    return {
+        "chunk_rows": max(int(budget / mem_per_row), 1_000),
+        "buckets": max(math.ceil(est_rows * mem_per_row / budget), 1),
+        "dtypes": dtypes,
+    }
+
+
+# ---------- PASS 1: CHUNK -> HASH BUCKETS ----------
+def _scatter(raw_path, staging, chunk_rows, buckets, dtypes):
+    seq = 0
+    raw_columns = None
+
+    for part, chunk in enumerate(pd.read_csv(raw_path, chunksize=chunk_rows, dtype=dtypes)):
+        if raw_columns is None:
+            raw_columns = list(chunk.columns)
+
+        hashes = pd.util.hash_pandas_object(chunk[raw_columns], index=False).to_numpy()
+        chunk = add_date_features(chunk)
+        chunk = chunk.astype({col: dtype for col, dtype in FEATURE_DTYPES.items() if col in chunk})
+        chunk[_HASH] = hashes
+        chunk[_SEQ] = np.arange(seq, seq + len(chunk), dtype=np.int64)
+        seq += len(chunk)
+
+        bucket_ids = hashes % np.uint64(buckets)
+        for bucket, rows in chunk.groupby(bucket_ids, sort=False):
+            target = os.path.join(staging, f"bucket-{int(bucket):05d}")
+            os.makedirs(target, exist_ok=True)
+            rows.to_parquet(os.path.join(target, f"part-{part:06d}.parquet"), index=False)
+
+    return seq, raw_columns or []
+
+
+# ---------- PASS 2: DEDUPE EACH BUCKET ----------
+# Writes each bucket back sorted by _row_seq, in row groups of batch_rows
+def _dedupe(staging, raw_columns, drop_duplicates, batch_rows):
+    sources = []
+
+    for bucket_dir in sorted(glob.glob(os.path.join(staging, "bucket-*"))):
+        rows = pd.concat(
+            (pd.read_parquet(p) for p in sorted(glob.glob(os.path.join(bucket_dir, "*.parquet")))),
+            ignore_index=True,
+        )
+        rows = rows.sort_values(_SEQ, kind="stable")
+
+        if drop_duplicates:
+            # Equal hashes are only candidates; the values decide
+            rows = rows[~rows.duplicated(subset=[_HASH] + raw_columns, keep="first")]
+
+        path = bucket_dir + ".parquet"
+        rows.drop(columns=[_HASH]).to_parquet(path, index=False, row_group_size=batch_rows)
+        sources.append(path)
+        shutil.rmtree(bucket_dir)
+
+    return sources
+
+
+# ---------- PASS 3: MERGE BUCKETS BACK INTO INPUT ORDER ----------
+# Block-wise k-way merge: one row group per bucket is held at a time, and every
+# row up to the smallest "last _row_seq" among them can be emitted safely
+def _merge(sources, output_dir, part_rows):
+    files = [pq.ParquetFile(path) for path in sources]
+    next_group = [0] * len(files)
+    buffers = {}
+
+    def refill(i):
+        if next_group[i] < files[i].num_row_groups:
+            buffers[i] = files[i].read_row_group(next_group[i]).to_pandas()
+            next_group[i] += 1
+        else:
+            buffers.pop(i, None)
+
+    for i in range(len(files)):
+        refill(i)
+
+    pending, pending_rows, part, kept = [], 0, 0, 0
+
+    def flush():
+        nonlocal pending, pending_rows, part, kept
+        rows = pd.concat(pending, ignore_index=True).sort_values(_SEQ, kind="stable")
+        rows.drop(columns=[_SEQ]).to_parquet(os.path.join(output_dir, f"part-{part:06d}.parquet"), index=False)
+        kept += len(rows)
+        part += 1
+        pending, pending_rows = [], 0
+
+    while buffers:
+        frontier = min(rows[_SEQ].iloc[-1] for rows in buffers.values())
+        for i, rows in list(buffers.items()):
+            cut = int(rows[_SEQ].searchsorted(frontier, side="right"))
+            if cut:
+                pending.append(rows.iloc[:cut])
+                pending_rows += cut
+            if cut == len(rows):
+                refill(i)
+            else:
+                buffers[i] = rows.iloc[cut:]
+        if pending_rows >= part_rows:
+            flush()
+
+    if pending_rows:
+        flush()
+
+    for path in sources:
+        os.remove(path)
+
+    return kept
+
+
+def stream_prepare(raw_path=RAW_PATH, output_dir=OUTPUT_DIR, memory_mb=DEFAULT_MEMORY_MB,
+                   drop_duplicates=True, chunk_rows=None, buckets=None):
+    started = time.time()
+    sizing = plan(raw_path, memory_mb)
+    chunk_rows = chunk_rows or sizing["chunk_rows"]
+    buckets = buckets or sizing["buckets"]
+
+    staging = output_dir.rstrip(os.sep) + ".staging"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    read, raw_columns = _scatter(raw_path, staging, chunk_rows, buckets, sizing["dtypes"])
+    # One row group per bucket is in memory during the merge: ~chunk_rows total
+    batch_rows = max(chunk_rows // buckets, 1_000)
+    sources = _dedupe(staging, raw_columns, drop_duplicates, batch_rows)
+
+    # Build the new store next to the old one and swap it in at the end
+    building = output_dir.rstrip(os.sep) + ".building"
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+    kept = _merge(sources, building, chunk_rows)
+
+    shutil.rmtree(staging, ignore_errors=True)
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(building, output_dir)
+
+    return {
+        "rows_read": read,
+        "rows_written": kept,
+        "duplicates_dropped": read - kept,
+        "chunk_rows": chunk_rows,
+        "buckets": buckets,
+        "seconds": round(time.time() - started, 2),
+    }
+
+
+# Streams the partitioned store into one CSV, one partition at a time; parts
+# are numbered in input order
+def export_csv(parts_dir, csv_path):
+    tmp = f"{csv_path}.{os.getpid()}.tmp"
+    header = True
+
+    with open(tmp, "w", newline="") as f:
+        for part in sorted(glob.glob(os.path.join(parts_dir, "part-*.parquet"))):
+            pd.read_parquet(part).to_csv(f, index=False, header=header)
+            header = False
+
+    os.replace(tmp, csv_path)
+
+
+# ---------- CLI ----------
+def main():
+    parser = argparse.ArgumentParser(description="Chunked cleaning + feature engineering with bounded memory.")
+    parser.add_argument("--raw", default=RAW_PATH)
+    parser.add_argument("--output", default=OUTPUT_DIR, help="partitioned Parquet output directory")
+    parser.add_argument("--memory-mb", type=int, default=DEFAULT_MEMORY_MB, help="peak working-set budget")
+    parser.add_argument("--chunk-rows", type=int, help="override the derived chunk size")
+    parser.add_argument("--buckets", type=int, help="override the derived bucket count")
+    parser.add_argument("--keep-duplicates", action="store_true")
+    parser.add_argument("--csv", help="also export the result as one CSV (e.g. data/final_data.csv)")
+    args = parser.parse_args()
+
+    result = stream_prepare(
+        args.raw,
+        args.output,
+        memory_mb=args.memory_mb,
+        drop_duplicates=not args.keep_duplicates,
+        chunk_rows=args.chunk_rows,
+        buckets=args.buckets,
+    )
+    print(result)
+
+    if args.csv:
+        export_csv(args.output, args.csv)
+        print(f"Exported {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the dashboard modules the same way the Streamlit pages do
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DASHBOARD_DIR = os.path.join(ROOT_DIR, "dashboard")
+
+for path in (ROOT_DIR, DASHBOARD_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+# Small seeded dataset in the final_data.csv layout
+@pytest.fixture
+def sales():
+    from benchmarks.generator import COLUMNS, Universe
+    from streaming_prep import add_date_features
+
+    world = Universe(seed=7, stores=4, products=50, days=90)
+    return add_date_features(world.block(0, 3_000))[COLUMNS]
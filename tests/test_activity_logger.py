@@ -0,0 +1,50 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from activity_logger import ActivityLogger
+
+
+def _blocked_connection(release):
+    @contextmanager
+    def connect():
+        release.wait()
+
+        class Cursor:
+            def executemany(self, sql, rows):
+                pass
+
+        class Connection:
+            def cursor(self):
+                return Cursor()
+
+        yield Connection()
+    return connect
+
+
+def test_flush_and_close_give_up_when_the_queue_stays_full():
+    release = threading.Event()
+    logger = ActivityLogger(batch_size=1, flush_interval=0.01, max_queue=2,
+                            connect=_blocked_connection(release))
+    # The worker is stuck writing the first event; the next two fill the queue
+    for i in range(3):
+        logger.log("alice", f"action {i}")
+        time.sleep(0.02)
+
+    started = time.monotonic()
+    assert logger.flush(timeout=0.2) is False
+    logger.close(timeout=0.2)
+    assert time.monotonic() - started < 1.0
+    release.set()
+
+
+def test_flush_writes_everything_queued_before_it():
+    release = threading.Event()
+    release.set()
+    logger = ActivityLogger(batch_size=100, flush_interval=60, connect=_blocked_connection(release))
+    for i in range(10):
+        logger.log("alice", f"action {i}")
+
+    assert logger.flush(timeout=2) is True
+    assert logger.stats()["written"] == 10
+    logger.close()
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+from ai_insights import generate_advanced_insights
+from cube import build_cube
+from incremental_stats import SalesStatsStore
+
+
+# The original row-level version: every statistic straight off the rows
+def _reference(df):
+    dates = pd.to_datetime(df["Date"])
+    monthly = df.groupby(dates.dt.to_period("M"))["Revenue"].sum()
+    growth = (monthly.iloc[-1] - monthly.iloc[-2]) / monthly.iloc[-2] * 100
+
+    region = df.groupby("Region", observed=True)["Revenue"].sum()
+    category = df.groupby("Product_Category", observed=True)["Revenue"].sum()
+    daily = df.groupby(dates)["Revenue"].sum()
+    anomalies = daily[daily < daily.mean() - 2 * daily.std()]
+
+    insights = [
+        f"📈 Revenue has {'increased' if growth > 0 else 'decreased'} by {abs(growth):.2f}% compared to last month.",
+        f"🏆 Best performing region: {region.idxmax()}.",
+        f"⚠️ Lowest performing region: {region.idxmin()}.",
+        f"🛍️ Top category: {category.idxmax()}.",
+        f"📉 Weakest category: {category.idxmin()}.",
+    ]
+    if not anomalies.empty:
+        insights.append(f"🚨 Anomaly detected: Unusual revenue drop on {anomalies.index[-1].date()}.")
+    insights.append(f"💡 Recommendation: Focus marketing campaigns on {region.idxmin()} "
+                    f"and introduce offers in {category.idxmin()} category.")
+    return insights
+
+
+@pytest.fixture
+def with_drop(sales):
+    # Thin out one day so the anomaly insight is exercised
+    day = sales["Date"].unique()[40]
+    return sales[(sales["Date"] != day) | (sales.index % 10 == 0)].reset_index(drop=True)
+
+
+def test_row_path_matches_reference(with_drop):
+    before = with_drop.copy()
+    insights, _ = generate_advanced_insights(with_drop)
+
+    assert insights == _reference(with_drop)
+    assert any("Anomaly" in line for line in insights)
+    pd.testing.assert_frame_equal(with_drop, before)  # input left untouched
+
+
+def test_cube_and_stats_paths_match_reference(with_drop):
+    stats = SalesStatsStore()
+    stats.update(with_drop)
+
+    from_cube, _ = generate_advanced_insights(with_drop, cube=build_cube(with_drop))
+    from_stats, _ = generate_advanced_insights(with_drop, cube=build_cube(with_drop), stats=stats.get())
+
+    assert from_cube == _reference(with_drop)
+    assert from_stats == _reference(with_drop)
@@ -0,0 +1,49 @@
+import pytest
+
+import auth_jwt
+import db
+import password_hashing
+from auth_jwt import BUSY, authenticate, register_user, request_password_reset, reset_password
+from password_hashing import HashingBusy, LoginThrottle
+
+
+@pytest.fixture
+def auth_db(tmp_path, monkeypatch):
+    config = db._config()
+    config.update(backend="sqlite", sqlite_path=str(tmp_path / "auth.db"))
+    db.configure(config)
+    monkeypatch.setattr(password_hashing, "HASH_WORKERS", 0)
+    monkeypatch.setattr(password_hashing, "BCRYPT_ROUNDS", 4)
+    monkeypatch.setattr(auth_jwt, "throttle", LoginThrottle(user_failures=3))
+    yield
+    db.get_pool().close_all()
+
+
+def _busy(*args):
+    raise HashingBusy("full")
+
+
+def test_busy_hashing_is_reported_as_busy(auth_db, monkeypatch):
+    assert register_user("alice", "alice@example.com", "secret") is True
+    token = request_password_reset("alice@example.com")
+
+    monkeypatch.setattr(password_hashing, "_run", _busy)
+    assert register_user("bob", "bob@example.com", "secret") is BUSY
+    assert reset_password(token, "new-secret") is BUSY
+    for _ in range(5):
+        assert authenticate("alice", "secret") is BUSY
+
+    # Busy attempts never reached a password check, so they did not count
+    monkeypatch.undo()
+    monkeypatch.setattr(password_hashing, "HASH_WORKERS", 0)
+    assert authenticate("alice", "secret") is not None
+    assert reset_password(token, "new-secret") is True
+    assert reset_password(token, "again") is False
+
+
+def test_failed_attempts_count_before_hashing(auth_db):
+    register_user("alice", "alice@example.com", "secret")
+    for _ in range(3):
+        assert authenticate("alice", "wrong") is None
+    assert auth_jwt.throttle.retry_after("alice") > 0
+    assert authenticate("alice", "secret") is None  # throttled, even with the right password
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from statsmodels.tsa.ar_model import AutoReg
+from statsmodels.tsa.holtwinters import ExponentialSmoothing
+
+from batch_forecaster import ARForecaster, HoltWintersForecaster
+
+
+def _series(n=4, T=200, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(T)
+    weekly = 10 * np.sin(2 * np.pi * t / 7)
+    return 500 + 0.5 * t + weekly + np.cumsum(rng.normal(0, 3, (n, T)), axis=1)
+
+
+@pytest.mark.parametrize("intercept", [False, True])
+def test_ar_matches_statsmodels_autoreg(intercept):
+    Y = _series()
+    model = ARForecaster(p=3, d=1, intercept=intercept, ridge=0.0).fit(Y)
+    forecast = model.forecast(10)
+
+    for i, y in enumerate(Y):
+        ref = AutoReg(np.diff(y), lags=3, trend="c" if intercept else "n").fit()
+        np.testing.assert_allclose(model.coef_[i], ref.params, rtol=1e-6, atol=1e-9)
+        expected = y[-1] + np.cumsum(ref.predict(start=len(y) - 1, end=len(y) + 8))
+        np.testing.assert_allclose(forecast[i], expected, rtol=1e-8)
+
+
+def test_ar_single_series_returns_1d():
+    y = _series(n=1)[0]
+    assert ARForecaster(p=2).fit(y).forecast(5).shape == (5,)
+
+
+@pytest.mark.parametrize("p", [0, -1])
+def test_ar_rejects_order_below_one(p):
+    with pytest.raises(ValueError):
+        ARForecaster(p=p)
+
+
+def test_holt_winters_matches_statsmodels_with_fixed_parameters():
+    Y = _series(n=3)
+    m = 7
+    alpha, beta, gamma = 0.3, 0.1, 0.05
+    grid = {"alpha": (alpha,), "beta": (beta,), "gamma": (gamma,)}
+    model = HoltWintersForecaster(season_length=m, grid=grid).fit(Y)
+    forecast = model.forecast(14)
+
+    for i, y in enumerate(Y):
+        level = y[:m].mean()
+        ref = ExponentialSmoothing(
+            y[m:], trend="add", seasonal="add", seasonal_periods=m,
+            initialization_method="known",
+            initial_level=level,
+            initial_trend=(y[m:2 * m].mean() - level) / m,
+            initial_seasonal=y[:m] - level,
+        ).fit(smoothing_level=alpha, smoothing_trend=beta, smoothing_seasonal=gamma, optimized=False)
+
+        np.testing.assert_allclose(model.sse_[i], ref.sse, rtol=1e-8)
+        np.testing.assert_allclose(model.level_[i], ref.level[-1], rtol=1e-10)
+        np.testing.assert_allclose(model.trend_[i], ref.trend[-1], rtol=1e-8)
+
+        # Forecast from the final statsmodels states (its own forecast() reuses a
+        # pre-update value for the last observed season)
+        steps = np.arange(1, 15)
+        expected = ref.level[-1] + steps * ref.trend[-1] + ref.season[-m:][(steps - 1) % m]
+        np.testing.assert_allclose(forecast[i], expected, rtol=1e-10)
+
+
+def test_holt_winters_picks_lowest_sse_from_grid():
+    Y = _series(n=2)
+    full = HoltWintersForecaster().fit(Y)
+    for alpha in (0.1, 0.6):
+        single = HoltWintersForecaster(grid={"alpha": (alpha,), "beta": (0.01,), "gamma": (0.05,)}).fit(Y)
+        assert np.all(full.sse_ <= single.sse_ + 1e-9)
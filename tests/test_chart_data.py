@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from chart_data import downsample, lttb_indices, minmax_indices
+
+
+# Straightforward per-point LTTB (Steinarsson, 2013)
+def _reference_lttb(x, y, threshold):
+    n = len(y)
+    every = (n - 2) / (threshold - 2)
+    selected, a = [0], 0
+
+    for i in range(threshold - 2):
+        avg_start = math.floor((i + 1) * every) + 1
+        avg_end = min(math.floor((i + 2) * every) + 1, n)
+        avg_x = sum(x[avg_start:avg_end]) / (avg_end - avg_start)
+        avg_y = sum(y[avg_start:avg_end]) / (avg_end - avg_start)
+
+        best, best_area = None, -1.0
+        for j in range(math.floor(i * every) + 1, math.floor((i + 1) * every) + 1):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+
+    return selected + [n - 1]
+
+
+@pytest.mark.parametrize("n, threshold", [(1_000, 100), (997, 50), (10_000, 500), (50, 3)])
+def test_lttb_matches_reference(n, threshold):
+    rng = np.random.default_rng(n)
+    x = np.sort(rng.uniform(0, 1e6, n))
+    y = np.cumsum(rng.normal(0, 1, n))
+
+    expected = _reference_lttb(x.tolist(), y.tolist(), threshold)
+    assert lttb_indices(x, y, threshold).tolist() == expected
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    y = np.random.default_rng(0).normal(0, 1, 5_000)
+    rows = minmax_indices(y, 100)
+
+    assert len(rows) <= 202
+    buckets = pd.Series(y).groupby(np.arange(len(y)) * 100 // len(y))
+    assert set(buckets.idxmin()) <= set(rows)
+    assert set(buckets.idxmax()) <= set(rows)
+
+
+def test_downsample_splits_budget_between_lines():
+    days = pd.date_range("2024-01-01", periods=2_000)
+    df = pd.DataFrame({
+        "Date": np.tile(days, 2),
+        "Revenue": np.random.default_rng(1).normal(100, 10, 4_000),
+        "Region": np.repeat(["North", "South"], 2_000),
+    })
+
+    out = downsample(df, "Date", "Revenue", max_points=300, by="Region")
+    assert out.groupby("Region").size().tolist() == [150, 150]
+    for _, part in out.groupby("Region"):
+        assert part["Date"].iloc[0] == days[0] and part["Date"].iloc[-1] == days[-1]
@@ -0,0 +1,35 @@
+import gc
+
+import db
+
+
+def _pool(tmp_path, size=1):
+    config = db._config()
+    config.update(backend="sqlite", sqlite_path=str(tmp_path / "pool.db"), pool_size=size, timeout=0.1)
+    return db.create_pool(config)
+
+
+def test_closed_checkout_is_reused(tmp_path):
+    pool = _pool(tmp_path)
+    with pool.checkout() as conn:
+        conn.cursor().execute("SELECT 1")
+    with pool.checkout():
+        pass
+
+    assert pool.stats["reused"] >= 1
+    pool.close_all()
+
+
+def test_leaked_checkout_frees_its_slot(tmp_path):
+    pool = _pool(tmp_path)
+    conn = pool.checkout()
+    created = pool.stats["created"]
+    del conn
+    gc.collect()
+
+    # The abandoned connection may be mid-transaction, so it is replaced, not reused
+    with pool.checkout():
+        pass
+    assert pool.stats["timeouts"] == 0
+    assert pool.stats["created"] == created + 1
+    pool.close_all()
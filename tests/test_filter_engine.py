@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from filter_engine import FilterIndex
+
+DIMENSIONS = ["Region", "Product_Category", "Store_ID"]
+
+
+def _mask(df, filters):
+    mask = pd.Series(True, index=df.index)
+    for dim, wanted in filters.items():
+        if wanted is None or wanted == "All":
+            continue
+        values = wanted if isinstance(wanted, list) else [wanted]
+        mask &= df[dim].isin(values)
+    return df[mask]
+
+
+FILTERS = [
+    {"Region": "All", "Product_Category": "All"},
+    {"Region": "North", "Product_Category": "All"},
+    {"Region": "South", "Product_Category": "Sports"},
+    {"Region": "All", "Product_Category": "Fashion", "Store_ID": ["STR_101", "STR_103"]},
+    {"Region": "North", "Product_Category": "Missing"},
+    {"Region": "East", "Store_ID": []},
+]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_apply_matches_boolean_mask(sales, filters):
+    index = FilterIndex(sales, DIMENSIONS)
+    pd.testing.assert_frame_equal(index.apply(sales, filters), _mask(sales, filters))
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_extended_index_matches_full_rebuild(sales, filters):
+    head, tail = sales.iloc[:2_000], sales.iloc[2_000:]
+    index = FilterIndex(head, DIMENSIONS).extended(tail)
+    full = FilterIndex(sales, DIMENSIONS)
+
+    assert index.n_rows == len(sales)
+    for dim in DIMENSIONS:
+        assert index.values(dim) == full.values(dim)
+    pd.testing.assert_frame_equal(index.apply(sales, filters), _mask(sales, filters))
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_insights import _trend_and_anomaly
+from incremental_stats import ALL, SalesStatsStore
+
+
+def _sales(days=90, rows=2_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, days, rows), unit="D"),
+        "Region": rng.choice(["North", "South"], rows),
+        "Product_Category": rng.choice(["Food", "Toys", "Books"], rows),
+        "Revenue": rng.gamma(2.0, 50.0, rows).round(2),
+    })
+    # A few clear drops for the anomaly check
+    return df[~df["Date"].isin(pd.to_datetime(["2024-02-10", "2024-03-05"])) | (rng.random(rows) < 0.05)]
+
+
+def _expected(df, region=ALL, category=ALL):
+    if region != ALL:
+        df = df[df["Region"] == region]
+    if category != ALL:
+        df = df[df["Product_Category"] == category]
+    return df.groupby(df["Date"].dt.normalize())["Revenue"].sum()
+
+
+@pytest.mark.parametrize("key", [(ALL, ALL), ("North", ALL), (ALL, "Toys"), ("South", "Books")])
+def test_batches_match_pandas_over_all_rows(key):
+    df = _sales().sort_values("Date", kind="stable").reset_index(drop=True)
+    store = SalesStatsStore()
+    # Uneven batches, including rows for days already seen
+    shuffled = df.sample(frac=1, random_state=1)
+    for start, stop in [(0, 1), (1, 300), (300, 301), (301, 1_100), (1_100, len(shuffled))]:
+        store.update(shuffled.iloc[start:stop])
+
+    series = store.get(*key)
+    daily = _expected(df, *key)
+    growth, _ = _trend_and_anomaly(daily)
+
+    assert series.daily == pytest.approx(daily.to_dict())
+    assert series.stats.mean == pytest.approx(daily.mean())
+    assert series.stats.std == pytest.approx(daily.std())
+    assert series.monthly_growth() == pytest.approx(growth)
+
+
+def test_latest_anomaly_matches_pandas_on_full_build():
+    df = _sales()
+    store = SalesStatsStore()
+    store.update(df)
+
+    _, anomaly = _trend_and_anomaly(_expected(df))
+    assert anomaly is not None
+    assert store.get().latest_anomaly() == anomaly
+
+
+def test_appended_days_are_flagged_without_rescanning_history():
+    df = _sales()
+    store = SalesStatsStore()
+    store.update(df)
+    before = store.get().latest_anomaly()
+
+    drop = pd.DataFrame({"Date": [pd.Timestamp("2024-04-15")], "Region": ["North"],
+                         "Product_Category": ["Food"], "Revenue": [1.0]})
+    store.update(drop)
+    assert store.get().latest_anomaly() == pd.Timestamp("2024-04-15")
+
+    # Late rows lift the day back to normal: it is unflagged again
+    store.update(pd.concat([drop.assign(Revenue=5_000.0)]))
+    assert store.get().latest_anomaly() == before
+
+
+@pytest.mark.parametrize("key", [(ALL, ALL), ("North", "Toys")])
+def test_every_update_agrees_with_a_full_recompute(key):
+    df = _sales()
+    shuffled = df.sample(frac=1, random_state=2).reset_index(drop=True)
+    # A late, very large day pushes the threshold up and older days under it
+    spike = pd.DataFrame({"Date": [pd.Timestamp("2024-01-20")] * 2, "Region": ["North"] * 2,
+                          "Product_Category": ["Toys"] * 2, "Revenue": [60_000.0, 40_000.0]})
+    batches = [shuffled.iloc[:900], shuffled.iloc[900:1_400], spike, shuffled.iloc[1_400:]]
+
+    store = SalesStatsStore(window=14)
+    seen = []
+    for batch in batches:
+        store.update(batch)
+        seen.append(batch)
+        daily = _expected(pd.concat(seen), *key)
+        series = store.get(*key)
+
+        _, anomaly = _trend_and_anomaly(daily)
+        assert series.latest_anomaly() == anomaly
+        flagged = daily[daily < daily.mean() - 2 * daily.std()].index
+        assert all(series.is_anomaly(day) for day in flagged)
+
+        recent = daily.iloc[-14:]
+        rolling = store.rolling(*key)
+        assert rolling.mean == pytest.approx(recent.mean())
+        assert rolling.std == pytest.approx(recent.std())
@@ -0,0 +1,67 @@
+import pandas as pd
+import pytest
+
+import dataset
+from benchmarks.generator import RAW_COLUMNS
+from ingest import SchemaError, append_rows
+
+
+@pytest.fixture
+def data_file(sales, tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset, "CACHE_DIR", str(tmp_path / ".cache"))
+    dataset.clear_cache()
+    path = tmp_path / "final_data.csv"
+    sales.iloc[:2_000].to_csv(path, index=False, date_format="%Y-%m-%d")
+    yield str(path)
+    dataset.clear_cache()
+
+
+def _batches(sales):
+    second = sales.iloc[2_500:][RAW_COLUMNS].copy()
+    second["Region"] = second["Region"].astype(str).where(second.index % 2 == 0, "Central")
+    return [sales.iloc[2_000:2_500][RAW_COLUMNS], second]
+
+
+def test_appends_match_a_fresh_parse_of_the_file(sales, data_file):
+    _, base_version = dataset.get_dataset(data_file)
+
+    parent = base_version
+    for batch in _batches(sales):
+        result = append_rows(batch, data_file, segments=False)
+        assert result["parent"] == parent and result["rows"] == len(batch)
+        parent = result["version"]
+
+    # Warm process: only the two partitions are read on top of the loaded frame
+    df, version = dataset.get_dataset(data_file)
+    assert version == parent
+    assert dataset.appended_since(data_file, base_version, version) == 2_000
+
+    expected = dataset._read_csv(data_file)
+    pd.testing.assert_frame_equal(df, expected)
+
+    # Cold start: base columnar copy plus partitions, same version and rows
+    dataset.clear_cache()
+    cold, cold_version = dataset.get_dataset(data_file)
+    assert cold_version == version
+    pd.testing.assert_frame_equal(cold, expected)
+
+
+def test_rewritten_file_is_reloaded_in_full(sales, data_file):
+    dataset.get_dataset(data_file)
+    append_rows(_batches(sales)[0], data_file, segments=False)
+    dataset.get_dataset(data_file)
+
+    sales.iloc[:100].to_csv(data_file, index=False, date_format="%Y-%m-%d")
+    df, version = dataset.get_dataset(data_file)
+
+    assert len(df) == 100
+    assert version == dataset.content_hash(data_file)
+
+
+def test_invalid_batch_is_rejected_without_touching_the_file(sales, data_file):
+    before = open(data_file, "rb").read()
+    batch = sales.iloc[2_000:2_010][RAW_COLUMNS].assign(Revenue=-1.0)
+
+    with pytest.raises(SchemaError, match="Revenue"):
+        append_rows(batch, data_file, segments=False)
+    assert open(data_file, "rb").read() == before
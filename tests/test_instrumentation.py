@@ -0,0 +1,45 @@
+import pytest
+
+import instrumentation
+from instrumentation import begin_run, end_run, run_breakdown, stage, timed
+
+
+@pytest.fixture
+def recording():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield
+    instrumentation.enable(False)
+    instrumentation.reset()
+
+
+def test_breakdown_sums_repeats_and_marks_nested_stages(recording):
+    @timed("report.build")
+    def build():
+        with stage("report.table"):
+            pass
+
+    begin_run("user_dashboard")
+    with stage("user.filter"):
+        pass
+    with stage("user.filter"):
+        pass
+    with stage("user.pdf"):
+        build()
+    record = end_run()
+
+    stages = [(name, depth) for name, _, _, depth in record["stages"]]
+    assert stages == [("user.filter", 0), ("user.filter", 0), ("report.table", 2),
+                      ("report.build", 1), ("user.pdf", 0)]
+
+    breakdown = run_breakdown(record)
+    assert set(breakdown) == {"user.filter", "user.pdf", "↳ report.build", "↳ report.table"}
+    assert breakdown["user.filter"] == pytest.approx(sum(s for n, s, _, _ in record["stages"] if n == "user.filter"))
+
+
+def test_memory_delta_is_exported_as_a_gauge(recording):
+    with stage("user.load"):
+        pass
+    text = instrumentation.export_prometheus()
+    assert "# TYPE retail_stage_memory_delta_bytes gauge" in text
+    assert "retail_stage_memory_delta_bytes_total" not in text
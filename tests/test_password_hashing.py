@@ -0,0 +1,48 @@
+from password_hashing import SlidingWindow, client_address
+
+
+def test_sliding_window_limits_and_expires():
+    window = SlidingWindow(limit=2, window=10)
+    window.hit("a", now=1)
+    window.hit("a", now=2)
+    assert window.retry_after("a", now=3) == 8
+    assert window.retry_after("a", now=12) == 0
+    assert len(window) == 0  # both hits aged out, key dropped
+
+
+def test_sliding_window_caps_tracked_keys():
+    window = SlidingWindow(limit=5, window=10, max_keys=100)
+    for i in range(10_000):
+        window.hit(f"user{i}", now=1 + i * 1e-6)
+    assert len(window) <= 100
+    assert window.retry_after("user9999", now=2) == 0
+
+
+def test_client_address_ignores_untrusted_forwarded_for():
+    assert client_address("198.51.100.9", "1.2.3.4", trusted=set()) == "198.51.100.9"
+    assert client_address("198.51.100.9", "1.2.3.4", trusted={"10.0.0.1"}) == "198.51.100.9"
+
+
+def test_client_address_takes_right_most_untrusted_hop():
+    trusted = {"10.0.0.1", "10.0.0.2"}
+    assert client_address("10.0.0.1", "spoofed, 203.0.113.7", trusted) == "203.0.113.7"
+    assert client_address("10.0.0.1", "spoofed, 203.0.113.7, 10.0.0.2", trusted) == "203.0.113.7"
+    assert client_address("10.0.0.1", None, trusted) == "10.0.0.1"
+
+
+def test_try_hit_admits_at_most_limit_under_concurrency():
+    from concurrent.futures import ThreadPoolExecutor
+
+    window = SlidingWindow(limit=5, window=60)
+    with ThreadPoolExecutor(16) as pool:
+        admitted = sum(pool.map(lambda _: window.try_hit("alice"), range(200)))
+    assert admitted == 5
+
+
+def test_full_window_evicts_least_recently_hit_key():
+    window = SlidingWindow(limit=5, window=60, max_keys=3)
+    for key, now in [("a", 1), ("b", 2), ("c", 3), ("a", 4), ("d", 5)]:
+        window.hit(key, now=now)
+    assert len(window) == 3
+    assert window.retry_after("b", now=6) == 0  # evicted
+    assert [k for k in ("a", "c", "d") if k in window._events] == ["a", "c", "d"]
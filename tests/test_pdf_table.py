@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+
+from pdf_table import format_column, format_money
+
+
+def test_format_money_matches_str_format():
+    rng = np.random.default_rng(0)
+    values = pd.Series(np.concatenate([
+        rng.gamma(2.0, 500.0, 2_000).round(3),
+        -rng.gamma(2.0, 5e6, 200),
+        [0.0, -0.0, 0.004, 999.995, 1_000.0, 1_234_567.891, np.nan],
+    ]))
+
+    expected = values.map("{:,.2f}".format, na_action="ignore")
+    actual = format_money(values)
+
+    assert actual.isna().equals(expected.isna())
+    assert actual.dropna().tolist() == expected.dropna().tolist()
+
+
+def test_format_column_money_blanks_missing_and_truncates():
+    values = pd.Series([1234.5, None, 12_345_678.0])
+    assert format_column(values, "money", 8).tolist() == ["1,234.50", "", "12,345,6"]
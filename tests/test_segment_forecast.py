@@ -0,0 +1,40 @@
+import pandas as pd
+
+import segment_forecast
+from segment_forecast import run_segment_forecasts
+
+
+def test_failed_refit_keeps_previous_rows(sales, tmp_path, monkeypatch):
+    output = str(tmp_path / "forecasts.parquet")
+    df = sales
+    run_segment_forecasts(df, output=output, segment_types=["Total", "Region"], engine="ar")
+    before = pd.read_parquet(output)
+
+    def failing(tasks, engine):
+        for segment, *_ in tasks:
+            yield segment, None, "boom"
+
+    monkeypatch.setattr(segment_forecast, "_fit_vectorized", failing)
+    changed = df.assign(Revenue=df["Revenue"] * 2)
+    result = run_segment_forecasts(changed, output=output, segment_types=["Total", "Region"], engine="ar")
+
+    after = pd.read_parquet(output)
+    assert result["fitted"] == 0
+    assert {segment for segment, _ in result["failed"]} == set(before["Segment"])
+    pd.testing.assert_frame_equal(
+        after.sort_values(["Segment", "Step"]).reset_index(drop=True),
+        before.sort_values(["Segment", "Step"]).reset_index(drop=True),
+    )
+
+
+def test_sparse_segments_are_skipped(sales, tmp_path):
+    output = str(tmp_path / "forecasts.parquet")
+    # Store STR_101 only sells on 10 of the 90 days
+    days = sales["Date"].unique()[:10]
+    sparse = sales[(sales["Store_ID"] != "STR_101") | sales["Date"].isin(days)]
+
+    run_segment_forecasts(sparse, output=output, segment_types=["Store_ID"], engine="ar", min_history=30)
+    segments = set(pd.read_parquet(output)["Segment"])
+
+    assert "Store_ID:Store_ID=STR_101" not in segments
+    assert "Store_ID:Store_ID=STR_102" in segments
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from sklearn.cluster import KMeans
+
+from segmentation import StoreSegmentation
+
+
+# notebooks/05_clustering.ipynb: KMeans on unscaled per-store sums and mean rating
+def _notebook_kmeans(rows):
+    store_data = rows.groupby("Store_ID").agg({"Revenue": "sum", "Units_Sold": "sum", "Store_Rating": "mean"})
+    kmeans = KMeans(n_clusters=3, random_state=42, n_init=10).fit(store_data)
+    return kmeans, pd.Series(kmeans.labels_, index=store_data.index)
+
+
+def _same_partition(a, b):
+    pairs = pd.crosstab(a, b.reindex(a.index))
+    return bool(((pairs > 0).sum(axis=0) == 1).all() and ((pairs > 0).sum(axis=1) == 1).all())
+
+
+def test_full_history_matches_notebook_clusters(sales):
+    kmeans, expected = _notebook_kmeans(sales)
+    seg = StoreSegmentation(seed_centers=kmeans.cluster_centers_).update(sales)
+    assert _same_partition(expected, seg.clusters)
+
+
+# Revenue gaps only beat the rating gap once summed over the days, as in the notebook
+@pytest.mark.parametrize("days", [10, 30])
+def test_rating_keeps_its_notebook_weight(days):
+    daily_revenue = {"A": 1.0, "B": 1.0, "C": 3.0, "D": 3.0, "E": 5.0, "F": 5.0}
+    rating = {"A": 1.0, "B": 5.0, "C": 1.0, "D": 5.0, "E": 1.0, "F": 5.0}
+    rows = pd.DataFrame([
+        {"Date": day, "Store_ID": store, "Revenue": revenue, "Units_Sold": 1, "Store_Rating": rating[store]}
+        for day in pd.date_range("2024-01-01", periods=days)
+        for store, revenue in daily_revenue.items()
+    ])
+
+    _, expected = _notebook_kmeans(rows)
+    seg = StoreSegmentation().update(rows)
+
+    assert expected["A"] == expected["B"] and expected["A"] != expected["C"]
+    assert _same_partition(expected, seg.clusters)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+from streaming_prep import add_date_features, export_csv, stream_prepare
+
+
+def _raw(rows=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    raw = pd.DataFrame({
+        "Date": pd.date_range("2023-01-01", periods=60).strftime("%Y-%m-%d")[rng.integers(0, 60, rows)],
+        "Store_ID": rng.integers(1, 5, rows),
+        "Category": rng.choice(["Food", "Toys", None], rows),
+        "Revenue": rng.integers(0, 20, rows) / 4,
+    })
+    raw.loc[rng.integers(0, rows, 50), "Revenue"] = np.nan
+    return raw
+
+
+def test_stream_prepare_matches_drop_duplicates_in_input_order(tmp_path):
+    raw = _raw()
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    result = stream_prepare(str(raw_path), str(tmp_path / "parts"), chunk_rows=400, buckets=7)
+    csv_path = tmp_path / "final.csv"
+    export_csv(str(tmp_path / "parts"), str(csv_path))
+
+    expected = pd.read_csv(raw_path).drop_duplicates().reset_index(drop=True)
+    actual = pd.read_csv(csv_path)
+    assert result["rows_written"] == len(expected)
+    assert result["duplicates_dropped"] == len(raw) - len(expected)
+    pd.testing.assert_frame_equal(actual[list(expected.columns)], expected)
+
+    features = add_date_features(expected.copy())
+    assert actual["DayOfWeek"].tolist() == features["DayOfWeek"].tolist()
+    assert actual["Year"].tolist() == features["Year"].tolist()
+
+
+def test_hash_collisions_do_not_drop_distinct_rows(tmp_path, monkeypatch):
+    raw = _raw(rows=500)
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    # Every row gets the same hash: only the value comparison can tell them apart
+    monkeypatch.setattr(pd.util, "hash_pandas_object",
+                        lambda frame, index=False: pd.Series(np.zeros(len(frame), dtype=np.uint64)))
+    result = stream_prepare(str(raw_path), str(tmp_path / "parts"), chunk_rows=100, buckets=3)
+
+    assert result["rows_written"] == len(pd.read_csv(raw_path).drop_duplicates())
+
+
+def test_parts_share_one_schema(tmp_path):
+    raw = _raw()
+    raw.loc[:1_500, "Revenue"] = np.nan  # first chunks carry no float values
+    raw_path = tmp_path / "raw.csv"
+    raw.to_csv(raw_path, index=False)
+
+    stream_prepare(str(raw_path), str(tmp_path / "parts"), chunk_rows=400, buckets=4)
+
+    parts = sorted((tmp_path / "parts").glob("part-*.parquet"))
+    assert len(parts) > 1
+    schemas = {str(pd.read_parquet(p).dtypes.to_dict()) for p in parts}
+    assert len(schemas) == 1